@@ -4,11 +4,13 @@ Provides centralized configuration management including:
 - Settings loading and validation
 - Logging configuration
 - Notification setup
+- Runtime metrics
 """
 
 from .settings.Settings import SettingsManager, GetSettings
 from .logging.Logger import LoggerManager, ConfigLogger, add_mt5_time
 from .notifications.Notification import NotificationManager, ConfigNotification
+from .metrics.Metrics import MetricsManager, ConfigMetrics, metrics
 
 __all__ = [
     # Settings
@@ -22,5 +24,10 @@ __all__ = [
 
     # Notifications
     'NotificationManager',
-    'ConfigNotification'
+    'ConfigNotification',
+
+    # Metrics
+    'MetricsManager',
+    'ConfigMetrics',
+    'metrics'
 ]
@@ -0,0 +1,247 @@
+"""Runtime metrics of the monitoring loop: iteration time, MT5 calls and database queries"""
+
+import json
+import time
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from loguru import logger
+
+
+class MetricsManager:
+    """
+    Collects per-iteration monitoring metrics with low overhead.
+
+    Calls and counters are cumulative and lock-protected. An iteration also
+    tallies the calls and counters made by its own thread, so MT5 calls and
+    queries of other threads (order queue, Telegram handlers) are not
+    attributed to it.
+    """
+
+    def __init__(self, window: int = 500, log_interval: float = 300.0, slow_iteration: float = 1.0):
+        self.enabled = False
+        self.log_interval = float(log_interval)
+        self.slow_iteration = float(slow_iteration)
+        self._lock = threading.Lock()
+        self._calls: Dict[str, list] = {}  # name -> [count, total seconds, max seconds]
+        self._counters: Dict[str, float] = {}
+        self._iterations = deque(maxlen=window)
+        self._total_iterations = 0
+        self._local = threading.local()  # .record: tallies of the iteration running on this thread
+        self._last_log = time.monotonic()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def configure(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """Apply the Metrics settings section"""
+        config = config or {}
+        self.enabled = bool(config.get('enabled', False))
+        self.log_interval = float(config.get('logInterval', 300))
+        self.slow_iteration = float(config.get('slowIteration', 1.0))
+        window = int(config.get('window', 500))
+        with self._lock:
+            self._iterations = deque(self._iterations, maxlen=window)
+
+    def _tally(self, name: str, value: float) -> None:
+        record = getattr(self._local, 'record', None)
+        if record is not None:
+            record[name] = record.get(name, 0) + value
+
+    def record_call(self, name: str, seconds: float) -> None:
+        """Record one call of an instrumented function"""
+        if not self.enabled:
+            return
+        prefix = name.split('.', 1)[0]
+        self._tally(f'{prefix}_calls', 1)
+        self._tally(f'{prefix}_seconds', seconds)
+        with self._lock:
+            stats = self._calls.get(name)
+            if stats is None:
+                self._calls[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add to a named counter"""
+        if not self.enabled:
+            return
+        self._tally(name, value)
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    @contextmanager
+    def iteration(self, label: str = 'monitor'):
+        """Measure one monitoring iteration with the calls and counters of the current thread"""
+        if not self.enabled:
+            yield
+            return
+
+        outer = getattr(self._local, 'record', None)
+        record = self._local.record = {}
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - started
+            self._local.record = outer
+            if outer is not None:
+                for name, value in record.items():
+                    outer[name] = outer.get(name, 0) + value
+            record.update(label=label, wall=wall)
+            with self._lock:
+                self._iterations.append(record)
+                self._total_iterations += 1
+
+            if wall > self.slow_iteration:
+                logger.warning(f"Monitoring iteration of {label} took {wall * 1000:.0f} ms")
+            if time.monotonic() - self._last_log >= self.log_interval:
+                self._last_log = time.monotonic()
+                self.log_summary()
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate of the recent iterations and cumulative call statistics"""
+        with self._lock:
+            iterations = list(self._iterations)
+            calls = {name: {'count': count, 'avg_ms': seconds / count * 1000, 'max_ms': peak * 1000}
+                     for name, (count, seconds, peak) in sorted(self._calls.items())}
+            counters = dict(self._counters)
+            total = self._total_iterations
+
+        summary = {'iterations': total, 'window': len(iterations), 'calls': calls, 'counters': counters}
+        if iterations:
+            walls = sorted(record['wall'] for record in iterations)
+            summary['wall_ms'] = {
+                'avg': sum(walls) / len(walls) * 1000,
+                'p95': walls[min(len(walls) - 1, int(len(walls) * 0.95))] * 1000,
+                'max': walls[-1] * 1000,
+                'last': iterations[-1]['wall'] * 1000,
+            }
+            summary['slow_iterations'] = sum(1 for wall in walls if wall > self.slow_iteration)
+            keys = {key for record in iterations for key in record} - {'label', 'wall'}
+            summary['per_iteration'] = {key: sum(record.get(key, 0) for record in iterations) / len(iterations)
+                                        for key in sorted(keys)}
+        return summary
+
+    def log_summary(self) -> None:
+        """Write a one-line summary of the recent iterations to the log"""
+        summary = self.summary()
+        if not summary['window']:
+            return
+        wall = summary['wall_ms']
+        per_iteration = summary['per_iteration']
+        logger.info(
+            f"Monitoring: {summary['window']} iterations, "
+            f"wall avg {wall['avg']:.1f} ms p95 {wall['p95']:.1f} ms max {wall['max']:.1f} ms, "
+            f"{per_iteration.get('mt5_calls', 0):.1f} mt5 calls, "
+            f"{per_iteration.get('db_queries', 0):.1f} db queries, "
+            f"{per_iteration.get('positions_evaluated', 0):.1f} positions evaluated, "
+            f"{per_iteration.get('modifications_sent', 0):.1f} modifications per iteration")
+
+    def count_query(self, statement: str) -> None:
+        """sqlite3 trace callback counting executed statements"""
+        if self.enabled and not statement.startswith(('BEGIN', 'COMMIT', 'ROLLBACK')):
+            self.increment('db_queries')
+
+    def reset(self) -> None:
+        """Forget every recorded value"""
+        with self._lock:
+            self._calls.clear()
+            self._counters.clear()
+            self._iterations.clear()
+            self._total_iterations = 0
+
+    def instrument_module(self, module, prefix: str) -> int:
+        """
+        Time every public function of a module, e.g. MetaTrader5.
+
+        Callers look the functions up on the module at call time, so the
+        wrappers apply everywhere in the process.
+
+        Returns:
+            Number of wrapped functions
+        """
+        wrapped = 0
+        for name in dir(module):
+            attr = getattr(module, name)
+            if name.startswith('_') or isinstance(attr, type) or not callable(attr) or hasattr(attr, '__wrapped__'):
+                continue
+            setattr(module, name, self._timed(attr, f'{prefix}.{name}'))
+            wrapped += 1
+        return wrapped
+
+    def _timed(self, function, name: str):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            if not self.enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record_call(name, time.perf_counter() - started)
+        return timed
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Expose the summary as JSON on http://host:port/metrics"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') != '/metrics':
+                    self.send_error(404)
+                    return
+                body = json.dumps(metrics.summary()).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True).start()
+        logger.info(f"Metrics available on http://{host}:{self.server.server_port}/metrics")
+        return self.server
+
+    def stop(self) -> None:
+        """Stop the metrics endpoint"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+# Global metrics shared by the monitoring loop, order queue and repositories
+metrics = MetricsManager()
+
+
+def ConfigMetrics(config=None, serve=True):
+    """
+    Enable metrics collection, MT5 call timing and the optional HTTP endpoint.
+
+    Execution workers call it with serve=False: they measure and log their own
+    monitoring iterations, while the endpoint belongs to the main process.
+    """
+    if config is None:
+        from Configure.settings.Settings import Settings
+        config = Settings.metrics()
+    metrics.configure(config)
+    if not metrics.enabled:
+        return
+
+    import MetaTrader5 as mt5
+    metrics.instrument_module(mt5, 'mt5')
+
+    port = config.get('port') if config and serve else None
+    if port:
+        try:
+            metrics.serve(int(port), config.get('host', '127.0.0.1'))
+        except OSError as e:
+            logger.error(f"Failed to start metrics endpoint on port {port}: {e}")
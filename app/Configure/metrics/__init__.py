@@ -0,0 +1,9 @@
+"""Runtime metrics components"""
+
+from .Metrics import MetricsManager, ConfigMetrics, metrics
+
+__all__ = [
+    'MetricsManager',
+    'ConfigMetrics',
+    'metrics'
+]
@@ -29,6 +29,8 @@ class SafeConfig:
 
             # Main config defaults
             'disable_cache': False,
+            'metrics': {},
+            'database': {},
 
             # MetaTrader defaults
             'mt_server': '',
@@ -45,6 +47,10 @@ class SafeConfig:
             'mt_symbol_mappings': {},
             'mt_symbols_whitelist': [],
             'mt_symbols_blacklist': [],
+            'mt_order_retry': {},
+            'mt_accounts': [],
+            'mt_terminal': {},
+            'mt_monitoring': {},
 
             # Timer defaults
             'timer_start': None,
@@ -158,12 +164,37 @@ class SafeConfig:
     def mt_symbols_blacklist(self) -> List[str]:
         return self._get_nested_value('MetaTrader', 'symbols', 'blackList') or self._defaults['mt_symbols_blacklist']
 
+    @property
+    def mt_order_retry(self) -> Dict[str, Any]:
+        return self._get_nested_value('MetaTrader', 'OrderRetry') or self._defaults['mt_order_retry']
+
+    @property
+    def mt_accounts(self) -> List[Dict[str, Any]]:
+        accounts = self._get_nested_value('MetaTrader', 'accounts') or self._defaults['mt_accounts']
+        return [dict(account) for account in accounts]
+
+    @property
+    def mt_terminal(self) -> Dict[str, Any]:
+        return self._get_nested_value('MetaTrader', 'Terminal') or self._defaults['mt_terminal']
+
+    @property
+    def mt_monitoring(self) -> Dict[str, Any]:
+        return self._get_nested_value('MetaTrader', 'Monitoring') or self._defaults['mt_monitoring']
+
     # Main config properties
     @property
     def disable_cache(self) -> bool:
         result = self._get_nested_value('disableCache')
         return result if result is not None else self._defaults['disable_cache']
 
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        return self._get_nested_value('Metrics') or self._defaults['metrics']
+
+    @property
+    def database(self) -> Dict[str, Any]:
+        return self._get_nested_value('Database') or self._defaults['database']
+
     # Timer properties
     @property
     def timer_start(self) -> Optional[str]:
@@ -380,10 +411,34 @@ class SettingsManager:
     def mt_symbols_blacklist(cls) -> List[str]:
         return cls.get_instance().mt_symbols_blacklist
 
+    @classmethod
+    def mt_order_retry(cls) -> Dict[str, Any]:
+        return cls.get_instance().mt_order_retry
+
+    @classmethod
+    def mt_accounts(cls) -> List[Dict[str, Any]]:
+        return cls.get_instance().mt_accounts
+
+    @classmethod
+    def mt_terminal(cls) -> Dict[str, Any]:
+        return cls.get_instance().mt_terminal
+
+    @classmethod
+    def mt_monitoring(cls) -> Dict[str, Any]:
+        return cls.get_instance().mt_monitoring
+
     @classmethod
     def disable_cache(cls) -> bool:
         return cls.get_instance().disable_cache
 
+    @classmethod
+    def metrics(cls) -> Dict[str, Any]:
+        return cls.get_instance().metrics
+
+    @classmethod
+    def database(cls) -> Dict[str, Any]:
+        return cls.get_instance().database
+
     @classmethod
     def timer_start(cls) -> Optional[str]:
         return cls.get_instance().timer_start
@@ -8,6 +8,7 @@ while using the new modular database architecture.
 from .database_manager import db_manager, DoMigrations as _DoMigrations
 from .repository.signal_repository import signal_repo as _signal_repo
 from .repository.position_repository import position_repo as _position_repo
+from .repository.take_profit_repository import take_profit_repo as _take_profit_repo
 
 # Legacy global variables for backward compatibility
 db_path = "telegramtrader.db"
@@ -30,6 +31,9 @@ position_columns = {
     "user_id": "INTEGER NOT NULL",
     "is_first": "BOOLEAN NULL",
     "is_second": "BOOLEAN NULL",
+    "closed_at": "INTEGER NULL",
+    "close_price": "REAL NULL",
+    "profit": "REAL NULL",
     "FOREIGN KEY(signal_id)": "REFERENCES Signals(id) ON DELETE CASCADE"
 }
 
@@ -49,14 +53,14 @@ def get_tp_levels(ticket_id):
     return _position_repo.get_tp_levels(ticket_id)
 
 
-def get_last_signal_positions_by_chatid(chat_id):
+def get_last_signal_positions_by_chatid(chat_id, user_id=None):
     """Read last signal positions from the database"""
-    return _position_repo.get_last_signal_positions_by_chat_id(chat_id)
+    return _position_repo.get_last_signal_positions_by_chat_id(chat_id, user_id)
 
 
-def get_last_signal_positions_by_chatid_and_messageid(chat_id, message_id):
+def get_last_signal_positions_by_chatid_and_messageid(chat_id, message_id, user_id=None):
     """Read last signal positions from the database"""
-    return _position_repo.get_last_signal_positions_by_chat_and_message(chat_id, message_id)
+    return _position_repo.get_last_signal_positions_by_chat_and_message(chat_id, message_id, user_id)
 
 
 def get_last_record(open_price, second_price, stop_loss, symbol):
@@ -88,9 +92,49 @@ def get_position_by_signal_id(signal_id, first=False, second=False):
     return position.to_dict() if position else None
 
 
-def get_signal_by_chat(chat_id, message_id):
+def get_managed_positions(ticket_ids):
+    """Get every position of the signals owning the given tickets, with signal prices and TP list"""
+    return _position_repo.get_managed_positions(ticket_ids)
+
+
+def get_take_profit_levels(signal_ids):
+    """Get signal_id -> TP prices in signal order"""
+    return _take_profit_repo.get_levels_by_signal(signal_ids)
+
+
+def save_take_profits(signal_id, takeProfits):
+    """Store the TP levels of a signal"""
+    _take_profit_repo.set_levels(signal_id, takeProfits)
+
+
+def mark_take_profits_hit(hits):
+    """Record reached TP levels as (signal_id, level_index, hit_at) rows"""
+    return _take_profit_repo.mark_hit(hits)
+
+
+def get_deal_watermark(user_id):
+    """Get the (deal_time, deal_ticket) of the last reconciled history deal of an account"""
+    return _position_repo.get_deal_watermark(user_id)
+
+
+def set_deal_watermark(user_id, deal_time, deal_ticket):
+    """Store the last reconciled history deal of an account"""
+    _position_repo.set_deal_watermark(user_id, deal_time, deal_ticket)
+
+
+def record_position_exits(user_id, exits, watermark=None):
+    """Add realized profit and close details of exit deals to positions, storing the deal watermark with them"""
+    _position_repo.record_exits(user_id, exits, watermark)
+
+
+def invalidate_cache():
+    """Drop cached signal, position and TP rows, e.g. after another process wrote them"""
+    _signal_repo.repository.invalidate_tables(("Signals", "Positions", "TakeProfits"))
+
+
+def get_signal_by_chat(chat_id, message_id, user_id=None):
     """Get signal by chat and message ID"""
-    return _signal_repo.get_signal_by_chat(chat_id, message_id)
+    return _signal_repo.get_signal_by_chat(chat_id, message_id, user_id)
 
 
 def get_signal_by_id(signal_id):
@@ -106,4 +150,7 @@ def update_stoploss(signal_id, stoploss):
 
 def update_takeProfits(signal_id, takeProfits):
     """Update take profits for signal"""
-    _signal_repo.update_take_profits(signal_id, takeProfits)
\ No newline at end of file
+    # The tp_list column and the TakeProfits rows change in one transaction
+    with _signal_repo.repository.connections.writer():
+        _signal_repo.update_take_profits(signal_id, takeProfits)
+        _take_profit_repo.set_levels(signal_id, takeProfits)
\ No newline at end of file
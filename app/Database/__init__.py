@@ -8,8 +8,13 @@ modern repository pattern and legacy compatibility.
 from .database_manager import DatabaseManager, db_manager
 from .repository.signal_repository import SignalRepository, signal_repo
 from .repository.position_repository import PositionRepository, position_repo
+from .repository.take_profit_repository import TakeProfitRepository, take_profit_repo
 from .models import SignalModel, PositionModel, DatabaseSchema
 from .repository.Repository import SQLiteRepository
+from .connection import ConnectionManager, get_connection_manager, close_all
+from .unit_of_work import UnitOfWork, GroupCommitWriter
+from .async_repository import (AsyncRepository, DatabaseThread, database_thread, async_signal_repo,
+                               async_position_repo, async_take_profit_repo, async_migrations)
 
 # Legacy imports for backward compatibility
 from .Migrations import *
@@ -19,15 +24,29 @@ __all__ = [
     'DatabaseManager',
     'SignalRepository',
     'PositionRepository',
+    'TakeProfitRepository',
     'SignalModel',
     'PositionModel',
     'DatabaseSchema',
     'SQLiteRepository',
+    'ConnectionManager',
+    'get_connection_manager',
+    'close_all',
+    'UnitOfWork',
+    'GroupCommitWriter',
+    'AsyncRepository',
+    'DatabaseThread',
 
     # Global instances
     'db_manager',
     'signal_repo',
     'position_repo',
+    'take_profit_repo',
+    'database_thread',
+    'async_signal_repo',
+    'async_position_repo',
+    'async_take_profit_repo',
+    'async_migrations',
 
     # Legacy functions (from Migrations)
     'DoMigrations',
@@ -39,6 +58,14 @@ __all__ = [
     'get_signal_positions_by_positionId',
     'get_positions_by_signalid',
     'get_position_by_signal_id',
+    'get_managed_positions',
+    'get_take_profit_levels',
+    'save_take_profits',
+    'mark_take_profits_hit',
+    'get_deal_watermark',
+    'set_deal_watermark',
+    'record_position_exits',
+    'invalidate_cache',
     'get_signal_by_chat',
     'get_signal_by_id',
     'update_stoploss',
@@ -0,0 +1,82 @@
+"""Async access to the repositories through a dedicated database thread"""
+
+import asyncio
+import functools
+import threading
+import concurrent.futures
+from typing import Any, Callable
+
+from .repository.signal_repository import signal_repo
+from .repository.position_repository import position_repo
+from .repository.take_profit_repository import take_profit_repo
+from . import Migrations
+
+
+class DatabaseThread:
+    """
+    Runs database calls one at a time on its own thread.
+
+    Coroutines await the result instead of calling sqlite3 on the event loop,
+    so a slow disk delays only the awaiting handler. The thread is started on
+    first use and again after shutdown.
+    """
+
+    def __init__(self, name: str = "database"):
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=self.name)
+            return self._executor
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call on the database thread and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        """Finish queued calls and stop the thread"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+class AsyncRepository:
+    """
+    Awaitable view of a repository with the same query surface.
+
+    Every public method of the wrapped object becomes a coroutine running on
+    the database thread, e.g. ``await async_signal_repo.get_signal_by_chat(chat_id, message_id)``.
+    """
+
+    def __init__(self, repository: Any, thread: DatabaseThread):
+        self._repository = repository
+        self._thread = thread
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._repository, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def call(*args, **kwargs):
+            return await self._thread.run(attribute, *args, **kwargs)
+
+        # Cache the coroutine function so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
+
+
+# Database thread shared by the async views of this process
+database_thread = DatabaseThread()
+
+async_signal_repo = AsyncRepository(signal_repo, database_thread)
+async_position_repo = AsyncRepository(position_repo, database_thread)
+async_take_profit_repo = AsyncRepository(take_profit_repo, database_thread)
+# Legacy functions, e.g. await async_migrations.get_signal_by_chat(chat_id, message_id)
+async_migrations = AsyncRepository(Migrations, database_thread)
@@ -0,0 +1,127 @@
+"""Persistent SQLite connections shared by the repositories of a database file"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from Configure.metrics.Metrics import metrics
+
+
+class ConnectionManager:
+    """
+    One writer connection and one reader connection per thread for a database file.
+
+    Connections are opened once in WAL mode, so readers never wait for the
+    writer, and keep their prepared statement cache between calls. Writes are
+    serialized through a reentrant lock so a thread can nest repository calls
+    inside one transaction.
+    """
+
+    def __init__(self, db_path: str, mmap_size: int = 268435456, cached_statements: int = 256,
+                 busy_timeout: float = 5.0):
+        self.db_path = db_path
+        self.mmap_size = int(mmap_size)
+        self.cached_statements = int(cached_statements)
+        self.busy_timeout = float(busy_timeout)
+
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0  # nested writer() blocks of the thread holding the lock
+        self._local = threading.local()
+        self._readers: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, db_path: str, config: Optional[Dict[str, Any]] = None) -> 'ConnectionManager':
+        """Create a manager from the Database settings section"""
+        config = config or {}
+        return cls(
+            db_path,
+            mmap_size=config.get('mmapSize', 268435456),
+            cached_statements=config.get('cachedStatements', 256),
+            busy_timeout=config.get('busyTimeout', 5.0)
+        )
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={self.mmap_size}')
+        if metrics.enabled:
+            conn.set_trace_callback(metrics.count_query)
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Exclusive use of the writer connection; commits on success, rolls back on error"""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open()
+            conn = self._writer
+            # Only the outermost block commits; sqlite3 opens the transaction lazily on the
+            # first write, so conn.in_transaction cannot tell an outer block that did not write yet
+            outermost = self._write_depth == 0
+            self._write_depth += 1
+            try:
+                yield conn
+                if outermost:
+                    conn.commit()
+            except Exception:
+                if outermost:
+                    conn.rollback()
+                raise
+            finally:
+                self._write_depth -= 1
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """The calling thread's reader connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+            with self._lock:
+                # Executor threads come and go; close the readers of the ones that exited
+                for thread in [thread for thread in self._readers if not thread.is_alive()]:
+                    self._readers.pop(thread).close()
+                self._readers[threading.current_thread()] = conn
+        yield conn
+
+    def close(self) -> None:
+        """Close every connection; they are reopened on next use"""
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._lock:
+            for conn in self._readers.values():
+                conn.close()
+            self._readers.clear()
+        self._local = threading.local()
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: str) -> ConnectionManager:
+    """Get the connection manager shared by every repository of a database file"""
+    with _managers_lock:
+        manager = _managers.get(db_path)
+        if manager is None:
+            from Configure.settings.Settings import Settings
+            manager = _managers[db_path] = ConnectionManager.from_config(db_path, Settings.database())
+        return manager
+
+
+def close_all() -> None:
+    """Close the connections of every database file"""
+    from .unit_of_work import stop_group_writers
+    from .async_repository import database_thread
+    stop_group_writers()
+    database_thread.shutdown()
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.close()
@@ -4,6 +4,8 @@ from typing import Optional
 from loguru import logger
 from .repository.signal_repository import SignalRepository
 from .repository.position_repository import PositionRepository
+from .connection import get_connection_manager
+from . import schema_migrations
 from Configure.settings.Settings import Settings
 
 class DatabaseManager:
@@ -27,7 +29,8 @@ class DatabaseManager:
             logger.info("Initializing database tables...")
             self.signal_repo.create_table()
             self.position_repo.create_table()
-            logger.success("Database tables created successfully")
+            version = schema_migrations.migrate(get_connection_manager(self.db_path))
+            logger.success(f"Database tables created successfully (schema version {version})")
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
@@ -28,9 +28,29 @@ class DatabaseSchema:
         "user_id": "INTEGER NOT NULL",
         "is_first": "BOOLEAN NULL",
         "is_second": "BOOLEAN NULL",
+        "closed_at": "INTEGER NULL",
+        "close_price": "REAL NULL",
+        "profit": "REAL NULL",
         "FOREIGN KEY(signal_id)": "REFERENCES Signals(id) ON DELETE CASCADE"
     }
 
+    # Take profit levels of signals, one row per level
+    TAKE_PROFIT_COLUMNS = {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "signal_id": "INTEGER NOT NULL",
+        "level_index": "INTEGER NOT NULL",
+        "price": "REAL NOT NULL",
+        "hit_at": "INTEGER NULL",
+        "FOREIGN KEY(signal_id)": "REFERENCES Signals(id) ON DELETE CASCADE"
+    }
+
+    # Last history deal reconciled per account
+    DEAL_WATERMARK_COLUMNS = {
+        "user_id": "INTEGER PRIMARY KEY",
+        "deal_time": "INTEGER NOT NULL",
+        "deal_ticket": "INTEGER NOT NULL"
+    }
+
 
 class SignalModel:
     """Signal data model"""
@@ -89,18 +109,25 @@ class PositionModel:
         self.user_id = data.get('user_id')
         self.is_first = data.get('is_first')
         self.is_second = data.get('is_second')
+        self.closed_at = data.get('closed_at')
+        self.close_price = data.get('close_price')
+        self.profit = data.get('profit')
 
     @classmethod
     def from_tuple(cls, data_tuple: tuple) -> 'PositionModel':
         """Create PositionModel from database tuple"""
-        return cls({
+        data = {
             "id": data_tuple[0],
             "signal_id": data_tuple[1],
             "position_id": data_tuple[2],
             "user_id": data_tuple[3],
             "is_first": data_tuple[4],
             "is_second": data_tuple[5]
-        })
+        }
+        # Columns added after the first release are missing from older rows
+        if len(data_tuple) >= 9:
+            data.update(closed_at=data_tuple[6], close_price=data_tuple[7], profit=data_tuple[8])
+        return cls(data)
 
     def to_dict(self) -> Dict:
         """Convert to dictionary"""
@@ -110,5 +137,8 @@ class PositionModel:
             "position_id": self.position_id,
             "user_id": self.user_id,
             "is_first": self.is_first,
-            "is_second": self.is_second
+            "is_second": self.is_second,
+            "closed_at": self.closed_at,
+            "close_price": self.close_price,
+            "profit": self.profit
         }
\ No newline at end of file
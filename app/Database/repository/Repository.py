@@ -1,25 +1,103 @@
-import sqlite3
-from typing import List, Tuple, Any, Dict, TypeVar, Generic, Optional
+import re
+import threading
+from typing import FrozenSet, List, Tuple, Any, Dict, TypeVar, Generic, Optional, Union
 
-from .cache import LRUCache
+from ..connection import get_connection_manager
+from .cache import get_shared_cache
 
 T = TypeVar('T')
 
+_TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+(\w+)', re.IGNORECASE)
+
+
+def referenced_tables(query: str) -> FrozenSet[str]:
+    """Lower-cased names of the tables a statement reads or writes, used as cache tags"""
+    return frozenset(name.lower() for name in _TABLE_PATTERN.findall(query))
+
+
+class Query:
+    """
+    A named SQL statement.
+
+    Queries are registered once by name, so cached results are keyed by
+    (name, params) without formatting or hashing the SQL text on every call,
+    and hits and misses are counted per query.
+    """
+
+    __slots__ = ('name', 'sql', 'tables', 'hits', 'misses')
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.tables = referenced_tables(sql)
+        self.hits = 0
+        self.misses = 0
+        with _queries_lock:
+            registered = _queries.setdefault(name, self)
+        if registered.sql != sql:
+            raise ValueError(f"Query {name} is already registered with different SQL")
+
+    @classmethod
+    def from_sql(cls, sql: str) -> 'Query':
+        """Registered query of an unnamed SQL string, created on first use"""
+        query = _adhoc_queries.get(sql)
+        if query is None:
+            with _queries_lock:
+                query = _adhoc_queries.get(sql)
+                if query is None:
+                    query = _adhoc_queries[sql] = cls(f"adhoc:{len(_adhoc_queries) + 1}", sql)
+        return query
+
+    def __repr__(self) -> str:
+        return f"Query({self.name!r})"
+
+
+_queries: Dict[str, Query] = {}
+_adhoc_queries: Dict[str, Query] = {}
+_queries_lock = threading.RLock()
+
+
+def query_stats() -> Dict[str, Dict[str, Any]]:
+    """Cache hits, misses and hit rate of every query that was run with the cache enabled"""
+    stats = {}
+    for name, query in list(_queries.items()):
+        total = query.hits + query.misses
+        if total:
+            stats[name] = {'hits': query.hits, 'misses': query.misses, 'hit_rate': query.hits / total}
+    return stats
+
 
 class SQLiteRepository(Generic[T]):
+    """
+    Table access with a cache shared by the repositories of the database file.
+
+    Lookups that find nothing (a ticket opened by hand or by another bot has
+    no signal) are cached too, for negative_ttl seconds, and dropped as soon
+    as a row is inserted into a table they read.
+    """
+
     def __init__(self, db_path: str, table_name: str, enable_cache: bool = True,
-                 cache_size: int = 1000, default_ttl: float = 300.0):
+                 cache_size: int = 1000, default_ttl: float = 300.0, negative_ttl: float = 30.0):
         self.db_path = db_path
         self.table_name = table_name
         self.enable_cache = enable_cache
+        self.negative_ttl = negative_ttl
+        self.connections = get_connection_manager(db_path)
+
+        self.table_tag = table_name.lower()
 
         if enable_cache:
-            self.cache = LRUCache(max_size=cache_size, default_ttl=default_ttl)
+            self.cache = get_shared_cache(db_path, max_size=cache_size, default_ttl=default_ttl)
         else:
             self.cache = None
-    
+
     def _connect(self):
-        return sqlite3.connect(self.db_path)
+        """Writer connection of the database, committed when the block exits"""
+        return self.connections.writer()
+
+    def _read(self):
+        """Reader connection of the calling thread"""
+        return self.connections.reader()
     
     def create_table(self, columns: Dict[str, str]):
         with self._connect() as conn:
@@ -27,7 +105,6 @@ class SQLiteRepository(Generic[T]):
             columns_def = ', '.join(f'{col} {dtype}' for col, dtype in columns.items())
             query = f'CREATE TABLE IF NOT EXISTS {self.table_name} ({columns_def})'
             cursor.execute(query)
-            conn.commit()
     
     def insert(self, data: Dict[str, Any]):
         result = None
@@ -40,7 +117,6 @@ class SQLiteRepository(Generic[T]):
             values = tuple(data.values())
             query = f'INSERT INTO {self.table_name} ({columns}) VALUES ({placeholders})'
             cursor.execute(query, values)
-            conn.commit()
             result = cursor.lastrowid
 
             # Immediately fetch the inserted record for caching
@@ -50,15 +126,15 @@ class SQLiteRepository(Generic[T]):
 
         # Update cache with the inserted record (write-through caching)
         if self.cache and inserted_record:
-            cache_key = f"{self.table_name}:get_by_id:{result}"
-            self.cache.put(cache_key, inserted_record)
-            # Also invalidate any query caches that might be affected
-            self.cache.invalidate_pattern(f"{self.table_name}:query:")
+            cache_key = (self.table_name, 'get_by_id', result)
+            self.cache.put(cache_key, inserted_record, tags=(self._record_tag(result), f"{self.table_tag}#*"))
+            # Also invalidate every query that read this table, in any repository
+            self.cache.invalidate_tags((self.table_tag,))
 
         return result
     
     def get_all(self) -> List[Tuple]:
-        with self._connect() as conn:
+        with self._read() as conn:
             cursor = conn.cursor()
             query = f'SELECT * FROM {self.table_name}'
             cursor.execute(query)
@@ -66,20 +142,25 @@ class SQLiteRepository(Generic[T]):
     
     def get_by_id(self, record_id: Any) -> Tuple:
         if self.cache:
-            cache_key = f"{self.table_name}:get_by_id:{record_id}"
+            cache_key = (self.table_name, 'get_by_id', record_id)
             cached_result = self.cache.get(cache_key)
             if cached_result is not None:
-                return cached_result
+                # An empty row records that the id was not found
+                return cached_result or None
 
         result = None
-        with self._connect() as conn:
+        with self._read() as conn:
             cursor = conn.cursor()
             query = f'SELECT * FROM {self.table_name} WHERE id = ?'
             cursor.execute(query, (record_id,))
             result = cursor.fetchone()
 
-        if self.cache and result is not None:
-            self.cache.put(cache_key, result)
+        if self.cache:
+            if result is not None:
+                self.cache.put(cache_key, result, tags=(self._record_tag(record_id), f"{self.table_tag}#*"))
+            else:
+                self.cache.put(cache_key, (), ttl_seconds=self.negative_ttl,
+                               tags=(self._record_tag(record_id), self.table_tag))
 
         return result
     
@@ -90,51 +171,77 @@ class SQLiteRepository(Generic[T]):
             values = tuple(data.values()) + (record_id,)
             query = f'UPDATE {self.table_name} SET {set_clause} WHERE id = ?'
             cursor.execute(query, values)
-            conn.commit()
 
-        # Invalidate cache for this table and specific record
+        # Invalidate the record and every query that read this table
         if self.cache:
-            self.cache.invalidate_pattern(f"{self.table_name}:")
-            self.cache.invalidate(f"{self.table_name}:get_by_id:{record_id}")
+            self.cache.invalidate_tags((self.table_tag, self._record_tag(record_id)))
     
     def delete(self, record_id: Any):
         with self._connect() as conn:
             cursor = conn.cursor()
             query = f'DELETE FROM {self.table_name} WHERE id = ?'
             cursor.execute(query, (record_id,))
-            conn.commit()
 
-        # Invalidate cache for this table and specific record
+        # Invalidate the record and every query that read this table
         if self.cache:
-            self.cache.invalidate_pattern(f"{self.table_name}:")
-            self.cache.invalidate(f"{self.table_name}:get_by_id:{record_id}")
+            self.cache.invalidate_tags((self.table_tag, self._record_tag(record_id)))
     
-    def execute_query(self, query: str, params: Tuple = ()) -> List[Tuple]:
+    def execute_query(self, query: Union[Query, str], params: Tuple = ()) -> Tuple[Tuple, ...]:
+        """Run a read query; rows are returned as an immutable tuple shared with the cache"""
+        if not isinstance(query, Query):
+            query = Query.from_sql(query)
+        params = tuple(params)
+
         if self.cache:
-            # Create a cache key from query and params
-            cache_key = f"{self.table_name}:query:{hash((query, str(params)))}"
+            cache_key = (query.name, params)
             cached_result = self.cache.get(cache_key)
             if cached_result is not None:
+                query.hits += 1
                 return cached_result
+            query.misses += 1
 
-        result = []
-        with self._connect() as conn:
+        with self._read() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, params)
-            result = cursor.fetchall()
+            cursor.execute(query.sql, params)
+            result = tuple(cursor.fetchall())
 
         if self.cache:
-            self.cache.put(cache_key, result)
+            self.cache.put(cache_key, result, ttl_seconds=None if result else self.negative_ttl, tags=query.tables)
 
         return result
 
+    def execute_many(self, query: Union[Query, str], rows: List[Tuple]) -> int:
+        """Run a write statement for every parameter row in one transaction; returns the affected row count"""
+        if not isinstance(query, Query):
+            query = Query.from_sql(query)
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query.sql, rows)
+            count = cursor.rowcount
+
+        self.invalidate_tables(query.tables | {self.table_tag})
+        return count
+
+    def invalidate_tables(self, tables=None) -> None:
+        """
+        Drop cached queries and records of the given tables (this repository's table if omitted),
+        for writes that may have changed any row of them.
+        """
+        if self.cache:
+            tables = [table.lower() for table in ((self.table_tag,) if tables is None else tables)]
+            self.cache.invalidate_tags(tables + [f"{table}#*" for table in tables])
+
+    def _record_tag(self, record_id: Any) -> str:
+        # Records are also tagged "<table>#*", dropped by writes to any row of the table
+        return f"{self.table_tag}#{record_id}"
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         if self.cache:
-            return self.cache.get_stats()
+            return dict(self.cache.get_stats(), queries=query_stats())
         return {"enabled": False}
 
     def clear_cache(self) -> None:
-        """Clear all cache entries for this repository"""
+        """Clear all cache entries of this database file"""
         if self.cache:
             self.cache.clear()
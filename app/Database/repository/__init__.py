@@ -3,11 +3,14 @@
 from .Repository import SQLiteRepository
 from .signal_repository import SignalRepository, signal_repo
 from .position_repository import PositionRepository, position_repo
+from .take_profit_repository import TakeProfitRepository, take_profit_repo
 
 __all__ = [
     'SQLiteRepository',
     'SignalRepository',
     'signal_repo',
     'PositionRepository',
-    'position_repo'
+    'position_repo',
+    'TakeProfitRepository',
+    'take_profit_repo'
 ]
\ No newline at end of file
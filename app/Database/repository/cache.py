@@ -1,22 +1,24 @@
 """Database caching utilities for improved performance"""
 
 import time
+import heapq
 import threading
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterable, List, Optional, Set, Tuple
 from collections import OrderedDict
 
 
 class CacheEntry:
     """Represents a cached item with TTL"""
 
-    def __init__(self, data: Any, ttl_seconds: float):
+    def __init__(self, data: Any, ttl_seconds: float, tags: Iterable[str] = (), now: Optional[float] = None):
         self.data = data
-        self.expires_at = time.time() + ttl_seconds
-        self.created_at = time.time()
+        self.tags = frozenset(tags)
+        self.created_at = time.time() if now is None else now
+        self.expires_at = self.created_at + ttl_seconds
 
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """Check if the cache entry has expired"""
-        return time.time() > self.expires_at
+        return (time.time() if now is None else now) > self.expires_at
 
     def get_age(self) -> float:
         """Get the age of the cache entry in seconds"""
@@ -24,70 +26,122 @@ class CacheEntry:
 
 
 class LRUCache:
-    """Thread-safe LRU cache with TTL support"""
+    """
+    Thread-safe LRU cache with TTL support.
 
-    def __init__(self, max_size: int = 1000, default_ttl: float = 300.0):
+    Keys are indexed by their tags, so invalidating a tag only touches the
+    entries that carry it, and expiry times are kept in a heap so expired
+    entries are dropped in expiry order without scanning the cache.
+    """
+
+    def __init__(self, max_size: int = 1000, default_ttl: float = 300.0, clock: Callable[[], float] = time.time):
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self.cache = OrderedDict()
+        self.clock = clock
+        self.cache: 'OrderedDict[str, CacheEntry]' = OrderedDict()
         self.lock = threading.RLock()
+        self._tags: Dict[str, Set[str]] = {}
+        # (expires_at, sequence, key, entry); entries replaced or removed since are skipped when popped
+        self._expiry: List[Tuple[float, int, str, CacheEntry]] = []
+        self._sequence = 0
         self._hits = 0
         self._misses = 0
 
     def get(self, key: str) -> Optional[Any]:
         """Get item from cache"""
         with self.lock:
-            if key in self.cache:
-                entry = self.cache[key]
-                if not entry.is_expired():
-                    # Move to end (most recently used)
-                    self.cache.move_to_end(key)
-                    self._hits += 1
-                    return entry.data
-                else:
-                    # Remove expired entry
-                    del self.cache[key]
+            self._expire(self.clock())
+            entry = self.cache.get(key)
+            if entry is not None:
+                # Move to end (most recently used)
+                self.cache.move_to_end(key)
+                self._hits += 1
+                return entry.data
 
             self._misses += 1
             return None
 
-    def put(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
-        """Put item in cache"""
+    def put(self, key: str, value: Any, ttl_seconds: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        """
+        Put item in cache
+
+        Args:
+            tags: Dependencies of the item (e.g. the tables a query read); invalidating
+                any of them drops the item
+        """
         with self.lock:
-            if key in self.cache:
-                del self.cache[key]
+            now = self.clock()
+            self._expire(now)
+            self._remove(key)
 
             ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl
-            entry = CacheEntry(value, ttl)
+            entry = CacheEntry(value, ttl, tags, now)
 
             self.cache[key] = entry
-            self.cache.move_to_end(key)
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._sequence += 1
+            heapq.heappush(self._expiry, (entry.expires_at, self._sequence, key, entry))
 
             # Remove oldest items if cache is full
             while len(self.cache) > self.max_size:
-                self.cache.popitem(last=False)
+                self._remove(next(iter(self.cache)))
+
+            # Drop heap records of replaced and invalidated entries once they dominate
+            if len(self._expiry) > 2 * len(self.cache) + 64:
+                self._expiry = [item for item in self._expiry if self.cache.get(item[2]) is item[3]]
+                heapq.heapify(self._expiry)
 
     def invalidate(self, key: str) -> None:
         """Remove item from cache"""
         with self.lock:
-            if key in self.cache:
-                del self.cache[key]
+            self._remove(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Invalidate all items depending on any of the tags"""
+        with self.lock:
+            removed = 0
+            for tag in set(tags):
+                for key in self._tags.pop(tag, ()):
+                    if self._remove(key):
+                        removed += 1
+            return removed
 
     def invalidate_pattern(self, pattern: str) -> int:
-        """Invalidate all keys matching pattern"""
+        """Invalidate all keys matching pattern (scans every key, prefer invalidate_tags)"""
         with self.lock:
             keys_to_remove = [k for k in self.cache.keys() if pattern in k]
             for key in keys_to_remove:
-                del self.cache[key]
+                self._remove(key)
             return len(keys_to_remove)
 
     def clear(self) -> None:
         """Clear all cache entries"""
         with self.lock:
             self.cache.clear()
+            self._tags.clear()
+            self._expiry.clear()
             self._hits = 0
             self._misses = 0
 
+    def _remove(self, key: str) -> bool:
+        entry = self.cache.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def _expire(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] < now:
+            _, _, key, entry = heapq.heappop(self._expiry)
+            if self.cache.get(key) is entry:
+                self._remove(key)
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         with self.lock:
@@ -99,5 +153,25 @@ class LRUCache:
                 'hits': self._hits,
                 'misses': self._misses,
                 'hit_rate': hit_rate,
-                'default_ttl': self.default_ttl
-            }
\ No newline at end of file
+                'default_ttl': self.default_ttl,
+                'tags': len(self._tags)
+            }
+
+
+# Caches shared by every repository of a database file
+_shared_caches: Dict[str, LRUCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_cache(db_path: str, max_size: int = 1000, default_ttl: float = 300.0) -> LRUCache:
+    """
+    Get the cache shared by every repository of a database file.
+
+    Sharing lets a write to one table invalidate the cached joins of other
+    repositories that read it. The first repository sets the size and TTL.
+    """
+    with _shared_caches_lock:
+        cache = _shared_caches.get(db_path)
+        if cache is None:
+            cache = _shared_caches[db_path] = LRUCache(max_size=max_size, default_ttl=default_ttl)
+        return cache
@@ -1,15 +1,111 @@
 """Position repository for database operations on trading positions"""
 
-from typing import List, Dict, Optional, Any
-from .Repository import SQLiteRepository
+import json
+from typing import List, Dict, Optional, Any, Tuple
+from .Repository import Query, SQLiteRepository
 from ..models import PositionModel
 
 
+POSITIONS_BY_SIGNAL_ID = Query("positions.by_signal_id", """
+    SELECT *
+    FROM positions
+    WHERE signal_id = ?
+    ORDER BY id DESC
+    LIMIT 2
+""")
+
+POSITION_BY_SIGNAL_ID = Query("positions.by_signal_id_and_leg", """
+    SELECT *
+    FROM positions
+    WHERE signal_id = ? AND is_first = ? AND is_second = ?
+    ORDER BY id DESC
+    LIMIT 1
+""")
+
+SIGNAL_POSITIONS_BY_POSITION_ID = Query("positions.siblings", """
+    SELECT *
+    FROM positions
+    WHERE signal_id = (SELECT signal_id FROM positions WHERE position_id = ?)
+    ORDER BY id DESC
+    LIMIT 2
+""")
+
+LAST_SIGNAL_POSITIONS_BY_CHAT = Query("positions.last_by_chat", """
+    SELECT p.position_id
+    FROM positions p
+    INNER JOIN signals s ON p.signal_id = s.id
+    WHERE s.telegram_message_chatid = ?
+    ORDER BY p.id DESC
+    LIMIT 2
+""")
+
+LAST_SIGNAL_POSITIONS_BY_MESSAGE = Query("positions.last_by_message", """
+    SELECT p.position_id
+    FROM positions p
+    INNER JOIN signals s ON p.signal_id = s.id
+    WHERE s.telegram_message_chatid = ? AND s.telegram_message_id = ?
+    ORDER BY p.id DESC
+    LIMIT 2
+""")
+
+LAST_SIGNAL_POSITIONS_BY_CHAT_AND_USER = Query("positions.last_by_chat_and_user", """
+    SELECT p.position_id
+    FROM positions p
+    INNER JOIN signals s ON p.signal_id = s.id
+    WHERE s.telegram_message_chatid = ? AND p.user_id = ?
+    ORDER BY p.id DESC
+    LIMIT 2
+""")
+
+LAST_SIGNAL_POSITIONS_BY_MESSAGE_AND_USER = Query("positions.last_by_message_and_user", """
+    SELECT p.position_id
+    FROM positions p
+    INNER JOIN signals s ON p.signal_id = s.id
+    WHERE s.telegram_message_chatid = ? AND s.telegram_message_id = ? AND p.user_id = ?
+    ORDER BY p.id DESC
+    LIMIT 2
+""")
+
+TP_LEVELS = Query("positions.tp_levels", """
+    SELECT price
+    FROM TakeProfits
+    WHERE signal_id = (SELECT signal_id FROM positions WHERE position_id = ? LIMIT 1)
+    ORDER BY level_index
+""")
+
+# Position ids are passed as one JSON array so the statement does not depend on their count
+MANAGED_POSITIONS = Query("positions.managed", """
+    SELECT p.position_id, p.signal_id, p.is_first, p.is_second,
+           s.open_price, s.second_price
+    FROM positions p
+    INNER JOIN signals s ON p.signal_id = s.id
+    WHERE p.signal_id IN (SELECT signal_id FROM positions WHERE position_id IN (SELECT value FROM json_each(?)))
+    ORDER BY p.id DESC
+""")
+
+RECORD_EXITS = Query("positions.record_exits", """
+    UPDATE positions
+    SET profit = COALESCE(profit, 0) + ?,
+        close_price = ?,
+        closed_at = COALESCE(?, closed_at)
+    WHERE position_id = ? AND user_id = ?
+""")
+
+DEAL_WATERMARK = Query("deal_watermarks.get",
+                       "SELECT deal_time, deal_ticket FROM DealWatermarks WHERE user_id = ?")
+
+SET_DEAL_WATERMARK = Query("deal_watermarks.set", """
+    INSERT INTO DealWatermarks (user_id, deal_time, deal_ticket) VALUES (?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET deal_time = excluded.deal_time, deal_ticket = excluded.deal_ticket
+""")
+
+
 class PositionRepository:
     """Repository for position-related database operations"""
 
     def __init__(self, db_path: str = "telegramtrader.db", enable_cache: bool = True):
         self.repository = SQLiteRepository(db_path, "Positions", enable_cache=enable_cache)
+        self.watermarks = SQLiteRepository(db_path, "DealWatermarks", enable_cache=False)
 
     def create_table(self) -> None:
         """Create the positions table"""
@@ -27,80 +123,89 @@ class PositionRepository:
 
     def get_positions_by_signal_id(self, signal_id: int) -> List[PositionModel]:
         """Get all positions for a signal"""
-        query = """
-            SELECT *
-            FROM positions
-            WHERE signal_id = ?
-            ORDER BY id DESC
-            LIMIT 2
-        """
-        results = self.repository.execute_query(query, (signal_id,))
+        results = self.repository.execute_query(POSITIONS_BY_SIGNAL_ID, (signal_id,))
         return [PositionModel.from_tuple(result) for result in results]
 
     def get_position_by_signal_id(self, signal_id: int, first: bool = False, second: bool = False) -> Optional[PositionModel]:
         """Get position by signal ID with first/second filter"""
-        query = """
-            SELECT *
-            FROM positions
-            WHERE signal_id = ? AND is_first = ? AND is_second = ?
-            ORDER BY id DESC
-            LIMIT 1
-        """
-        results = self.repository.execute_query(query, (signal_id, first, second))
+        results = self.repository.execute_query(POSITION_BY_SIGNAL_ID, (signal_id, first, second))
         if not results:
             return None
         return PositionModel.from_tuple(results[0])
 
     def get_signal_positions_by_position_id(self, position_id: int) -> List[PositionModel]:
         """Get all positions for the same signal as the given position"""
-        query = """
-            SELECT *
-            FROM positions
-            WHERE signal_id = (SELECT signal_id FROM positions WHERE position_id = ?)
-            ORDER BY id DESC
-            LIMIT 2
-        """
-        results = self.repository.execute_query(query, (position_id,))
+        results = self.repository.execute_query(SIGNAL_POSITIONS_BY_POSITION_ID, (position_id,))
         return [PositionModel.from_tuple(result) for result in results]
 
-    def get_last_signal_positions_by_chat_id(self, chat_id: int) -> List[int]:
-        """Get position IDs for the last signal in a chat"""
-        query = """
-            SELECT p.position_id
-            FROM positions p
-            INNER JOIN signals s ON p.signal_id = s.id
-            WHERE s.telegram_message_chatid = ?
-            ORDER BY p.id DESC
-            LIMIT 2
-        """
-        results = self.repository.execute_query(query, (chat_id,))
+    def get_last_signal_positions_by_chat_id(self, chat_id: int, user_id: Optional[int] = None) -> List[int]:
+        """Get position IDs for the last signal in a chat, only those of one account if user_id is given"""
+        if user_id is None:
+            results = self.repository.execute_query(LAST_SIGNAL_POSITIONS_BY_CHAT, (chat_id,))
+        else:
+            results = self.repository.execute_query(LAST_SIGNAL_POSITIONS_BY_CHAT_AND_USER, (chat_id, user_id))
         return [result[0] for result in results]
 
-    def get_last_signal_positions_by_chat_and_message(self, chat_id: int, message_id: int) -> List[int]:
-        """Get position IDs for a specific signal by chat and message"""
-        query = """
-            SELECT p.position_id
-            FROM positions p
-            INNER JOIN signals s ON p.signal_id = s.id
-            WHERE s.telegram_message_chatid = ? AND s.telegram_message_id = ?
-            ORDER BY p.id DESC
-            LIMIT 2
-        """
-        results = self.repository.execute_query(query, (chat_id, message_id))
+    def get_last_signal_positions_by_chat_and_message(self, chat_id: int, message_id: int,
+                                                      user_id: Optional[int] = None) -> List[int]:
+        """Get position IDs for a specific signal by chat and message, only those of one account if user_id is given"""
+        if user_id is None:
+            results = self.repository.execute_query(LAST_SIGNAL_POSITIONS_BY_MESSAGE, (chat_id, message_id))
+        else:
+            results = self.repository.execute_query(
+                LAST_SIGNAL_POSITIONS_BY_MESSAGE_AND_USER, (chat_id, message_id, user_id))
         return [result[0] for result in results]
 
     def get_tp_levels(self, position_id: int) -> Optional[List[float]]:
         """Get take profit levels for a position"""
-        query = """
-            SELECT s.tp_list
-            FROM positions p
-            INNER JOIN signals s ON p.signal_id = s.id
-            WHERE p.position_id = ?
-        """
-        results = self.repository.execute_query(query, (position_id,))
+        results = self.repository.execute_query(TP_LEVELS, (position_id,))
         if not results:
             return None
-        return [float(x) for x in results[0][0].split(',')]
+        return [result[0] for result in results]
+
+    def get_managed_positions(self, position_ids: List[int]) -> Tuple[Tuple, ...]:
+        """
+        Get every position of the signals owning the given positions, joined with
+        the signal prices, newest position first.
+
+        Returns:
+            Rows of (position_id, signal_id, is_first, is_second, open_price, second_price)
+        """
+        if not position_ids:
+            return ()
+        return self.repository.execute_query(MANAGED_POSITIONS, (json.dumps(sorted(map(int, position_ids))),))
+
+    def record_exits(self, user_id: int, exits: List[Tuple], watermark: Optional[Tuple[int, int]] = None) -> int:
+        """
+        Apply exit deals to positions of an account.
+
+        Args:
+            user_id: Account login
+            exits: Rows of (position_id, realized profit, close price, closed_at).
+                Profit is added to what earlier partial closes realized;
+                closed_at is None while the position is still partly open.
+            watermark: (deal_time, deal_ticket) of the last deal read, stored in
+                the same transaction so a deal is never added twice
+
+        Returns:
+            Number of updated positions
+        """
+        rows = [(profit, close_price, closed_at, position_id, user_id)
+                for position_id, profit, close_price, closed_at in exits]
+        with self.repository.connections.writer():
+            count = self.repository.execute_many(RECORD_EXITS, rows) if rows else 0
+            if watermark is not None:
+                self.set_deal_watermark(user_id, *watermark)
+        return count
+
+    def get_deal_watermark(self, user_id: int) -> Optional[Tuple[int, int]]:
+        """Get (deal_time, deal_ticket) of the last reconciled deal of an account"""
+        results = self.watermarks.execute_query(DEAL_WATERMARK, (user_id,))
+        return tuple(results[0]) if results else None
+
+    def set_deal_watermark(self, user_id: int, deal_time: int, deal_ticket: int) -> None:
+        """Store the last reconciled deal of an account"""
+        self.watermarks.execute_many(SET_DEAL_WATERMARK, [(user_id, deal_time, deal_ticket)])
 
     def get_all_positions(self) -> List[PositionModel]:
         """Get all positions"""
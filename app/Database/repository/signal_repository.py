@@ -1,10 +1,45 @@
 """Signal repository for database operations on trading signals"""
 
 from typing import List, Dict, Optional, Any
-from .Repository import SQLiteRepository
+from .Repository import Query, SQLiteRepository
 from ..models import SignalModel
 
 
+SIGNAL_BY_POSITION_ID = Query("signals.by_position_id", """
+    SELECT s.*
+    FROM signals s
+    INNER JOIN positions p ON p.signal_id = s.id
+    WHERE p.position_id = ?
+    LIMIT 1
+""")
+
+SIGNAL_BY_CHAT = Query("signals.by_chat", """
+    SELECT *
+    FROM signals
+    WHERE telegram_message_chatid = ? AND telegram_message_id = ?
+    ORDER BY id DESC
+    LIMIT 1
+""")
+
+# Every account saves its own copy of a signal; the one owning a position of user_id
+SIGNAL_BY_CHAT_AND_USER = Query("signals.by_chat_and_user", """
+    SELECT *
+    FROM signals s
+    WHERE telegram_message_chatid = ? AND telegram_message_id = ?
+      AND EXISTS (SELECT 1 FROM positions p WHERE p.signal_id = s.id AND p.user_id = ?)
+    ORDER BY id DESC
+    LIMIT 1
+""")
+
+LAST_RECORD = Query("signals.last_record", """
+    SELECT *
+    FROM signals
+    WHERE open_price = ? AND second_price = ? AND stop_loss = ? AND symbol = ?
+    ORDER BY id DESC
+    LIMIT 1
+""")
+
+
 class SignalRepository:
     """Repository for signal-related database operations"""
 
@@ -27,28 +62,17 @@ class SignalRepository:
 
     def get_signal_by_position_id(self, position_id: int) -> Optional[SignalModel]:
         """Get signal associated with a position ID"""
-        query = """
-            SELECT s.*
-            FROM signals s
-            INNER JOIN positions p ON p.signal_id = s.id
-            WHERE p.position_id = ?
-            LIMIT 1
-        """
-        results = self.repository.execute_query(query, (position_id,))
+        results = self.repository.execute_query(SIGNAL_BY_POSITION_ID, (position_id,))
         if not results:
             return None
         return SignalModel.from_tuple(results[0])
 
-    def get_signal_by_chat(self, chat_id: int, message_id: int) -> Optional[Dict]:
-        """Get signal by chat and message ID"""
-        query = """
-            SELECT *
-            FROM signals
-            WHERE telegram_message_chatid = ? AND telegram_message_id = ?
-            ORDER BY id DESC
-            LIMIT 1
-        """
-        results = self.repository.execute_query(query, (chat_id, message_id))
+    def get_signal_by_chat(self, chat_id: int, message_id: int, user_id: Optional[int] = None) -> Optional[Dict]:
+        """Get signal by chat and message ID, the copy saved by one account if user_id is given"""
+        if user_id is None:
+            results = self.repository.execute_query(SIGNAL_BY_CHAT, (chat_id, message_id))
+        else:
+            results = self.repository.execute_query(SIGNAL_BY_CHAT_AND_USER, (chat_id, message_id, user_id))
         if not results:
             return None
 
@@ -69,15 +93,8 @@ class SignalRepository:
     def get_last_record(self, open_price: float, second_price: Optional[float],
                        stop_loss: float, symbol: str) -> Optional[SignalModel]:
         """Get the last matching signal record"""
-        query = """
-            SELECT *
-            FROM signals
-            WHERE open_price = ? AND second_price = ? AND stop_loss = ? AND symbol = ?
-            ORDER BY id DESC
-            LIMIT 1
-        """
         results = self.repository.execute_query(
-            query, (open_price, second_price, stop_loss, symbol))
+            LAST_RECORD, (open_price, second_price, stop_loss, symbol))
         if not results:
             return None
         return SignalModel.from_tuple(results[0])
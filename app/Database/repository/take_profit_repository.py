@@ -0,0 +1,94 @@
+"""Take profit repository for the per-level TP table of signals"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+from .Repository import Query, SQLiteRepository
+
+
+LEVELS_BY_SIGNAL = Query("take_profits.by_signal", """
+    SELECT signal_id, price
+    FROM TakeProfits
+    WHERE signal_id IN (SELECT value FROM json_each(?))
+    ORDER BY signal_id, level_index
+""")
+
+HISTORY = Query("take_profits.history", """
+    SELECT level_index, price, hit_at
+    FROM TakeProfits
+    WHERE signal_id = ?
+    ORDER BY level_index
+""")
+
+MARK_HIT = Query("take_profits.mark_hit", """
+    UPDATE TakeProfits SET hit_at = ?
+    WHERE signal_id = ? AND level_index = ? AND hit_at IS NULL
+""")
+
+
+class TakeProfitRepository:
+    """
+    Repository for take profit levels.
+
+    Each level of a signal is a row (signal_id, level_index, price, hit_at);
+    the table and its (signal_id, level_index) unique index are created by
+    schema migration 3.
+    """
+
+    def __init__(self, db_path: str = "telegramtrader.db", enable_cache: bool = True):
+        self.repository = SQLiteRepository(db_path, "TakeProfits", enable_cache=enable_cache)
+
+    def set_levels(self, signal_id: int, prices: Iterable[float]) -> None:
+        """
+        Store the TP ladder of a signal in signal order.
+
+        Levels whose price did not change keep their hit time; levels beyond
+        the new ladder are removed.
+        """
+        rows = [(signal_id, index, float(price)) for index, price in enumerate(prices)]
+        with self.repository._connect() as conn:
+            conn.execute("DELETE FROM TakeProfits WHERE signal_id = ? AND level_index >= ?", (signal_id, len(rows)))
+            conn.executemany("""
+                INSERT INTO TakeProfits (signal_id, level_index, price) VALUES (?, ?, ?)
+                ON CONFLICT(signal_id, level_index) DO UPDATE SET
+                    hit_at = CASE WHEN price = excluded.price THEN hit_at END,
+                    price = excluded.price
+            """, rows)
+
+        self.repository.invalidate_tables()
+
+    def get_levels(self, signal_id: int) -> List[float]:
+        """Get the TP prices of a signal in signal order"""
+        return self.get_levels_by_signal([signal_id]).get(signal_id, [])
+
+    def get_levels_by_signal(self, signal_ids: Iterable[int]) -> Dict[int, List[float]]:
+        """Get the TP prices of several signals with one query"""
+        signal_ids = sorted(set(map(int, signal_ids)))
+        if not signal_ids:
+            return {}
+        levels: Dict[int, List[float]] = {}
+        for signal_id, price in self.repository.execute_query(LEVELS_BY_SIGNAL, (json.dumps(signal_ids),)):
+            levels.setdefault(signal_id, []).append(price)
+        return levels
+
+    def get_history(self, signal_id: int) -> Tuple[Tuple[int, float, Optional[int]], ...]:
+        """Get (level_index, price, hit_at) of every level of a signal"""
+        return self.repository.execute_query(HISTORY, (signal_id,))
+
+    def mark_hit(self, hits: Iterable[Tuple[int, int, int]]) -> int:
+        """
+        Record the first time levels were reached.
+
+        Args:
+            hits: Rows of (signal_id, level_index, hit_at)
+
+        Returns:
+            Number of levels marked
+        """
+        rows = [(hit_at, signal_id, level_index) for signal_id, level_index, hit_at in hits]
+        if not rows:
+            return 0
+        return self.repository.execute_many(MARK_HIT, rows)
+
+
+# Global instance for backward compatibility
+take_profit_repo = TakeProfitRepository()
@@ -0,0 +1,183 @@
+"""Versioned schema changes applied on top of the base tables"""
+
+from datetime import datetime
+from typing import Callable, List, Optional
+from loguru import logger
+
+
+class Migration:
+    """
+    One ordered schema step.
+
+    Args:
+        version: Position in the migration order, recorded in schema_version once applied
+        description: Shown in the log and stored with the version
+        schema: Called with the writer connection inside one transaction (DDL, small updates)
+        backfill: Called as backfill(conn, after, batch_size) for each batch in its own
+            transaction; returns the cursor of the last processed row, or None when done
+        batch_size: Rows per backfill batch
+    """
+
+    def __init__(self, version: int, description: str, schema: Optional[Callable] = None,
+                 backfill: Optional[Callable] = None, batch_size: int = 5000):
+        self.version = version
+        self.description = description
+        self.schema = schema
+        self.backfill = backfill
+        self.batch_size = batch_size
+
+
+def _create_lookup_indexes(conn) -> None:
+    """Indexes for the ticket, signal and chat/message lookups"""
+    # position_id -> signal_id without touching the table (tp levels, signal and sibling lookups)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_positions_position_id ON Positions(position_id, signal_id)")
+    # Positions of a signal, newest first (the rowid id is part of every index)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_positions_signal_id ON Positions(signal_id)")
+    # Signal of a Telegram message, newest first
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_signals_chat_message "
+                 "ON Signals(telegram_message_chatid, telegram_message_id)")
+
+
+def _add_position_results(conn) -> None:
+    """Close time, close price and realized profit of positions created before they existed"""
+    from .models import DatabaseSchema
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(Positions)")}
+    for column in ("closed_at", "close_price", "profit"):
+        if column not in existing:
+            conn.execute(f"ALTER TABLE Positions ADD COLUMN {column} {DatabaseSchema.POSITION_COLUMNS[column]}")
+
+
+def _create_take_profits(conn) -> None:
+    """Per-level take profit table replacing the comma separated tp_list column"""
+    from .models import DatabaseSchema
+    columns_def = ', '.join(f'{col} {dtype}' for col, dtype in DatabaseSchema.TAKE_PROFIT_COLUMNS.items())
+    conn.execute(f"CREATE TABLE IF NOT EXISTS TakeProfits ({columns_def})")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_take_profits_signal_level ON TakeProfits(signal_id, level_index)")
+
+
+def _create_deal_watermarks(conn) -> None:
+    """Last deal reconciled per account"""
+    from .models import DatabaseSchema
+    columns_def = ', '.join(f'{col} {dtype}' for col, dtype in DatabaseSchema.DEAL_WATERMARK_COLUMNS.items())
+    conn.execute(f"CREATE TABLE IF NOT EXISTS DealWatermarks ({columns_def})")
+
+
+def _parse_tp_list(tp_list) -> List[float]:
+    prices = []
+    for value in (tp_list or '').split(','):
+        try:
+            prices.append(float(value))
+        except ValueError:
+            continue
+    return prices
+
+
+def _backfill_take_profits(conn, after, batch_size):
+    """Copy tp_list of existing signals into TakeProfits"""
+    rows = conn.execute("SELECT id, tp_list FROM Signals WHERE id > ? ORDER BY id LIMIT ?",
+                        (after or 0, batch_size)).fetchall()
+    if not rows:
+        return None
+    conn.executemany(
+        "INSERT OR IGNORE INTO TakeProfits (signal_id, level_index, price) VALUES (?, ?, ?)",
+        [(signal_id, index, price) for signal_id, tp_list in rows
+         for index, price in enumerate(_parse_tp_list(tp_list))])
+    return rows[-1][0]
+
+
+# Ordered steps; never edit an applied step, append a new one instead
+MIGRATIONS: List[Migration] = [
+    Migration(1, "lookup indexes", schema=_create_lookup_indexes),
+    Migration(2, "position results", schema=_add_position_results),
+    Migration(3, "take profit levels", schema=_create_take_profits, backfill=_backfill_take_profits),
+    Migration(4, "deal watermarks", schema=_create_deal_watermarks),
+]
+
+
+def _ensure_version_table(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT,
+            backfill_cursor INTEGER
+        )
+    """)
+
+
+def get_schema_version(conn) -> int:
+    """Version of the last fully applied step"""
+    row = conn.execute("SELECT MAX(version) FROM schema_version WHERE applied_at IS NOT NULL").fetchone()
+    return row[0] or 0
+
+
+def _apply(conn, migration: Migration) -> None:
+    state = conn.execute("SELECT applied_at, backfill_cursor FROM schema_version WHERE version = ?",
+                         (migration.version,)).fetchone()
+    if state is not None and state[0] is not None:
+        return
+
+    if state is None:
+        logger.info(f"Applying database migration {migration.version}: {migration.description}")
+        conn.execute("BEGIN")
+        try:
+            if migration.schema is not None:
+                migration.schema(conn)
+            conn.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                         (migration.version, migration.description))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        cursor = None
+    else:
+        # A previous run stopped during the backfill, resume after its last batch
+        cursor = state[1]
+        logger.info(f"Resuming database migration {migration.version}: {migration.description}")
+
+    if migration.backfill is not None:
+        batches = 0
+        while True:
+            conn.execute("BEGIN")
+            try:
+                cursor_after = migration.backfill(conn, cursor, migration.batch_size)
+                if cursor_after is not None:
+                    conn.execute("UPDATE schema_version SET backfill_cursor = ? WHERE version = ?",
+                                 (cursor_after, migration.version))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if cursor_after is None:
+                break
+            cursor = cursor_after
+            batches += 1
+        logger.info(f"Migration {migration.version} backfilled in {batches} batches")
+
+    conn.execute("UPDATE schema_version SET applied_at = ? WHERE version = ?",
+                 (datetime.now().isoformat(timespec='seconds'), migration.version))
+    conn.commit()
+
+
+def migrate(connections, migrations: Optional[List[Migration]] = None) -> int:
+    """
+    Apply every step that is not recorded as applied, in version order.
+
+    Each schema change commits together with its schema_version row, and each
+    backfill batch commits with its progress, so an interrupted upgrade
+    resumes where it stopped.
+
+    Args:
+        connections: ConnectionManager of the database file
+        migrations: Steps to apply, MIGRATIONS if omitted
+
+    Returns:
+        Schema version after migrating
+    """
+    migrations = sorted(MIGRATIONS if migrations is None else migrations, key=lambda m: m.version)
+    with connections.writer() as conn:
+        _ensure_version_table(conn)
+        conn.commit()
+        for migration in migrations:
+            _apply(conn, migration)
+        return get_schema_version(conn)
@@ -0,0 +1,197 @@
+"""Buffered signal and position writes committed in one transaction"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional
+from loguru import logger
+
+from .connection import get_connection_manager
+from .repository.cache import get_shared_cache
+
+
+class SignalWrite:
+    """
+    A buffered signal, its TP levels and the positions opened for it; id is set on commit.
+
+    Without data the signal is already saved and only its positions are written.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]], take_profits: Iterable[float] = (),
+                 signal_id: Optional[int] = None):
+        self.data = data
+        self.take_profits = [float(price) for price in take_profits]
+        self.positions: List[Dict[str, Any]] = []
+        self.id: Optional[int] = signal_id
+
+    def add_position(self, position_id: int, user_id: int, is_first: bool = False, is_second: bool = False) -> None:
+        """Buffer a position row of this signal"""
+        self.positions.append({"position_id": position_id, "user_id": user_id,
+                               "is_first": is_first, "is_second": is_second})
+
+
+class UnitOfWork:
+    """
+    Buffers signals and their positions and writes them with one transaction.
+
+    Each signal is inserted, then its TP levels and positions with
+    executemany, so a burst of writes costs one commit. Positions of a signal
+    saved earlier are buffered with add_positions. With group commit enabled
+    (Database.groupCommit) the transaction is handed to a writer thread that
+    merges the units of concurrent callers into a single commit.
+
+    Usage:
+        uow = UnitOfWork()
+        signal = uow.add_signal(signal_data, tp_levels)
+        signal.add_position(ticket, user_id, is_first=True)
+        uow.commit()
+    """
+
+    def __init__(self, db_path: str = "telegramtrader.db"):
+        self.db_path = db_path
+        self.signals: List[SignalWrite] = []
+
+    def add_signal(self, data: Dict[str, Any], take_profits: Iterable[float] = ()) -> SignalWrite:
+        """Buffer a signal row and its TP levels"""
+        signal = SignalWrite(data, take_profits)
+        self.signals.append(signal)
+        return signal
+
+    def add_positions(self, signal_id: int) -> SignalWrite:
+        """Buffer positions of a signal that is already saved"""
+        signal = SignalWrite(None, signal_id=signal_id)
+        self.signals.append(signal)
+        return signal
+
+    def commit(self) -> List[int]:
+        """
+        Write every buffered row.
+
+        Returns:
+            Ids of the inserted signals, in the order they were added
+        """
+        if self.signals:
+            writer = _get_group_writer(self.db_path)
+            if writer is not None:
+                writer.submit(self).result()
+            else:
+                with get_connection_manager(self.db_path).writer() as conn:
+                    self._write(conn)
+                _invalidate(self.db_path)
+        return [signal.id for signal in self.signals]
+
+    def _write(self, conn) -> None:
+        for signal in self.signals:
+            if signal.data is not None:
+                columns = ', '.join(signal.data.keys())
+                placeholders = ', '.join('?' * len(signal.data))
+                cursor = conn.execute(f"INSERT INTO Signals ({columns}) VALUES ({placeholders})",
+                                      tuple(signal.data.values()))
+                signal.id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO TakeProfits (signal_id, level_index, price) VALUES (?, ?, ?)",
+                    [(signal.id, index, price) for index, price in enumerate(signal.take_profits)])
+            conn.executemany(
+                "INSERT INTO Positions (signal_id, position_id, user_id, is_first, is_second) VALUES (?, ?, ?, ?, ?)",
+                [(signal.id, row["position_id"], row["user_id"], row["is_first"], row["is_second"])
+                 for row in signal.positions])
+
+
+def _invalidate(db_path: str) -> None:
+    # Queries and records of the written tables, as SQLiteRepository.invalidate_tables tags them
+    tables = ("signals", "takeprofits", "positions")
+    get_shared_cache(db_path).invalidate_tags(tables + tuple(f"{table}#*" for table in tables))
+
+
+class GroupCommitWriter:
+    """
+    Writer thread committing the units of work of concurrent callers together.
+
+    Units queued while a commit is running are written in the next
+    transaction, up to max_batch at a time, so a burst of signals costs one
+    fsync instead of one per signal. If a merged transaction fails, its units
+    are retried one by one so only the failing unit reports the error.
+    """
+
+    def __init__(self, db_path: str, max_batch: int = 64):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"group-commit:{db_path}", daemon=True)
+        self._thread.start()
+
+    def submit(self, unit: UnitOfWork) -> Future:
+        """Queue a unit of work; the future completes once it is committed"""
+        future: Future = Future()
+        self._queue.put((unit, future))
+        return future
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Commit what is queued and stop the thread"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch) -> None:
+        connections = get_connection_manager(self.db_path)
+        try:
+            with connections.writer() as conn:
+                for unit, _ in batch:
+                    unit._write(conn)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            logger.warning(f"Group commit of {len(batch)} units failed, committing them one by one: {e}")
+            for item in batch:
+                self._commit([item])
+            return
+
+        _invalidate(self.db_path)
+        for _, future in batch:
+            future.set_result(None)
+
+
+# Group commit writers by database file, started on first use when enabled
+_writers: Dict[str, GroupCommitWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def _get_group_writer(db_path: str) -> Optional[GroupCommitWriter]:
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None:
+            from Configure.settings.Settings import Settings
+            if not Settings.database().get('groupCommit', False):
+                return None
+            writer = _writers[db_path] = GroupCommitWriter(db_path)
+        return writer
+
+
+def stop_group_writers() -> None:
+    """Commit queued units of work and stop every writer thread"""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.stop()
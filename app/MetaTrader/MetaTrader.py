@@ -5,6 +5,7 @@ from .connection.connection import ConnectionManager, AccountConfig
 from .trading.market_data import MarketData
 from .trading.validation import PriceValidator
 from .trading.orders import OrderManager
+from .trading.retry import RetryPolicy
 from .trading.positions import PositionManager
 from .monitoring.monitoring import MonitoringManager
 from .trading.trading import TradingOperations
@@ -17,7 +18,7 @@ __all__ = ['MetaTrader', 'get_mt5_time', 'get_symbols']
 class MetaTrader:
     """Main MetaTrader orchestrator class using modular components"""
 
-    def __init__(self, path, server, user, password, saveProfits=None, closePositionsOnTrail=True):
+    def __init__(self, path, server, user, password, saveProfits=None, closePositionsOnTrail=True, expirePendinOrderInMinutes=None):
         self.path = path
         self.server = server
         self.user = user
@@ -30,9 +31,10 @@ class MetaTrader:
         self.connection = ConnectionManager(path, server, user, password)
         self.market_data = MarketData(self.magic)
         self.validator = PriceValidator(self.connection)
-        self.order_manager = OrderManager(self.connection, self.market_data, self.validator, self.magic)
+        self.order_manager = OrderManager(self.connection, self.market_data, self.validator, self.magic, RetryPolicy.from_settings())
         self.position_manager = PositionManager(self.market_data, self.connection, self.magic)
-        self.monitoring = MonitoringManager(self.connection, self.market_data, self.position_manager, saveProfits, closePositionsOnTrail)
+        self.monitoring = MonitoringManager(self.connection, self.market_data, self.position_manager, saveProfits, closePositionsOnTrail,
+                                            expire_pending_minutes=expirePendinOrderInMinutes)
     
     # Connection methods
     def Login(self) -> bool:
@@ -78,6 +80,9 @@ class MetaTrader:
     def close_position(self, ticket):
         return self.position_manager.close_position(ticket)
 
+    def modify_stops(self, tickets, sl=None, tp=None):
+        return self.position_manager.modify_stops(tickets, sl, tp)
+
     # Validation methods
     def validate(self, action, price, symbol, currentPrice=None, isSl=False, isSecondPrice=False):
         return self.validator.validate(action, price, symbol, currentPrice, isSl, isSecondPrice)
@@ -111,7 +116,7 @@ class MetaTrader:
     # Static trading operations
     @staticmethod
     def Trade(message_username, message_id, message_chatid, actionType, symbol, openPrice, secondPrice, tp_list, sl, comment):
-        TradingOperations.trade(message_username, message_id, message_chatid, actionType, symbol, openPrice, secondPrice, tp_list, sl, comment)
+        TradingOperations.trade_all_accounts(message_username, message_id, message_chatid, actionType, symbol, openPrice, secondPrice, tp_list, sl, comment)
 
     @staticmethod
     def RiskFreePositions(chat_id, message_id):
@@ -138,8 +143,8 @@ class MetaTrader:
     async def monitor_all_accounts():
         await MonitoringManager.monitor_all_accounts()
 
-    async def monitor_account(self):
-        await self.monitoring.monitor_account()
+    async def monitor_account(self, lock=None):
+        await self.monitoring.monitor_account(lock)
 
     def trailing(self):
         self.monitoring.trailing()
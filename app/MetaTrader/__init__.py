@@ -10,7 +10,7 @@ from .connection import AccountConfig
 from .trading import TradingOperations
 
 # Backward compatibility exports
-Trade = TradingOperations.trade
+Trade = TradingOperations.trade_all_accounts
 RiskFreePositions = TradingOperations.risk_free_positions
 Update_last_signal = TradingOperations.update_last_signal
 Update_signal = TradingOperations.update_signal
@@ -183,6 +183,36 @@ class ConnectionManager:
 class AccountConfig:
     """Configuration class for MetaTrader account settings"""
 
+    @classmethod
+    def from_settings(cls, overrides=None):
+        """Build the account from the MetaTrader settings, applying per-account overrides"""
+        from Configure.settings.Settings import Settings
+
+        account_dict = {
+            'server': Settings.mt_server(),
+            'username': Settings.mt_username(),
+            'password': Settings.mt_password(),
+            'path': Settings.mt_path(),
+            'lot': Settings.mt_lot(),
+            'HighRisk': Settings.mt_high_risk(),
+            'SaveProfits': Settings.mt_save_profits(),
+            'AccountSize': Settings.mt_account_size(),
+            'CloserPrice': Settings.mt_closer_price(),
+            'expirePendinOrderInMinutes': Settings.mt_expire_pending_orders_minutes(),
+            'ClosePositionsOnTrail': Settings.mt_close_positions_on_trail(),
+            'disableCache': Settings.disable_cache(),
+            'SymbolMappings': Settings.mt_symbol_mappings()
+        }
+        account_dict.update(overrides or {})
+        return cls(account_dict)
+
+    @classmethod
+    def load_all(cls):
+        """Build the primary account followed by every additional account in MetaTrader.accounts"""
+        from Configure.settings.Settings import Settings
+
+        return [cls.from_settings()] + [cls.from_settings(overrides) for overrides in Settings.mt_accounts()]
+
     def __init__(self, account_dict):
         self.path = account_dict.get('path')
         if not self.path:  # Check if None or empty
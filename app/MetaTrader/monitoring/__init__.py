@@ -1,7 +1,21 @@
 """MetaTrader monitoring components for position tracking and trailing stops"""
 
 from .monitoring import MonitoringManager
+from .snapshot import MarketSnapshot
+from .registry import PositionRegistry, position_registry
+from .tick_watcher import TickWatcher
+from .engine import MonitoringEngine
+from .expiry import ExpiryWheel, expiry_wheel
+from .reconciler import DealReconciler
 
 __all__ = [
-    'MonitoringManager'
+    'MonitoringManager',
+    'MarketSnapshot',
+    'PositionRegistry',
+    'position_registry',
+    'TickWatcher',
+    'MonitoringEngine',
+    'ExpiryWheel',
+    'expiry_wheel',
+    'DealReconciler'
 ]
\ No newline at end of file
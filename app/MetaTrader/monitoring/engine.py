@@ -0,0 +1,108 @@
+"""Monitoring loop running on its own thread, reporting to the asyncio side through a queue"""
+
+import asyncio
+import threading
+from typing import Any, Optional, Tuple
+from loguru import logger
+
+
+class MonitoringEngine:
+    """
+    Runs the blocking monitoring loop of a MonitoringManager on a dedicated
+    thread with its own cadence.
+
+    The thread never touches the event loop directly: everything it has to
+    report is handed over as (kind, payload) events on an asyncio.Queue via
+    call_soon_threadsafe, so mt5 and sqlite3 calls never stall Telethon.
+
+    Events:
+        ('closed', [tickets])      positions detected as closed
+        ('login_failed', server)   login failed, retrying
+        ('error', message)         an iteration raised, retrying
+        ('stopped', None)          the thread exited
+    """
+
+    RETRY_DELAY = 5
+
+    def __init__(self, monitoring, name: Optional[str] = None, lock=None):
+        self.monitoring = monitoring
+        self.name = name or f"monitor-{monitoring.connection.user}"
+        # Held around each login and iteration; shared with other threads driving the same terminal
+        self.lock = lock if lock is not None else threading.Lock()
+        self.events: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> asyncio.Queue:
+        """
+        Start the monitoring thread.
+
+        Args:
+            loop: Event loop receiving the events, the running loop if omitted
+
+        Returns:
+            Queue the events are published to
+        """
+        if self.is_alive():
+            return self.events
+
+        self._loop = loop or asyncio.get_running_loop()
+        self.events = asyncio.Queue()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self.events
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Ask the thread to exit after the current iteration, waiting up to timeout seconds"""
+        self._stop.set()
+        if timeout and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        """Whether the monitoring thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _publish(self, kind: str, payload: Any = None) -> None:
+        """Hand an event over to the event loop"""
+        try:
+            self._loop.call_soon_threadsafe(self.events.put_nowait, (kind, payload))
+        except RuntimeError:
+            # Event loop closed while shutting down
+            self._stop.set()
+
+    def _run(self) -> None:
+        """Thread body: login, then tick until stopped, reconnecting on errors"""
+        monitoring = self.monitoring
+        try:
+            while not self._stop.is_set():
+                try:
+                    with self.lock:
+                        logged_in = monitoring.connection.login()
+                    if not logged_in:
+                        self._publish('login_failed', monitoring.connection.server)
+                        self._stop.wait(self.RETRY_DELAY)
+                        continue
+
+                    while not self._stop.is_set():
+                        with self.lock:
+                            closed = monitoring.tick()
+                        if closed:
+                            self._publish('closed', closed)
+                        self._stop.wait(monitoring.tick_watcher.next_interval())
+
+                except Exception as e:
+                    self._publish('error', str(e))
+                    self._stop.wait(self.RETRY_DELAY)
+        finally:
+            logger.debug(f"Monitoring thread {self.name} stopped")
+            self._publish('stopped')
+
+    async def events_forever(self):
+        """Yield events until the thread stops"""
+        while True:
+            event: Tuple[str, Any] = await self.events.get()
+            yield event
+            if event[0] == 'stopped':
+                return
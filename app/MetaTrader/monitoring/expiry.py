@@ -0,0 +1,88 @@
+"""Local expiry of pending orders for brokers without ORDER_TIME_SPECIFIED"""
+
+import math
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+class ExpiryWheel:
+    """
+    Timer wheel of pending order expiries.
+
+    Each ticket sits in the slot of the wheel tick at which it expires, so
+    collecting due tickets only visits the slots that elapsed since the last
+    call instead of scanning every pending order. Expiries further away than
+    one revolution stay in their slot and are skipped until they are due.
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 3600, clock: Callable[[], float] = time.time):
+        self.resolution = float(resolution)
+        self.clock = clock
+        self._slots: List[Dict[int, float]] = [{} for _ in range(slots)]
+        self._where: Dict[int, int] = {}  # ticket -> slot
+        self._cursor = self._tick(clock())  # last wheel tick collected
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, ticket) -> bool:
+        return ticket in self._where
+
+    def _tick(self, timestamp: float) -> int:
+        return math.floor(timestamp / self.resolution)
+
+    def schedule(self, ticket: int, expires_at: float) -> None:
+        """Track a pending order until the given unix timestamp"""
+        with self._lock:
+            self._discard(ticket)
+            # Rounded up so that a visited slot only holds expiries that already passed
+            tick = max(math.ceil(expires_at / self.resolution), self._cursor + 1)
+            slot = tick % len(self._slots)
+            self._slots[slot][ticket] = expires_at
+            self._where[ticket] = slot
+
+    def cancel(self, ticket: int) -> None:
+        """Stop tracking a ticket that filled, was cancelled or closed"""
+        with self._lock:
+            self._discard(ticket)
+
+    def _discard(self, ticket: int) -> None:
+        slot = self._where.pop(ticket, None)
+        if slot is not None:
+            self._slots[slot].pop(ticket, None)
+
+    def due(self, now: Optional[float] = None) -> List[int]:
+        """
+        Collect the tickets that expired since the previous call.
+
+        Returns:
+            Expired tickets, no longer tracked
+        """
+        now = self.clock() if now is None else now
+        now_tick = self._tick(now)
+        expired = []
+        with self._lock:
+            elapsed = min(now_tick - self._cursor, len(self._slots))
+            for tick in range(now_tick - elapsed + 1, now_tick + 1):
+                bucket = self._slots[tick % len(self._slots)]
+                if not bucket:
+                    continue
+                for ticket in [t for t, expires_at in bucket.items() if expires_at <= now]:
+                    del bucket[ticket]
+                    del self._where[ticket]
+                    expired.append(ticket)
+            self._cursor = max(self._cursor, now_tick)
+        return expired
+
+    def clear(self) -> None:
+        """Forget every scheduled expiry"""
+        with self._lock:
+            for bucket in self._slots:
+                bucket.clear()
+            self._where.clear()
+
+
+# Global wheel shared by the order and monitoring managers of this process
+expiry_wheel = ExpiryWheel()
@@ -1,41 +1,53 @@
+import time
 import asyncio
+import numpy as np
 import MetaTrader5 as mt5
 from loguru import logger
 import Database
+from Configure.metrics.Metrics import metrics
+from .snapshot import MarketSnapshot
+from .registry import position_registry
+from .tick_watcher import TickWatcher
+from .trailing import plan_trailing
+from .engine import MonitoringEngine
+from .expiry import expiry_wheel
+from .reconciler import DealReconciler
 
 
 class MonitoringManager:
     """Handles position monitoring, trailing stops, and automated management"""
 
-    def __init__(self, connection_manager, market_data, position_manager, save_profits=None, close_positions_on_trail=True):
+    def __init__(self, connection_manager, market_data, position_manager, save_profits=None, close_positions_on_trail=True,
+                 registry=None, tick_watcher=None, expiry=None, reconciler=None, expire_pending_minutes=None):
         self.connection = connection_manager
         self.market_data = market_data
         self.position_manager = position_manager
         self.save_profits = save_profits
         self.close_positions_on_trail = close_positions_on_trail
+        self.expire_pending_minutes = expire_pending_minutes
+        self.registry = registry if registry is not None else position_registry
+        self.tick_watcher = tick_watcher if tick_watcher is not None else TickWatcher.from_settings()
+        self.expiry = expiry if expiry is not None else expiry_wheel
+        self.reconciler = reconciler if reconciler is not None else \
+            DealReconciler.from_settings(market_data, getattr(connection_manager, 'user', None))
 
     @staticmethod
     async def monitor_all_accounts():
         """Monitor all accounts concurrently"""
-        from Configure.settings.Settings import Settings
         from ..connection import AccountConfig
         from ..MetaTrader import MetaTrader
+        from ..workers import get_dispatcher, split_accounts
+
+        local, remote = split_accounts(AccountConfig.load_all())
+        if remote:
+            # Execution workers log in ahead of the first signal and monitor their own accounts
+            get_dispatcher(remote)
+        if not local:
+            logger.info("All accounts are monitored by their execution workers")
+            return
 
-        account = AccountConfig({
-            'server': Settings.mt_server(),
-            'username': Settings.mt_username(),
-            'password': Settings.mt_password(),
-            'path': Settings.mt_path(),
-            'lot': Settings.mt_lot(),
-            'HighRisk': Settings.mt_high_risk(),
-            'SaveProfits': Settings.mt_save_profits(),
-            'AccountSize': Settings.mt_account_size(),
-            'CloserPrice': Settings.mt_closer_price(),
-            'expirePendinOrderInMinutes': Settings.mt_expire_pending_orders_minutes(),
-            'ClosePositionsOnTrail': Settings.mt_close_positions_on_trail(),
-            'disableCache': Settings.disable_cache(),
-            'SymbolMappings': Settings.mt_symbol_mappings()
-        })
+        # The MT5 connection is global to the process, so only the in-process account is monitored here
+        account = local[0]
 
         # Create tasks for all accounts
         tasks = []
@@ -46,153 +58,219 @@ class MonitoringManager:
             password=account.password,
             saveProfits=account.SaveProfits,
             closePositionsOnTrail=account.close_positions_on_trail,
+            expirePendinOrderInMinutes=account.expirePendinOrderInMinutes,
         )
         tasks.append(mt.monitor_account())
 
         await asyncio.gather(*tasks)
 
-    async def monitor_account(self):
-        """Main async monitoring loop for a single account"""
+    async def monitor_account(self, lock=None):
+        """
+        Monitor a single account without blocking the event loop.
+
+        The loop itself runs on a MonitoringEngine thread; this coroutine only
+        consumes the events it reports and stops it when cancelled.
+
+        Args:
+            lock: Lock held around each iteration, shared with other threads using the terminal
+        """
         logger.info(f"Starting position monitoring for account {self.connection.user}")
 
-        while True:  # Keep trying to reconnect
-            try:
-                # Initial login/reconnect
-                # if mt5.terminal_info() is None:
-                if not self.connection.login():
-                    logger.error(f"Failed to login to {self.connection.server}, retrying in 5 seconds...")
-                    await asyncio.sleep(5)
-                    continue
-
-                # Main monitoring loop
-                while True:
-                    # Check connection status periodically
-                    # if mt5.terminal_info() is None:
-                    #     logger.warning(f"Connection lost to {self.connection.server}, reconnecting...")
-                    #     break  # Break inner loop to reconnect
-
-                    # Get and process positions
-                    self.trailing()
-                    self.manage_positions()
-
-                    # Async sleep to maintain event loop
-                    await asyncio.sleep(1)
-
-            except Exception as e:
-                logger.error(f"Monitoring error on {self.connection.server}: {e}")
-                await asyncio.sleep(5)
-
-    def trailing(self):
-        """Implement trailing stop logic with optimizations"""
-        positions = self.market_data.get_open_positions()
+        engine = MonitoringEngine(self, lock=lock)
+        engine.start()
+        try:
+            async for kind, payload in engine.events_forever():
+                if kind == 'closed':
+                    logger.debug(f"Positions closed: {payload}")
+                elif kind == 'login_failed':
+                    logger.error(f"Failed to login to {payload}, retrying in {engine.RETRY_DELAY} seconds...")
+                elif kind == 'error':
+                    logger.error(f"Monitoring error on {self.connection.server}: {payload}")
+        finally:
+            engine.stop()
+
+    def tick(self):
+        """
+        Run one monitoring iteration: read the terminal once and only evaluate symbols that ticked.
+
+        Blocking; called from the MonitoringEngine thread.
+
+        Returns:
+            Tickets detected as closed since the previous iteration
+        """
+        with metrics.iteration(f"account {self.connection.user}"):
+            snapshot = MarketSnapshot.take(self.market_data)
+            closed = self.registry.sync(snapshot)
+            for ticket in closed:
+                self.expiry.cancel(ticket)
+            self.reconciler.reconcile(snapshot, closed)
+            self.expire_orders(snapshot)
+            symbols = self.tick_watcher.update(snapshot)
+            if symbols:
+                self.trailing(snapshot, symbols)
+                self.manage_positions(snapshot, symbols)
+            return closed
+
+    def schedule_expiries(self, snapshot):
+        """
+        Give each GTC pending order of a signal a local expiry.
+
+        The deadline comes from the order's setup time in the snapshot, so
+        orders placed by another process or before a restart expire as well.
+        Setup times are server times and are converted with the last tick of
+        the order's symbol.
+        """
+        if not self.expire_pending_minutes:
+            return
+        for order in snapshot.orders:
+            if order.ticket in self.expiry or order.type_time != mt5.ORDER_TIME_GTC:
+                continue
+            tick = snapshot.ticks.get(order.symbol)
+            if tick is None or self.registry.get(order.ticket) is None:
+                continue
+            server_deadline = order.time_setup + self.expire_pending_minutes * 60
+            self.expiry.schedule(order.ticket, snapshot.taken_at + server_deadline - tick.time)
+
+    def expire_orders(self, snapshot):
+        """Cancel the pending orders whose local expiry is due, without scanning the others"""
+        self.schedule_expiries(snapshot)
+        due = [ticket for ticket in self.expiry.due() if ticket in snapshot.orders_by_ticket]
+        if due:
+            logger.info(f"Cancelling expired pending orders: {due}")
+            self.position_manager.cancel_orders(due, snapshot.orders_by_ticket)
+
+    def take_snapshot(self):
+        """Read the terminal and reconcile the position registry with it"""
+        snapshot = MarketSnapshot.take(self.market_data)
+        closed = self.registry.sync(snapshot)
+        if closed:
+            logger.debug(f"Positions closed: {closed}")
+        return snapshot
+
+    def trailing(self, snapshot=None, symbols=None):
+        """
+        Implement trailing stop logic from one snapshot of the terminal.
+
+        Args:
+            snapshot: Terminal snapshot, taken now if omitted
+            symbols: Only evaluate positions on these symbols (all if omitted)
+        """
+        if snapshot is None:
+            snapshot = self.take_snapshot()
 
         # Skip if no positions to process
-        if not positions:
+        if not snapshot.positions:
             return
 
-        for position in positions:
-            signal = Database.Migrations.get_signal_by_positionId(
-                position.ticket)
-            if signal is None:
+        # Positions with a precomputed TP threshold (known direction, SL and more than one TP)
+        candidates, candidate_symbols = [], []
+        for position in snapshot.positions:
+            if symbols is not None and position.symbol not in symbols:
+                continue
+            managed = self.registry.get(position.ticket)
+            if managed is not None and managed.next_tp is not None:
+                candidates.append(managed)
+                candidate_symbols.append(position.symbol)
+
+        metrics.increment('positions_evaluated', len(candidates))
+        near_symbols = set()
+        if candidates:
+            positions = snapshot.positions_by_ticket
+            plan = plan_trailing(
+                [managed.ticket for managed in candidates],
+                [managed.next_tp for managed in candidates],
+                [managed.next_sl for managed in candidates],
+                [managed.level for managed in candidates],
+                [managed.is_buy for managed in candidates],
+                [snapshot.get_current_price(symbol) or np.nan for symbol in candidate_symbols],
+                [positions[managed.ticket].volume for managed in candidates],
+                self.save_profits, self.close_positions_on_trail, self.tick_watcher.near_ratio)
+
+            near_symbols.update(candidate_symbols[index] for index in np.flatnonzero(plan.near))
+
+            # Move stop losses first, then take profit only where the stop loss moved
+            modifications = plan.modifications()
+            if modifications:
+                reached = {managed.ticket: (managed.signal_id, managed.next_level_index)
+                           for managed in candidates if managed.ticket in modifications}
+                applied = self.position_manager.set_stop_losses(modifications, positions)
+                self.position_manager.close_volumes(plan.closes(applied), positions)
+                self.record_take_profit_hits(reached[ticket] for ticket, ok in applied.items() if ok)
+
+        self.tick_watcher.set_near(symbols if symbols is not None else snapshot.ticks, near_symbols)
+
+    def record_take_profit_hits(self, reached):
+        """Store the first time each (signal_id, level_index) level was reached"""
+        hit_at = int(time.time())
+        hits = {(signal_id, level_index, hit_at) for signal_id, level_index in reached}
+        if not hits:
+            return
+        try:
+            Database.Migrations.mark_take_profits_hit(hits)
+        except Exception as e:
+            logger.error(f"Failed to record take profit hits: {e}")
+
+    def manage_positions(self, snapshot=None, symbols=None):
+        """
+        Cancel pending second entries that are no longer needed, from one snapshot of the terminal.
+
+        Signals, TP ladders and sibling legs come from the registry and fill
+        state from the snapshot, so no database or per-order terminal lookup is made.
+        """
+        if snapshot is None:
+            snapshot = self.take_snapshot()
+
+        cancellations = self.pending_cancellations(snapshot, symbols)
+        for ticket, reason in cancellations.items():
+            logger.info(f"Cancelling pending order {ticket} - {reason}")
+        if cancellations:
+            self.position_manager.cancel_orders(list(cancellations), snapshot.orders_by_ticket)
+
+    def pending_cancellations(self, snapshot, symbols=None):
+        """
+        Decide which pending orders to cancel.
+
+        An order is cancelled once price reached TP1 of its signal and either
+        the signal has no second entry or its other leg already filled.
+
+        Args:
+            snapshot: Terminal snapshot
+            symbols: Only evaluate orders on these symbols (all if omitted)
+
+        Returns:
+            dict: ticket -> reason
+        """
+        cancellations = {}
+        for order in snapshot.orders:
+            if symbols is not None and order.symbol not in symbols:
                 continue
 
-            # get entry price - default to open_price if not found
-            entry_price = signal["open_price"]
-            if signal["second_price"] is not None:
-                signal_position = Database.Migrations.get_position_by_signal_id(
-                    signal["id"], second=True)
-                if signal_position and signal_position is not None:
-                    entry_price = signal["second_price"]
-            else:
-                signal_position = Database.Migrations.get_position_by_signal_id(
-                    signal["id"], first=True)
-                if signal_position and signal_position is not None:
-                    entry_price = signal["open_price"]
-            if signal_position is not None:
-                pos = self.market_data.get_position_or_order(
-                    ticket_id=signal_position["position_id"])
-                if pos is not None:
-                    entry_price = pos.price_open
-
-            ticket = position.ticket
-            lots = position.volume
-            stop_loss = position.sl
-            trade_type = position.type
-            symbol = position.symbol
-
-            tp_levels = Database.Migrations.get_tp_levels(ticket)
-            if not tp_levels or len(tp_levels) == 1:
+            managed = self.registry.get(order.ticket)
+            if managed is None or not managed.tp_levels:
                 continue
+            signal = managed.signal
 
-            current_price = self.market_data.get_current_price(symbol)
+            current_price = snapshot.get_current_price(order.symbol)
             if not current_price:
                 continue
 
-            tp_levels_buy = sorted(map(float, tp_levels))
-            tp_levels_sell = sorted(map(float, tp_levels), reverse=True)
-
-            # Check if price reached take profit level (minimize logging in monitoring loop)
-            if trade_type == 0:  # Buy position
-                for i, tp in enumerate(tp_levels_buy):
-                    if current_price >= tp and stop_loss < tp:
-                        new_stop_loss = tp_levels_buy[i - 1] if i > 0 else entry_price
-                        if self.position_manager.update_stop_loss(ticket, new_stop_loss):
-                            self.position_manager.save_profit_position(ticket, i, self.save_profits, self.close_positions_on_trail)
-                            break  # Only process first reached TP level
-            elif trade_type == 1:  # Sell position
-                for i, tp in enumerate(tp_levels_sell):
-                    if current_price <= tp and stop_loss > tp:
-                        new_stop_loss = tp_levels_sell[i - 1] if i > 0 else entry_price
-                        if self.position_manager.update_stop_loss(ticket, new_stop_loss):
-                            self.position_manager.save_profit_position(ticket, i, self.save_profits, self.close_positions_on_trail)
-                            break  # Only process first reached TP level
-
-    def manage_positions(self):
-        """Manage pending orders and position execution with optimizations"""
-        pending_orders = self.market_data.get_pending_orders()
-
-        # Skip if no pending orders
-        if not pending_orders:
-            return
-
-        for order in pending_orders:
-            position_id = order.ticket
-            position_type = order.type  # Buy = 0, Sell = 1
-            symbol = order.symbol
-
-            tp_levels = Database.Migrations.get_tp_levels(position_id)
-            if tp_levels is None:
+            # TP1 is the lowest TP of a buy and the highest of a sell
+            if order.type in (mt5.ORDER_TYPE_BUY_STOP, mt5.ORDER_TYPE_BUY_LIMIT):
+                reached = current_price >= signal.tp_levels[0]
+            elif order.type in (mt5.ORDER_TYPE_SELL_LIMIT, mt5.ORDER_TYPE_SELL_STOP):
+                reached = current_price <= signal.tp_levels[-1]
+            else:
+                reached = False
+            if not reached:
                 continue
 
-            tp_levels_buy = sorted(map(float, tp_levels))
-            tp_levels_sell = sorted(map(float, tp_levels), reverse=True)
-
-            current_price = self.market_data.get_current_price(symbol)
-
-            # Check if pending order should be activated or cancelled
-            if ((position_type == mt5.ORDER_TYPE_BUY_STOP or position_type == mt5.ORDER_TYPE_BUY_LIMIT) and current_price >= tp_levels_buy[0]) or \
-               ((position_type == mt5.ORDER_TYPE_SELL_LIMIT or position_type == mt5.ORDER_TYPE_SELL_STOP) and current_price <= tp_levels_sell[0]):
-
-                # Check if one of the positions has already been executed
-                positions = Database.Migrations.get_signal_positions_by_positionId(position_id)
-                signal = Database.Migrations.get_signal_by_positionId(position_id)
-
-                if len(positions) <= 1:
-                    continue
-
-                # Cancel pending order if no second entry price or position already executed
-                if signal['second_price'] is None or signal['second_price'] == 0:
-                    logger.info(f"Cancelling pending order {position_id} - no second entry needed")
-                    self.position_manager.close_position(position_id)
-                    continue
-
-                # Check if first position exists
-                position = self.market_data.get_open_positions(positions[0]['position_id'])
-                if position is None and len(positions) == 2:
-                    position = self.market_data.get_open_positions(positions[1]['position_id'])
-
-                if position is None:
-                    continue
+            # Check if one of the positions has already been executed
+            legs = signal.legs[:2]
+            if len(legs) <= 1:
+                continue
 
-                logger.info(f"Cancelling pending order {position_id} - first position already active")
-                self.position_manager.close_position(position_id)
\ No newline at end of file
+            if not signal.second_price:
+                cancellations[order.ticket] = "no second entry needed"
+            elif any(snapshot.get_position(leg.ticket) is not None for leg in legs):
+                cancellations[order.ticket] = "first position already active"
+        return cancellations
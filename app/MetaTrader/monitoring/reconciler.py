@@ -0,0 +1,98 @@
+"""Reconciliation of closed positions from the terminal's deal history"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import MetaTrader5 as mt5
+from loguru import logger
+import Database
+from .registry import position_registry
+from .expiry import expiry_wheel
+
+EXIT_ENTRIES = (mt5.DEAL_ENTRY_OUT, mt5.DEAL_ENTRY_INOUT, mt5.DEAL_ENTRY_OUT_BY)
+
+
+class DealReconciler:
+    """
+    Records realized results of positions from history_deals_get.
+
+    Only deals after a watermark stored per account are read. Exit deals add
+    their profit to the position row; positions that are no longer open get
+    their close time and price, and are evicted from the registry and caches.
+    """
+
+    # Deal history read on the very first run of an account
+    INITIAL_LOOKBACK = 7 * 24 * 3600
+
+    def __init__(self, market_data, user_id, interval: float = 60.0, registry=None, expiry=None):
+        self.market_data = market_data
+        self.user_id = user_id
+        self.interval = float(interval)
+        self.registry = registry if registry is not None else position_registry
+        self.expiry = expiry if expiry is not None else expiry_wheel
+        self._watermark = None  # (deal_time, deal_ticket), loaded on first run
+        self._last_run = 0.0
+
+    @classmethod
+    def from_settings(cls, market_data, user_id) -> 'DealReconciler':
+        """Create a reconciler using the MetaTrader.Monitoring settings section"""
+        from Configure.settings.Settings import Settings
+        config = Settings.mt_monitoring() or {}
+        return cls(market_data, user_id, interval=config.get('reconcileInterval', 60.0))
+
+    def is_due(self, closed: Iterable[int] = ()) -> bool:
+        """Run right after tickets disappeared from the terminal, otherwise every interval"""
+        return bool(closed) or time.monotonic() - self._last_run >= self.interval
+
+    def reconcile(self, snapshot, closed: Iterable[int] = ()) -> List[int]:
+        """
+        Read the deals since the watermark and record their results.
+
+        Args:
+            snapshot: Terminal snapshot telling which tickets are still open
+            closed: Tickets the registry just evicted
+
+        Returns:
+            Positions recorded as closed
+        """
+        closed = list(closed)
+        if not self.is_due(closed):
+            return []
+        self._last_run = time.monotonic()
+
+        if self._watermark is None:
+            self._watermark = Database.Migrations.get_deal_watermark(self.user_id) or \
+                (int(time.time()) - self.INITIAL_LOOKBACK, 0)
+        deal_time, deal_ticket = self._watermark
+
+        # Deal times are in server time, so the upper bound is left well ahead of the local clock
+        deals = [deal for deal in self.market_data.get_deals(deal_time, int(time.time()) + 86400)
+                 if deal.ticket > deal_ticket]
+        if not deals:
+            return []
+        deals.sort(key=lambda deal: (deal.time_msc, deal.ticket))
+
+        live = set(snapshot.tickets)
+        exits: Dict[int, list] = OrderedDict()  # position_id -> [profit, close price, closed_at]
+        for deal in deals:
+            if deal.entry not in EXIT_ENTRIES:
+                continue
+            result = exits.setdefault(deal.position_id, [0.0, None, None])
+            result[0] += deal.profit + deal.swap + deal.commission + getattr(deal, 'fee', 0.0)
+            result[1] = deal.price
+            if deal.position_id not in live:
+                result[2] = deal.time
+
+        rows = [(position_id, profit, price, closed_at) for position_id, (profit, price, closed_at) in exits.items()]
+        last = deals[-1]
+        # Profits are added, so they are committed together with the watermark that skips their deals next time
+        Database.Migrations.record_position_exits(self.user_id, rows, (last.time, last.ticket))
+        self._watermark = (last.time, last.ticket)
+
+        finished = [position_id for position_id, _, _, closed_at in rows if closed_at is not None]
+        for position_id in finished:
+            self.registry.remove(position_id)
+            self.expiry.cancel(position_id)
+        if finished:
+            logger.info(f"Recorded results of closed positions: {finished}")
+        return finished
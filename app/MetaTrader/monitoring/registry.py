@@ -0,0 +1,290 @@
+"""In-memory registry of the positions managed by the bot"""
+
+import time
+import threading
+from typing import Dict, Iterable, List, Optional
+from loguru import logger
+import Database
+
+# ORDER_TYPE_BUY, ORDER_TYPE_BUY_LIMIT, ORDER_TYPE_BUY_STOP, ORDER_TYPE_BUY_STOP_LIMIT
+BUY_TYPES = (0, 2, 4, 6)
+
+
+class ManagedSignal:
+    """Signal prices, sorted TP ladder and positions of a managed signal"""
+
+    def __init__(self, signal_id: int, open_price: float, second_price: Optional[float], tp_levels):
+        self.id = signal_id
+        self.open_price = open_price
+        self.second_price = second_price
+        self.set_take_profits(tp_levels)
+        self.legs: List['ManagedPosition'] = []  # newest first, closed legs included
+
+    def set_take_profits(self, tp_levels) -> None:
+        """Sort the TP ladder, remembering the level_index each price has in signal order"""
+        ladder = sorted(enumerate(float(tp) for tp in tp_levels), key=lambda level: level[1])
+        self.tp_levels: List[float] = [price for _, price in ladder]
+        self.tp_indexes: List[int] = [index for index, _ in ladder]
+
+    def get_leg(self, first: bool = False, second: bool = False) -> Optional['ManagedPosition']:
+        """Get the newest position with the given first/second flags"""
+        for leg in self.legs:
+            if leg.is_first == first and leg.is_second == second:
+                return leg
+        return None
+
+    @property
+    def entry(self) -> float:
+        """Stop loss applied at the first TP: entry of the second leg if the signal has one, else of the first"""
+        if self.second_price is not None:
+            leg = self.get_leg(second=True)
+        else:
+            leg = self.get_leg(first=True)
+        return leg.entry if leg is not None else self.open_price
+
+    @property
+    def is_closed(self) -> bool:
+        """Whether every position of the signal is closed"""
+        return all(leg.closed for leg in self.legs)
+
+
+class ManagedPosition:
+    """A position or pending order opened for a signal"""
+
+    def __init__(self, ticket: int, signal: ManagedSignal, is_first: bool = False, is_second: bool = False,
+                 last_sl: Optional[float] = None):
+        self.ticket = ticket
+        self.signal = signal
+        self.is_first = bool(is_first)
+        self.is_second = bool(is_second)
+        # Signal price of this leg until the terminal reports the fill price
+        self.entry = signal.second_price if self.is_second and signal.second_price else signal.open_price
+        self.last_sl = last_sl
+        self.is_buy: Optional[bool] = None  # known once the terminal reported the ticket
+        self.closed = False
+        self.registered_at = time.time()
+
+        # Next TP to cross, its index in the trailing ladder and the SL to apply then
+        self.level: Optional[int] = None
+        self.next_tp: Optional[float] = None
+        self.next_sl: Optional[float] = None
+        self.next_level_index: Optional[int] = None  # level_index of next_tp in the TakeProfits table
+
+    @property
+    def signal_id(self) -> int:
+        return self.signal.id
+
+    @property
+    def tp_levels(self) -> List[float]:
+        return self.signal.tp_levels
+
+    def refresh(self) -> None:
+        """
+        Precompute the next TP threshold and the SL to apply when it is crossed.
+
+        The ladder is walked in trade direction; the next TP is the first one
+        whose stop loss (the entry for TP1, the previous TP after that) would
+        improve the current stop loss, so a tick only needs one comparison and
+        a stop already moved to the entry waits for TP2.
+        """
+        self.level = self.next_tp = self.next_sl = self.next_level_index = None
+        ladder = self.signal.tp_levels if self.is_buy else self.signal.tp_levels[::-1]
+        indexes = self.signal.tp_indexes if self.is_buy else self.signal.tp_indexes[::-1]
+        if self.is_buy is None or self.last_sl is None or len(ladder) <= 1:
+            return
+
+        for i, tp in enumerate(ladder):
+            sl = ladder[i - 1] if i > 0 else self.signal.entry
+            if (sl > self.last_sl) if self.is_buy else (sl < self.last_sl):
+                self.level = i
+                self.next_tp = tp
+                self.next_sl = sl
+                self.next_level_index = indexes[i]
+                return
+
+
+class PositionRegistry:
+    """
+    Managed positions keyed by ticket.
+
+    Tickets that appear in a terminal snapshot are loaded from the database
+    once, positions opened by this process are registered on insert, and
+    tickets missing from a snapshot are evicted as closed. A ticket without
+    a signal is looked up again after unmanaged_ttl seconds, since its rows
+    may still be on their way from another process.
+    """
+
+    # Seconds before a live ticket without a signal is looked up again
+    unmanaged_ttl = 30
+
+    def __init__(self, clock=time.monotonic):
+        self._positions: Dict[int, ManagedPosition] = {}
+        self._signals: Dict[int, ManagedSignal] = {}
+        # Live tickets without a signal (manual trades, other bots) -> time of the next lookup
+        self._unmanaged: Dict[int, float] = {}
+        self._clock = clock
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, ticket) -> bool:
+        return ticket in self._positions
+
+    def get(self, ticket) -> Optional[ManagedPosition]:
+        """Get a managed position by ticket"""
+        return self._positions.get(ticket)
+
+    def get_signal(self, signal_id) -> Optional[ManagedSignal]:
+        """Get a managed signal by id"""
+        return self._signals.get(signal_id)
+
+    def positions(self) -> List[ManagedPosition]:
+        """Get all open managed positions"""
+        with self._lock:
+            return list(self._positions.values())
+
+    def load(self, tickets: Iterable[int]) -> List[int]:
+        """
+        Load the signals of the given tickets, and the TP levels of signals not yet known, with one query each.
+
+        Other positions of those signals are kept as closed legs, since every
+        open ticket is either already registered or part of the request.
+
+        Returns:
+            Tickets that were found and registered
+        """
+        tickets = {ticket for ticket in tickets if ticket not in self._positions}
+        if not tickets:
+            return []
+
+        rows = Database.Migrations.get_managed_positions(list(tickets))
+        new_signals = {signal_id for _, signal_id, *_ in rows if signal_id not in self._signals}
+        tp_levels = Database.Migrations.get_take_profit_levels(new_signals) if new_signals else {}
+        loaded = []
+        with self._lock:
+            touched = set()
+            for position_id, signal_id, is_first, is_second, open_price, second_price in rows:
+                signal = self._signals.get(signal_id)
+                if signal is None:
+                    signal = self._signals[signal_id] = ManagedSignal(
+                        signal_id, open_price, second_price, tp_levels.get(signal_id, []))
+                if any(leg.ticket == position_id for leg in signal.legs):
+                    continue
+                position = ManagedPosition(position_id, signal, is_first, is_second)
+                signal.legs.append(position)
+                touched.add(signal)
+                if position_id in tickets:
+                    self._positions[position_id] = position
+                    loaded.append(position_id)
+                else:
+                    position.closed = True
+            for signal in touched:
+                signal.legs.sort(key=lambda leg: leg.ticket, reverse=True)
+        return loaded
+
+    def register(self, ticket: int, signal_id: int, is_first: bool = False, is_second: bool = False,
+                 sl: Optional[float] = None) -> Optional[ManagedPosition]:
+        """Register a position right after it was opened and saved"""
+        with self._lock:
+            signal = self._signals.get(signal_id)
+            if signal is None:
+                record = Database.Migrations.get_signal_by_id(signal_id)
+                if record is None:
+                    logger.warning(f"Cannot register ticket {ticket}: signal {signal_id} not found")
+                    return None
+                tp_levels = Database.Migrations.get_take_profit_levels([signal_id]).get(signal_id, [])
+                signal = self._signals[signal_id] = ManagedSignal(
+                    signal_id, record["open_price"], record["second_price"], tp_levels)
+
+            position = ManagedPosition(ticket, signal, is_first, is_second, sl)
+            signal.legs.insert(0, position)
+            self._positions[ticket] = position
+            self._unmanaged.pop(ticket, None)
+            return position
+
+    def update_stop_loss(self, ticket: int, sl: float) -> None:
+        """Record the stop loss last applied to a ticket"""
+        position = self._positions.get(ticket)
+        if position is not None:
+            position.last_sl = sl
+            position.refresh()
+
+    def update_take_profits(self, signal_id: int, take_profits) -> None:
+        """Replace the TP ladder of a signal"""
+        signal = self._signals.get(signal_id)
+        if signal is not None:
+            signal.set_take_profits(take_profits)
+            for leg in signal.legs:
+                leg.refresh()
+
+    def remove(self, ticket: int) -> None:
+        """Evict a closed ticket"""
+        with self._lock:
+            position = self._positions.pop(ticket, None)
+            if position is None:
+                return
+            position.closed = True
+            if position.signal.is_closed:
+                self._signals.pop(position.signal_id, None)
+
+    def sync(self, snapshot) -> List[int]:
+        """
+        Reconcile the registry with a terminal snapshot.
+
+        Registers unknown tickets from the database, refreshes fill prices and
+        stop losses, and evicts tickets that are no longer open.
+
+        Returns:
+            Tickets detected as closed
+        """
+        live = set(snapshot.tickets)
+        with self._lock:
+            # Positions registered after the snapshot was read may simply not be in it yet
+            closed = [ticket for ticket, position in self._positions.items()
+                      if ticket not in live and position.registered_at < snapshot.taken_at]
+            for ticket in closed:
+                self.remove(ticket)
+
+            now = self._clock()
+            self._unmanaged = {ticket: retry_at for ticket, retry_at in self._unmanaged.items()
+                               if ticket in live and retry_at > now}
+            unknown = live - self._positions.keys() - self._unmanaged.keys()
+
+        if unknown:
+            loaded = self.load(unknown)
+            retry_at = now + self.unmanaged_ttl
+            with self._lock:
+                for ticket in unknown - set(loaded):
+                    self._unmanaged[ticket] = retry_at
+
+        # Refresh thresholds only where the fill price, stop loss or direction changed
+        stale = set()
+        for ticket in live:
+            position = self._positions.get(ticket)
+            if position is None:
+                continue
+            item = snapshot.get_position_or_order(ticket)
+            is_buy = item.type in BUY_TYPES
+            if position.entry != item.price_open:
+                position.entry = item.price_open
+                stale.update(position.signal.legs)  # the signal entry may have moved
+            if position.last_sl != item.sl or position.is_buy != is_buy:
+                position.last_sl = item.sl
+                position.is_buy = is_buy
+                stale.add(position)
+        for position in stale:
+            position.refresh()
+
+        return closed
+
+    def clear(self) -> None:
+        """Forget every managed position"""
+        with self._lock:
+            self._positions.clear()
+            self._signals.clear()
+            self._unmanaged.clear()
+
+
+# Global registry shared by the order and monitoring managers of this process
+position_registry = PositionRegistry()
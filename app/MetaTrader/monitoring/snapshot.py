@@ -0,0 +1,47 @@
+"""Per-tick view of the terminal"""
+
+import time
+from typing import List, Optional
+
+
+class MarketSnapshot:
+    """Open positions, pending orders and one tick per symbol, read once per monitoring tick"""
+
+    def __init__(self, positions, orders, ticks, taken_at: Optional[float] = None):
+        self.positions = positions
+        self.orders = orders
+        self.ticks = ticks
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self.positions_by_ticket = {position.ticket: position for position in positions}
+        self.orders_by_ticket = {order.ticket: order for order in orders}
+
+    @classmethod
+    def take(cls, market_data) -> 'MarketSnapshot':
+        """Read positions, orders and the ticks of their symbols from the terminal"""
+        taken_at = time.time()
+        positions = market_data.get_open_positions()
+        orders = market_data.get_pending_orders()
+        symbols = {item.symbol for item in positions} | {item.symbol for item in orders}
+        ticks = {symbol: market_data.get_tick(symbol) for symbol in symbols}
+        return cls(positions, orders, ticks, taken_at)
+
+    @property
+    def tickets(self) -> List[int]:
+        """Tickets of every position and pending order"""
+        return list(self.positions_by_ticket) + list(self.orders_by_ticket)
+
+    def get_position(self, ticket):
+        """Get an open position by ticket"""
+        return self.positions_by_ticket.get(ticket)
+
+    def get_position_or_order(self, ticket):
+        """Get an open position or pending order by ticket"""
+        position = self.positions_by_ticket.get(ticket)
+        if position is not None:
+            return position
+        return self.orders_by_ticket.get(ticket)
+
+    def get_current_price(self, symbol) -> Optional[float]:
+        """Get the bid price of the symbol, same as MarketData.get_current_price"""
+        tick = self.ticks.get(symbol)
+        return tick.bid if tick else None
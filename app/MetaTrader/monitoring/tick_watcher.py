@@ -0,0 +1,85 @@
+"""Tick-change detection and adaptive poll interval for the monitoring loop"""
+
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+
+class TickWatcher:
+    """
+    Tracks symbol_info_tick().time_msc per held symbol so that only symbols
+    that actually ticked are re-evaluated, and picks the next poll interval:
+    fast while a position is close to its next TP, slow once the market is idle.
+    """
+
+    def __init__(self, fast_interval: float = 0.1, interval: float = 1.0, idle_interval: float = 2.0,
+                 idle_after: float = 10.0, near_ratio: float = 0.2):
+        self.fast_interval = float(fast_interval)
+        self.interval = float(interval)
+        self.idle_interval = float(idle_interval)
+        self.idle_after = float(idle_after)
+        self.near_ratio = float(near_ratio)
+
+        self._time_msc: Dict[str, int] = {}
+        self._tickets: Set[int] = set()
+        self._near: Set[str] = set()
+        self._last_tick_at = time.monotonic()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'TickWatcher':
+        """Create a watcher from the MetaTrader.Monitoring settings section"""
+        config = config or {}
+        return cls(
+            fast_interval=config.get('fastInterval', 0.1),
+            interval=config.get('interval', 1.0),
+            idle_interval=config.get('idleInterval', 2.0),
+            idle_after=config.get('idleAfter', 10.0),
+            near_ratio=config.get('nearTpRatio', 0.2)
+        )
+
+    @classmethod
+    def from_settings(cls) -> 'TickWatcher':
+        """Create a watcher from the application settings"""
+        from Configure.settings.Settings import Settings
+        return cls.from_config(Settings.mt_monitoring())
+
+    def update(self, snapshot) -> Set[str]:
+        """
+        Compare a snapshot with the previous one.
+
+        Returns:
+            Symbols whose tick changed, plus symbols of tickets not seen before
+        """
+        ticked = set()
+        for symbol, tick in snapshot.ticks.items():
+            if tick is None:
+                continue
+            if self._time_msc.get(symbol) != tick.time_msc:
+                self._time_msc[symbol] = tick.time_msc
+                ticked.add(symbol)
+
+        tickets = set(snapshot.tickets)
+        for ticket in tickets - self._tickets:
+            ticked.add(snapshot.get_position_or_order(ticket).symbol)
+        self._tickets = tickets
+
+        # Forget symbols that are no longer held
+        for symbol in list(self._time_msc):
+            if symbol not in snapshot.ticks:
+                del self._time_msc[symbol]
+        self._near &= {position.symbol for position in snapshot.positions}
+
+        if ticked:
+            self._last_tick_at = time.monotonic()
+        return ticked
+
+    def set_near(self, evaluated: Iterable[str], near: Iterable[str]) -> None:
+        """Record which of the evaluated symbols have a position close to a TP"""
+        self._near = (self._near - set(evaluated)) | set(near)
+
+    def next_interval(self) -> float:
+        """Seconds to wait before the next poll"""
+        if self._near:
+            return self.fast_interval
+        if time.monotonic() - self._last_tick_at > self.idle_after:
+            return self.idle_interval
+        return self.interval
@@ -0,0 +1,104 @@
+"""Vectorized trailing stop evaluation over all managed positions"""
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+
+def find_crossings(next_tps, next_sls, is_buy, prices, near_ratio: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compare the precomputed TP thresholds of many positions with their prices at once.
+
+    Args:
+        next_tps: Next TP threshold per position
+        next_sls: Stop loss applied when that threshold is crossed
+        is_buy: Trade direction per position
+        prices: Current price per position (NaN if unknown)
+        near_ratio: Fraction of the distance from next_sl to next_tp under which a position counts as near
+
+    Returns:
+        (crossed, near) boolean arrays
+    """
+    next_tps = np.asarray(next_tps, dtype=float)
+    next_sls = np.asarray(next_sls, dtype=float)
+    is_buy = np.asarray(is_buy, dtype=bool)
+    prices = np.asarray(prices, dtype=float)
+
+    with np.errstate(invalid='ignore'):
+        crossed = np.where(is_buy, prices >= next_tps, prices <= next_tps)
+        near = ~crossed & (np.abs(next_tps - prices) <= np.abs(next_tps - next_sls) * near_ratio)
+    return crossed, near
+
+
+class TrailingPlan:
+    """Stop loss modifications and profit-saving closes decided by one trailing evaluation"""
+
+    def __init__(self, tickets, crossed, near, stop_losses, close_volumes, close_all, percentages):
+        self.tickets = list(tickets)
+        self.crossed = crossed
+        self.near = near
+        self.stop_losses = stop_losses
+        self.close_volumes = close_volumes
+        self.close_all = close_all
+        self.percentages = percentages
+
+    def modifications(self) -> Dict[int, float]:
+        """ticket -> stop loss to apply, for every position that crossed its next TP"""
+        return {self.tickets[i]: float(self.stop_losses[i]) for i in np.flatnonzero(self.crossed)}
+
+    def closes(self, applied: Optional[Dict[int, bool]] = None) -> Dict[int, Tuple[float, float]]:
+        """
+        ticket -> (volume, percentage) to close after the stop loss moved.
+
+        Args:
+            applied: Result of the stop loss modifications; positions whose
+                stop loss was not moved keep their volume
+        """
+        closes = {}
+        for i in np.flatnonzero(self.crossed & (self.close_volumes > 0)):
+            ticket = self.tickets[i]
+            if applied is not None and not applied.get(ticket):
+                continue
+            closes[ticket] = (float(self.close_volumes[i]), float(self.percentages[i]))
+        return closes
+
+
+def plan_trailing(tickets, next_tps, next_sls, levels, is_buy, prices, volumes,
+                  save_profits=None, close_positions: bool = True, near_ratio: float = 0.0) -> TrailingPlan:
+    """
+    Evaluate the trailing stop of many positions in one pass.
+
+    Crossing check, stop loss selection and the profit-saving volume of
+    PositionManager.save_profit_position are computed as array operations.
+
+    Args:
+        tickets: Position tickets
+        next_tps, next_sls, levels: Precomputed threshold, stop loss and ladder index per position
+        is_buy: Trade direction per position
+        prices: Current price per position (NaN if unknown)
+        volumes: Open volume per position
+        save_profits: Percentage of the volume to close at each TP level
+        close_positions: Close positions too small to split instead of skipping them
+        near_ratio: See find_crossings
+
+    Returns:
+        TrailingPlan
+    """
+    crossed, near = find_crossings(next_tps, next_sls, is_buy, prices, near_ratio)
+    levels = np.asarray(levels, dtype=int)
+    volumes = np.asarray(volumes, dtype=float)
+
+    ladder = np.asarray(save_profits or [], dtype=float)
+    if len(ladder):
+        percentages = np.where(levels < len(ladder), ladder[np.minimum(levels, len(ladder) - 1)], 0.0)
+    else:
+        percentages = np.zeros(len(levels))
+
+    # Half-up like round() on the float lot sizes (np.round would turn 0.025 into 0.02)
+    lots = np.floor(volumes * percentages + 0.5) / 100
+    below_minimum = (volumes <= 0.01) & (lots <= 0.01)
+    close_all = (lots > 0) & ((percentages == 100) | (below_minimum & close_positions))
+    partial = (lots > 0) & ~close_all & ~below_minimum
+    close_volumes = np.where(close_all, volumes, np.where(partial, lots, 0.0))
+
+    return TrailingPlan(tickets, crossed, near, np.asarray(next_sls, dtype=float),
+                        close_volumes, close_all, percentages)
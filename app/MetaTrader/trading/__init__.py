@@ -3,6 +3,8 @@
 from .market_data import MarketData
 from .orders import OrderManager
 from .positions import PositionManager
+from .retry import RetryPolicy, order_attempts
+from .order_queue import OrderQueue, order_queue
 from .validation import PriceValidator
 from .trading import TradingOperations
 from . import utils
@@ -11,6 +13,10 @@ __all__ = [
     'MarketData',
     'OrderManager',
     'PositionManager',
+    'RetryPolicy',
+    'OrderQueue',
+    'order_queue',
+    'order_attempts',
     'PriceValidator',
     'TradingOperations',
     'utils'
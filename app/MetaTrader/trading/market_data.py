@@ -1,3 +1,5 @@
+import time
+import threading
 import MetaTrader5 as mt5
 from loguru import logger
 
@@ -5,6 +7,13 @@ from loguru import logger
 class MarketData:
     """Handles market data queries and position/order information"""
 
+    # Symbol properties are shared by every MarketData in the process
+    _symbol_info_cache = {}
+    _symbol_info_cache_time = {}
+    _filling_modes_cache = {}
+    _cache_lock = threading.Lock()
+    _cache_duration = 300  # 5 minutes cache
+
     def __init__(self, magic_number=2025):
         self.magic = magic_number
 
@@ -18,6 +27,10 @@ class MarketData:
             return tick.bid if tick else None
         return tick.bid if tick else None
 
+    def get_tick(self, symbol):
+        """Get the last tick of the symbol"""
+        return mt5.symbol_info_tick(symbol)
+
     def get_open_positions(self, ticket_id=None):
         """Get open positions from MetaTrader"""
         if ticket_id != None:
@@ -42,9 +55,64 @@ class MarketData:
             orders = mt5.orders_get()
             return list(orders) if orders else []
 
+    def get_deals(self, date_from, date_to):
+        """Get history deals executed between two times (datetime or unix seconds)"""
+        deals = mt5.history_deals_get(date_from, date_to)
+        return list(deals) if deals else []
+
     def get_position_or_order(self, ticket_id):
         """Get position or order by ticket ID"""
         position = self.get_open_positions(ticket_id=ticket_id)
         if position != None:
             return position
-        return self.get_pending_orders(ticket_id=ticket_id)
\ No newline at end of file
+        return self.get_pending_orders(ticket_id=ticket_id)
+
+    def get_symbol_info(self, symbol):
+        """Get symbol properties with caching"""
+        current_time = time.time()
+        with self._cache_lock:
+            if (symbol in self._symbol_info_cache and
+                    current_time - self._symbol_info_cache_time[symbol] < self._cache_duration):
+                return self._symbol_info_cache[symbol]
+
+        symbol_info = mt5.symbol_info(symbol)
+        if symbol_info is not None:
+            with self._cache_lock:
+                self._symbol_info_cache[symbol] = symbol_info
+                self._symbol_info_cache_time[symbol] = current_time
+        return symbol_info
+
+    def get_digits(self, symbol):
+        """Get the number of decimal places of the symbol price"""
+        symbol_info = self.get_symbol_info(symbol)
+        return symbol_info.digits if symbol_info else None
+
+    def get_filling_modes(self, symbol):
+        """Get the order filling modes accepted for the symbol, preferred first"""
+        with self._cache_lock:
+            if symbol in self._filling_modes_cache:
+                return self._filling_modes_cache[symbol]
+
+        symbol_info = self.get_symbol_info(symbol)
+        if symbol_info is None:
+            return [mt5.ORDER_FILLING_IOC]
+
+        modes = []
+        if symbol_info.filling_mode & mt5.SYMBOL_FILLING_IOC:
+            modes.append(mt5.ORDER_FILLING_IOC)
+        if symbol_info.filling_mode & mt5.SYMBOL_FILLING_FOK:
+            modes.append(mt5.ORDER_FILLING_FOK)
+        # Return is accepted by every execution mode except market execution
+        if symbol_info.trade_exemode != mt5.SYMBOL_TRADE_EXECUTION_MARKET:
+            modes.append(mt5.ORDER_FILLING_RETURN)
+        if not modes:
+            modes.append(mt5.ORDER_FILLING_IOC)
+
+        logger.debug(f"Filling modes for {symbol}: {modes}")
+        with self._cache_lock:
+            self._filling_modes_cache[symbol] = modes
+        return modes
+
+    def get_filling_mode(self, symbol):
+        """Get the preferred order filling mode for the symbol"""
+        return self.get_filling_modes(symbol)[0]
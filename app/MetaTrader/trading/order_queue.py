@@ -0,0 +1,59 @@
+"""Shared queue for dispatching independent trade requests concurrently"""
+
+import threading
+import concurrent.futures
+from typing import Any, Dict, Iterable, List
+
+import MetaTrader5 as mt5
+from loguru import logger
+from Configure.metrics.Metrics import metrics
+
+
+class OrderQueue:
+    """Sends independent order_send requests on a small shared thread pool"""
+
+    def __init__(self, max_workers: int = 5):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="order-queue")
+            return self._executor
+
+    def submit(self, request: Dict[str, Any]) -> concurrent.futures.Future:
+        """Queue a single request, returning a future of its OrderSendResult"""
+        return self._get_executor().submit(mt5.order_send, request)
+
+    def send_all(self, requests: Iterable[Dict[str, Any]]) -> List[Any]:
+        """Send requests concurrently and return their results in the same order"""
+        requests = list(requests)
+        if not requests:
+            return []
+        metrics.increment('modifications_sent', len(requests))
+        if len(requests) == 1:
+            return [mt5.order_send(requests[0])]
+
+        futures = [self.submit(request) for request in requests]
+        results = []
+        for request, future in zip(requests, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Order request for {request.get('symbol')} failed: {e}")
+                results.append(None)
+        return results
+
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+# Global queue shared by all position managers in this process
+order_queue = OrderQueue()
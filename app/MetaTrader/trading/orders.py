@@ -2,16 +2,19 @@ import math
 import MetaTrader5 as mt5
 from loguru import logger
 from datetime import datetime, timedelta
+from .retry import RetryPolicy
+from ..monitoring.registry import position_registry
 
 
 class OrderManager:
     """Handles order execution, modification, and management"""
 
-    def __init__(self, connection_manager, market_data, validator, magic_number=2025):
+    def __init__(self, connection_manager, market_data, validator, magic_number=2025, retry_policy=None):
         self.connection = connection_manager
         self.market_data = market_data
         self.validator = validator
         self.magic = magic_number
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
 
     def determine_order_type_and_price(self, symbol, open_order_price, order_type_signal, distance_threshold=None, force=False):
         """Determine order type based on price and strategy"""
@@ -60,14 +63,15 @@ class OrderManager:
         """Open a new position or pending order"""
         try:
             # Get filling mode
-            # filling_mode = mt5.symbol_info(symbol).filling_mode - 1
+            filling_mode = self.market_data.get_filling_mode(symbol)
 
+            tick = mt5.symbol_info_tick(symbol)
             # Take ask price
-            ask_price = mt5.symbol_info_tick(symbol).ask
+            ask_price = tick.ask
             # Take bid price
-            bid_price = mt5.symbol_info_tick(symbol).bid
+            bid_price = tick.bid
             # Take the point of the asset
-            point = mt5.symbol_info(symbol).point
+            point = self.market_data.get_symbol_info(symbol).point
             deviation = 20  # mt5.getSlippage(symbol)
 
             type = self.determine_order_type_and_price(
@@ -99,7 +103,7 @@ class OrderManager:
                 "price": openPrice,
                 "sl": stopLoss,
                 "tp": takeProfit,
-                "type_filling": mt5.ORDER_FILLING_IOC,
+                "type_filling": filling_mode,
                 # comment.replace("https://t.me/", ""),
                 # "comment": "TelegramTrader",
                 "deviation": deviation,
@@ -110,33 +114,30 @@ class OrderManager:
             # expiration
             if type != mt5.ORDER_TYPE_BUY and type != mt5.ORDER_TYPE_SELL:
                 if expirePendinOrderInMinutes != None and expirePendinOrderInMinutes != 0:
-                    symbol_info = mt5.symbol_info(symbol)
-                    timestamp = symbol_info.time
-                    # Calculate expiration time
-                    expiration_time = datetime.fromtimestamp(
-                        timestamp) + timedelta(minutes=expirePendinOrderInMinutes)
-                    expiration_timestamp = int(expiration_time.timestamp())
-                    request["expiration"] = expiration_timestamp
-                    request["type_time"] = mt5.ORDER_TIME_SPECIFIED
+                    symbol_info = self.market_data.get_symbol_info(symbol)
+                    if symbol_info.expiration_mode & mt5.SYMBOL_EXPIRATION_SPECIFIED:
+                        # Calculate expiration time from the server time of the last tick
+                        expiration_time = datetime.fromtimestamp(
+                            tick.time) + timedelta(minutes=expirePendinOrderInMinutes)
+                        expiration_timestamp = int(expiration_time.timestamp())
+                        request["expiration"] = expiration_timestamp
+                        request["type_time"] = mt5.ORDER_TIME_SPECIFIED
+                    # Otherwise the broker keeps the order GTC and the monitoring loop
+                    # of the account cancels it once its setup time is old enough
 
             logger.info(f"[User {self.connection.user}] Opening {type} order: {symbol} {lot} lots @ {price}, SL: {sl}, TP: {tp}")
 
-            # Send trading request
-            result = mt5.order_send(request)
+            # Send trading request, retrying requotes and busy contexts
+            result = self.retry_policy.execute(
+                request, self._reprice_request, user_prefix=f"[User {self.connection.user}] ",
+                find_sent=self.find_sent_order)
 
             if result is not None:
                 if result.retcode != mt5.TRADE_RETCODE_DONE:
                     logger.error(f"[User {self.connection.user}] Order failed (code {result.retcode}): {result.comment}")
                     logger.debug(f"[User {self.connection.user}] Current market price: {self.market_data.get_current_price(symbol)}")
 
-                    if result.retcode == 10015 and not force:  # Invalid price
-                        logger.warning(f"[User {self.connection.user}] Retrying with market order due to invalid price")
-                        if type in [mt5.ORDER_TYPE_BUY, mt5.ORDER_TYPE_BUY_STOP, mt5.ORDER_TYPE_BUY_LIMIT]:
-                            type = mt5.ORDER_TYPE_BUY
-                        elif type in [mt5.ORDER_TYPE_SELL, mt5.ORDER_TYPE_SELL_LIMIT, mt5.ORDER_TYPE_SELL_STOP]:
-                            type = mt5.ORDER_TYPE_SELL
-                        return self.open_position(type, lot, symbol, sl, tp, price, expirePendinOrderInMinutes, comment, signal_id, closerPrice, isFirst, isSecond, force=True)
-                    elif result.retcode == 10027:
+                    if result.retcode == 10027:
                         logger.critical(f"[User {self.connection.user}] Algorithmic trading not enabled in MetaTrader terminal")
                     else:
                         logger.error(f"[User {self.connection.user}] Order error details: {mt5.last_error()}")
@@ -146,7 +147,7 @@ class OrderManager:
                 logger.error(f"[User {self.connection.user}] Order send failed - no response from MetaTrader")
 
             # save in database
-            if signal_id != None:
+            if signal_id != None and result is not None and result.order:
                 position_data = {
                     "signal_id": signal_id,
                     "user_id": self.connection.user,
@@ -156,11 +157,71 @@ class OrderManager:
                 }
                 from Database import Migrations
                 Migrations.position_repo.insert(position_data)
+                position_registry.register(result.order, signal_id, isFirst, isSecond, sl)
 
             return result
         except Exception as ex:
             logger.error(f"Unexpected error in open trade position: {ex}")
 
+    def _reprice_request(self, request, rule):
+        """Build the next attempt of a rejected request from a fresh tick"""
+        order_type = request["type"]
+
+        if rule.to_market and order_type not in [mt5.ORDER_TYPE_BUY, mt5.ORDER_TYPE_SELL]:
+            logger.warning(f"[User {self.connection.user}] Retrying with market order due to invalid price")
+            if order_type in [mt5.ORDER_TYPE_BUY_STOP, mt5.ORDER_TYPE_BUY_LIMIT]:
+                order_type = mt5.ORDER_TYPE_BUY
+            else:
+                order_type = mt5.ORDER_TYPE_SELL
+            request.pop("expiration", None)
+            request.update({
+                "action": mt5.TRADE_ACTION_DEAL,
+                "type": order_type,
+                "type_time": mt5.ORDER_TIME_GTC,
+            })
+
+        if rule.next_filling:
+            modes = self.market_data.get_filling_modes(request["symbol"])
+            if request.get("type_filling") in modes:
+                position = modes.index(request["type_filling"]) + 1
+                if position >= len(modes):
+                    return None
+                request["type_filling"] = modes[position]
+            else:
+                request["type_filling"] = modes[0]
+            logger.warning(f"[User {self.connection.user}] Retrying with filling mode {request['type_filling']}")
+
+        # Pending orders keep their level, market orders follow the current quote
+        if request["action"] == mt5.TRADE_ACTION_DEAL:
+            tick = mt5.symbol_info_tick(request["symbol"])
+            if tick is None:
+                return None
+            request["price"] = tick.ask if order_type == mt5.ORDER_TYPE_BUY else tick.bid
+
+        return request
+
+    def find_sent_order(self, request):
+        """
+        Find the position or pending order opened by a request whose answer was lost.
+
+        any_position_by_data rejected the request if such a position already
+        existed, so a match on magic, volume, sl and tp was opened by it.
+
+        Returns:
+            Ticket of the match, None if the request was not executed
+        """
+        def sent(item, volume):
+            return (item.magic == request["magic"] and volume == request["volume"]
+                    and item.sl == request["sl"] and item.tp == request["tp"])
+
+        for position in mt5.positions_get(symbol=request["symbol"]) or ():
+            if sent(position, position.volume):
+                return position.ticket
+        for order in mt5.orders_get(symbol=request["symbol"]) or ():
+            if sent(order, order.volume_initial):
+                return order.ticket
+        return None
+
     def any_position_by_data(self, symbol, openPrice, sl, tp):
         """Check if any position or order already exists by this data"""
         positions = mt5.positions_get(symbol=symbol)
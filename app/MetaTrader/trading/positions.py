@@ -1,6 +1,8 @@
 import math
 import MetaTrader5 as mt5
 from loguru import logger
+from .order_queue import order_queue
+from ..monitoring.registry import position_registry
 
 
 class PositionManager:
@@ -37,7 +39,6 @@ class PositionManager:
             "action": action,
             "magic": self.magic,
             "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
         }
 
         if action == mt5.TRADE_ACTION_DEAL:
@@ -68,7 +69,8 @@ class PositionManager:
                 "price": price,
                 "deviation": 10,
                 "type": order_type,
-                "position": ticket
+                "position": ticket,
+                "type_filling": self.market_data.get_filling_mode(symbol)
             })
 
             user_prefix = f"[User {self.connection.user}] " if self.connection else ""
@@ -90,6 +92,50 @@ class PositionManager:
         logger.success(f"{user_prefix}Successfully closed/cancelled ticket {ticket}")
         return True
 
+    def cancel_orders(self, tickets, orders=None):
+        """
+        Cancel several pending orders in one concurrent batch.
+
+        Args:
+            tickets: Pending order tickets
+            orders: ticket -> pending order, read from the terminal if omitted
+
+        Returns:
+            dict: ticket -> True if the order was cancelled
+        """
+        results = {ticket: False for ticket in tickets}
+        if not results:
+            return results
+        if orders is None:
+            orders = {o.ticket: o for o in self.market_data.get_pending_orders() if o.ticket in results}
+
+        requests = {}
+        for ticket in results:
+            order = orders.get(ticket)
+            if order is None:
+                logger.warning(f"Pending order {ticket} not found")
+                continue
+            requests[ticket] = {
+                "action": mt5.TRADE_ACTION_REMOVE,
+                "order": ticket,
+                "magic": self.magic,
+                "type_time": mt5.ORDER_TIME_GTC,
+            }
+
+        if not requests:
+            return results
+
+        user_prefix = f"[User {self.connection.user}] " if self.connection else ""
+        for ticket, result in zip(requests.keys(), order_queue.send_all(requests.values())):
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                comment = result.comment if result is not None else "no response"
+                logger.error(f"{user_prefix}Failed to close/cancel {ticket}: {comment}")
+            else:
+                results[ticket] = True
+                position_registry.remove(ticket)
+                logger.success(f"{user_prefix}Successfully closed/cancelled ticket {ticket}")
+        return results
+
     def close_half_position(self, ticket):
         """Close half of the position volume"""
         position = self.market_data.get_open_positions(ticket)
@@ -112,7 +158,7 @@ class PositionManager:
                 "magic": self.magic,
                 # "comment": "Closing half position",
                 "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
+                "type_filling": self.market_data.get_filling_mode(position.symbol),
             }
             result = mt5.order_send(request)
             logger.info(f"{result}")
@@ -196,7 +242,7 @@ class PositionManager:
                 "magic": self.magic,
                 "comment": f"Profit taking {profit_percentage}%",
                 "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
+                "type_filling": self.market_data.get_filling_mode(position.symbol),
             }
 
             result = mt5.order_send(request)
@@ -282,4 +328,192 @@ class PositionManager:
             return False
         else:
             logger.success(f"Stop loss updated successfully for ticket {ticket} to {new_stop_loss}")
-            return True
\ No newline at end of file
+            position_registry.update_stop_loss(ticket, new_stop_loss)
+            return True
+
+    def modify_stops(self, tickets, sl=None, tp=None):
+        """
+        Update stop loss and/or take profit for several positions or pending orders.
+        All tickets are resolved from one positions/orders snapshot and the
+        modifications are sent concurrently through the order queue.
+
+        Returns:
+            dict: ticket -> True if the modification was applied
+        """
+        tickets = set(tickets)
+        results = {ticket: False for ticket in tickets}
+        if not tickets or (sl is None and tp is None):
+            return results
+
+        positions = {p.ticket: p for p in self.market_data.get_open_positions() if p.ticket in tickets}
+        orders = {o.ticket: o for o in self.market_data.get_pending_orders()
+                  if o.ticket in tickets and o.ticket not in positions}
+
+        requests = {}
+        for ticket in tickets:
+            item = positions.get(ticket) or orders.get(ticket)
+            if item is None:
+                logger.warning(f"Ticket {ticket} not found as position or order")
+                continue
+
+            digits = self.market_data.get_digits(item.symbol)
+            if digits is None:
+                logger.error(f"Symbol info not found for {item.symbol}")
+                continue
+
+            new_sl = round(float(sl), digits) if sl is not None else item.sl
+            new_tp = round(float(tp), digits) if tp is not None else item.tp
+            if item.sl == new_sl and item.tp == new_tp:
+                continue  # Already at target SL/TP
+
+            if ticket in positions:
+                requests[ticket] = {
+                    "action": mt5.TRADE_ACTION_SLTP,
+                    "position": ticket,
+                    "symbol": item.symbol,
+                    "sl": float(new_sl),
+                    "tp": float(new_tp),
+                    "magic": item.magic,
+                    "deviation": 10
+                }
+            else:
+                requests[ticket] = {
+                    "action": mt5.TRADE_ACTION_MODIFY,
+                    "order": ticket,
+                    "symbol": item.symbol,
+                    "price": item.price_open,
+                    "sl": float(new_sl),
+                    "tp": float(new_tp),
+                    "type_time": item.type_time,
+                    "type_filling": item.type_filling
+                }
+
+        if not requests:
+            return results
+
+        logger.info(f"Modifying stops of {len(requests)} tickets - SL: {sl}, TP: {tp}")
+        for ticket, result in zip(requests.keys(), order_queue.send_all(requests.values())):
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                comment = result.comment if result is not None else "no response"
+                logger.error(f"Failed to modify stops for ticket {ticket}: {comment}")
+            else:
+                results[ticket] = True
+                position_registry.update_stop_loss(ticket, requests[ticket]["sl"])
+
+        logger.success(f"Stops updated for {sum(results.values())}/{len(requests)} tickets")
+        return results
+
+    def set_stop_losses(self, stops, positions=None):
+        """
+        Move the stop loss of several open positions, each to its own level,
+        in one concurrent batch through the order queue.
+
+        Args:
+            stops: ticket -> new stop loss
+            positions: ticket -> open position, read from the terminal if omitted
+
+        Returns:
+            dict: ticket -> True if the stop loss was moved
+        """
+        results = {ticket: False for ticket in stops}
+        if not stops:
+            return results
+        if positions is None:
+            positions = {p.ticket: p for p in self.market_data.get_open_positions() if p.ticket in stops}
+
+        requests = {}
+        for ticket, sl in stops.items():
+            position = positions.get(ticket)
+            if position is None:
+                logger.warning(f"Position {ticket} not found for stop loss update")
+                continue
+
+            digits = self.market_data.get_digits(position.symbol)
+            if digits is None:
+                logger.error(f"Symbol info not found for {position.symbol}")
+                continue
+
+            new_sl = round(sl, digits)
+            if position.sl == new_sl:
+                continue  # Already at target SL
+
+            requests[ticket] = {
+                "action": mt5.TRADE_ACTION_SLTP,
+                "position": ticket,
+                "symbol": position.symbol,
+                "sl": float(new_sl),
+                "tp": position.tp,
+                "magic": position.magic,
+                "deviation": 10
+            }
+
+        if not requests:
+            return results
+
+        logger.info(f"Updating stop loss of {len(requests)} positions")
+        for ticket, result in zip(requests.keys(), order_queue.send_all(requests.values())):
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                comment = result.comment if result is not None else "no response"
+                logger.error(f"Failed to update stop loss for ticket {ticket}: {comment}")
+            else:
+                results[ticket] = True
+                position_registry.update_stop_loss(ticket, requests[ticket]["sl"])
+                logger.success(f"Stop loss updated successfully for ticket {ticket} to {requests[ticket]['sl']}")
+        return results
+
+    def close_volumes(self, closes, positions=None):
+        """
+        Close part or all of several open positions in one concurrent batch.
+
+        Args:
+            closes: ticket -> (volume to close, profit percentage for the order comment)
+            positions: ticket -> open position, read from the terminal if omitted
+
+        Returns:
+            dict: ticket -> True if the volume was closed
+        """
+        results = {ticket: False for ticket in closes}
+        if not closes:
+            return results
+        if positions is None:
+            positions = {p.ticket: p for p in self.market_data.get_open_positions() if p.ticket in closes}
+
+        requests = {}
+        for ticket, (volume, percentage) in closes.items():
+            position = positions.get(ticket)
+            if position is None:
+                logger.warning(f"Position {ticket} not found for profit saving")
+                continue
+
+            tick = self.market_data.get_tick(position.symbol)
+            if tick is None:
+                logger.error(f"Failed to get close price for symbol {position.symbol}")
+                continue
+
+            is_buy = position.type == mt5.ORDER_TYPE_BUY
+            requests[ticket] = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": position.symbol,
+                "volume": float(volume),
+                "type": mt5.ORDER_TYPE_SELL if is_buy else mt5.ORDER_TYPE_BUY,
+                "position": ticket,
+                "price": tick.bid if is_buy else tick.ask,
+                "deviation": 10,
+                "magic": self.magic,
+                "comment": f"Profit taking {percentage:g}%",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": self.market_data.get_filling_mode(position.symbol),
+            }
+
+        if not requests:
+            return results
+
+        logger.info(f"Saving profit on {len(requests)} positions")
+        for ticket, result in zip(requests.keys(), order_queue.send_all(requests.values())):
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                comment = result.comment if result is not None else "no response"
+                logger.error(f"Failed to save profit for position {ticket}: {comment}")
+            else:
+                results[ticket] = True
+                logger.success(f"Closed {requests[ticket]['volume']} lots of position {ticket} ({requests[ticket]['symbol']})")
+        return results
@@ -0,0 +1,263 @@
+"""Retry policy for order requests rejected with transient trade server return codes"""
+
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import MetaTrader5 as mt5
+from loguru import logger
+
+
+# Return codes that mean the request was accepted by the trade server
+SUCCESS_RETCODES = (
+    10008,  # TRADE_RETCODE_PLACED
+    10009,  # TRADE_RETCODE_DONE
+    10010,  # TRADE_RETCODE_DONE_PARTIAL
+)
+
+
+class RetryRule:
+    """Retry behaviour for one class of trade server return codes"""
+
+    def __init__(self, name: str, retcodes, max_attempts: int = 3, backoff: float = 0.1,
+                 reprice: bool = True, to_market: bool = False, next_filling: bool = False, verify: bool = False):
+        self.name = name
+        self.retcodes = frozenset(int(code) for code in retcodes)
+        self.max_attempts = int(max_attempts)
+        self.backoff = float(backoff)
+        self.reprice = reprice
+        self.to_market = to_market
+        self.next_filling = next_filling
+        self.verify = verify  # the request may have been executed; look for it before resending
+
+    def delay(self, attempt: int, max_backoff: float) -> float:
+        """Exponential backoff for the given retry number (1-based), capped at max_backoff"""
+        return min(max_backoff, self.backoff * (2 ** (attempt - 1)))
+
+
+class OrderAttempt:
+    """Outcome of a single order_send call"""
+
+    def __init__(self, symbol: str, order_type: int, attempt: int, retcode: Optional[int],
+                 price: float, latency: float, rule: Optional[str] = None, comment: str = ""):
+        self.symbol = symbol
+        self.order_type = order_type
+        self.attempt = attempt
+        self.retcode = retcode
+        self.price = price
+        self.latency = latency
+        self.rule = rule
+        self.comment = comment
+        self.created_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary"""
+        return {
+            "symbol": self.symbol,
+            "order_type": self.order_type,
+            "attempt": self.attempt,
+            "retcode": self.retcode,
+            "price": self.price,
+            "latency": self.latency,
+            "rule": self.rule,
+            "comment": self.comment,
+            "created_at": self.created_at
+        }
+
+
+class OrderAttemptLog:
+    """Thread-safe record of recent order attempts with fill-rate statistics"""
+
+    def __init__(self, max_size: int = 1000):
+        self.attempts = deque(maxlen=max_size)
+        self.lock = threading.Lock()
+        self._requests = 0
+        self._filled = 0
+        self._retcodes: Dict[Optional[int], int] = {}
+
+    def record(self, attempt: OrderAttempt) -> None:
+        """Store a single attempt"""
+        with self.lock:
+            self.attempts.append(attempt)
+            self._retcodes[attempt.retcode] = self._retcodes.get(attempt.retcode, 0) + 1
+
+    def record_request(self, filled: bool) -> None:
+        """Store the final outcome of a request after all of its attempts"""
+        with self.lock:
+            self._requests += 1
+            if filled:
+                self._filled += 1
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get the most recent attempts, newest last"""
+        with self.lock:
+            return [attempt.to_dict() for attempt in list(self.attempts)[-limit:]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get fill-rate statistics"""
+        with self.lock:
+            fill_rate = (self._filled / self._requests) if self._requests > 0 else 0.0
+            return {
+                'requests': self._requests,
+                'filled': self._filled,
+                'fill_rate': fill_rate,
+                'attempts': sum(self._retcodes.values()),
+                'retcodes': dict(self._retcodes)
+            }
+
+
+class RetryPolicy:
+    """Retries order requests per retcode class with bounded backoff and a total latency cap"""
+
+    DEFAULT_RULES = {
+        # Price moved between the tick and the request - re-price and resend quickly
+        'requote': {
+            'retcodes': [10004, 10020, 10021],  # REQUOTE, PRICE_CHANGED, PRICE_OFF
+            'max_attempts': 3,
+            'backoff': 0.05,
+        },
+        # Trade context is busy - wait a little longer before resending
+        'busy': {
+            'retcodes': [10024, 10028],  # TOO_MANY_REQUESTS, LOCKED
+            'max_attempts': 3,
+            'backoff': 0.25,
+        },
+        # No answer from the server - the request may have been executed, resend only if nothing was opened
+        'uncertain': {
+            'retcodes': [10012, 10031],  # TIMEOUT, CONNECTION
+            'max_attempts': 1,
+            'backoff': 0.5,
+            'verify': True,
+        },
+        # Pending price is no longer valid - fall back to a market order
+        'invalid_price': {
+            'retcodes': [10015],  # INVALID_PRICE
+            'max_attempts': 1,
+            'backoff': 0.0,
+            'to_market': True,
+        },
+        # Filling mode not accepted for the symbol - try the next allowed one
+        'invalid_fill': {
+            'retcodes': [10030],  # INVALID_FILL
+            'max_attempts': 2,
+            'backoff': 0.0,
+            'next_filling': True,
+        },
+    }
+
+    def __init__(self, rules: Optional[Dict[str, Dict[str, Any]]] = None, max_backoff: float = 1.0,
+                 max_total_latency: float = 3.0, attempt_log: Optional[OrderAttemptLog] = None):
+        self.max_backoff = float(max_backoff)
+        self.max_total_latency = float(max_total_latency)
+        self.attempt_log = attempt_log if attempt_log is not None else order_attempts
+
+        merged = {name: dict(rule) for name, rule in self.DEFAULT_RULES.items()}
+        for name, rule in (rules or {}).items():
+            merged.setdefault(name, {}).update(rule)
+        self.rules = [RetryRule(name, **rule) for name, rule in merged.items()]
+
+        self._rules_by_retcode: Dict[int, RetryRule] = {}
+        for rule in self.rules:
+            for retcode in rule.retcodes:
+                self._rules_by_retcode[retcode] = rule
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'RetryPolicy':
+        """Create a policy from the MetaTrader.OrderRetry settings section"""
+        config = config or {}
+        return cls(
+            rules=config.get('rules'),
+            max_backoff=config.get('maxBackoff', 1.0),
+            max_total_latency=config.get('maxTotalLatency', 3.0)
+        )
+
+    @classmethod
+    def from_settings(cls) -> 'RetryPolicy':
+        """Create a policy from the application settings"""
+        from Configure.settings.Settings import Settings
+        return cls.from_config(Settings.mt_order_retry())
+
+    def classify(self, retcode: Optional[int]) -> Optional[RetryRule]:
+        """Get the retry rule for a return code, None if it is final"""
+        if retcode is None:
+            return None
+        return self._rules_by_retcode.get(retcode)
+
+    def execute(self, request: Dict[str, Any],
+                reprice: Optional[Callable[[Dict[str, Any], RetryRule], Optional[Dict[str, Any]]]] = None,
+                user_prefix: str = "",
+                find_sent: Optional[Callable[[Dict[str, Any]], Optional[int]]] = None):
+        """
+        Send a trading request, retrying transient failures.
+
+        Args:
+            request: Request passed to mt5.order_send
+            reprice: Callback that builds the next request from a fresh tick.
+                Returning None aborts the retry.
+            user_prefix: Log prefix identifying the account
+            find_sent: Callback returning the ticket opened by a request, None if
+                there is none. Requests rejected by a verify rule are only resent
+                when it finds nothing; without it those retcodes are final.
+
+        Returns:
+            The last OrderSendResult (or None if the terminal did not respond)
+        """
+        started = time.monotonic()
+        retries: Dict[str, int] = {}
+        attempt = 0
+        result = None
+
+        while True:
+            attempt += 1
+            sent_at = time.monotonic()
+            result = mt5.order_send(request)
+            latency = time.monotonic() - sent_at
+
+            retcode = result.retcode if result is not None else None
+            rule = self.classify(retcode)
+            if rule is not None and rule.verify and find_sent is None:
+                rule = None  # resending could open a duplicate when the request cannot be looked up
+            self.attempt_log.record(OrderAttempt(
+                request.get("symbol"), request.get("type"), attempt, retcode,
+                request.get("price"), latency, rule.name if rule else None,
+                result.comment if result is not None else ""))
+
+            if result is None or retcode in SUCCESS_RETCODES or rule is None:
+                break
+
+            retries[rule.name] = retries.get(rule.name, 0) + 1
+            if retries[rule.name] > rule.max_attempts:
+                logger.warning(f"{user_prefix}Giving up on {rule.name} retries after {rule.max_attempts} attempts (code {retcode})")
+                break
+
+            delay = rule.delay(retries[rule.name], self.max_backoff)
+            elapsed = time.monotonic() - started
+            if elapsed + delay > self.max_total_latency:
+                logger.warning(f"{user_prefix}Retry latency budget of {self.max_total_latency}s exhausted (code {retcode})")
+                break
+
+            logger.warning(f"{user_prefix}Order rejected with code {retcode} ({rule.name}), retry {retries[rule.name]}/{rule.max_attempts} in {delay:.2f}s")
+            if delay > 0:
+                time.sleep(delay)
+
+            if rule.verify:
+                ticket = find_sent(request)
+                if ticket is not None:
+                    logger.warning(f"{user_prefix}Order with code {retcode} was executed as ticket {ticket}, not resending")
+                    result = result._replace(retcode=mt5.TRADE_RETCODE_DONE, order=ticket)
+                    retcode = result.retcode
+                    break
+
+            if reprice is not None and (rule.reprice or rule.to_market or rule.next_filling):
+                next_request = reprice(dict(request), rule)
+                if next_request is None:
+                    break
+                request = next_request
+
+        self.attempt_log.record_request(retcode in SUCCESS_RETCODES)
+        return result
+
+
+# Global attempt log shared by all order managers in this process
+order_attempts = OrderAttemptLog()
@@ -1,36 +1,71 @@
+import time
 from datetime import datetime
 from loguru import logger
 import Database
 from Database import Migrations
 from ..connection import AccountConfig
+from ..monitoring.registry import position_registry
 
 
 class TradingOperations:
     """High-level trading operations and signal processing"""
 
     @staticmethod
-    def trade(message_username, message_id, message_chatid, actionType, symbol, openPrice, secondPrice, tp_list, sl, comment):
+    def trade_all_accounts(message_username, message_id, message_chatid, actionType, symbol, openPrice, secondPrice, tp_list, sl, comment):
+        """Execute a trading operation on every configured account"""
+        return TradingOperations.on_all_accounts(
+            'trade', message_username, message_id, message_chatid, actionType, symbol, openPrice, secondPrice, tp_list, sl, comment)
+
+    @staticmethod
+    def on_all_accounts(operation, *args):
+        """
+        Run an account operation on every configured account.
+
+        Each account runs it in the process that owns its terminal: the
+        in-process account here, the others in their execution workers, in
+        parallel with this one. The main process therefore never drives the
+        terminal of a worker account.
+
+        Args:
+            operation: Name of a TradingOperations method taking an account keyword
+            *args: Operation arguments
+
+        Returns:
+            dict: account name -> result of the operation (None on failure)
+        """
+        from ..workers import get_dispatcher, split_accounts
+
+        local, remote = split_accounts(AccountConfig.load_all())
+        dispatcher = get_dispatcher(remote) if remote else None
+        futures = dispatcher.submit(operation, *args) if dispatcher else {}
+        results = {}
+        try:
+            for account in local:
+                results[f"{account.username}@{account.server}"] = getattr(TradingOperations, operation)(*args, account=account)
+        finally:
+            if dispatcher:
+                results.update(dispatcher.collect(futures, dispatcher.timeout_for(operation)))
+                # Workers wrote their rows from their own processes, so this process' cache has not seen them
+                Migrations.invalidate_cache()
+        return results
+
+    @staticmethod
+    def _account_signal(signal_id, account):
+        """Get the copy of a signal saved by the given account (each account saves its own)"""
+        signal = Migrations.get_signal_by_id(signal_id)
+        if signal is None:
+            return None
+        return Migrations.get_signal_by_chat(
+            signal['telegram_message_chatid'], signal['telegram_message_id'], account.username)
+
+    @staticmethod
+    def trade(message_username, message_id, message_chatid, actionType, symbol, openPrice, secondPrice, tp_list, sl, comment, account=None):
         """Execute a complete trading operation"""
         # logger.debug(f"Processing trade signal: {actionType.name} {symbol}")
 
-        from Configure.settings.Settings import Settings
         from ..MetaTrader import MetaTrader
 
-        mtAccount = AccountConfig({
-            'server': Settings.mt_server(),
-            'username': Settings.mt_username(),
-            'password': Settings.mt_password(),
-            'path': Settings.mt_path(),
-            'lot': Settings.mt_lot(),
-            'HighRisk': Settings.mt_high_risk(),
-            'SaveProfits': Settings.mt_save_profits(),
-            'AccountSize': Settings.mt_account_size(),
-            'CloserPrice': Settings.mt_closer_price(),
-            'expirePendinOrderInMinutes': Settings.mt_expire_pending_orders_minutes(),
-            'ClosePositionsOnTrail': Settings.mt_close_positions_on_trail(),
-            'disableCache': Settings.disable_cache(),
-            'SymbolMappings': Settings.mt_symbol_mappings()
-        })
+        mtAccount = account if account is not None else AccountConfig.from_settings()
 
         # Convert action type
         if actionType.value == 1:  # buy
@@ -95,7 +130,6 @@ class TradingOperations:
             'price': openPrice,
             'expirePendinOrderInMinutes': mtAccount.expirePendinOrderInMinutes,
             'comment': comment,
-            'signal_id': None,  # Will be set after signal creation
             'closerPrice': mtAccount.CloserPrice,
             'isFirst': True,
             'isSecond': False,
@@ -118,7 +152,6 @@ class TradingOperations:
                 'price': secondPrice,
                 'expirePendinOrderInMinutes': mtAccount.expirePendinOrderInMinutes,
                 'comment': comment,
-                'signal_id': None,  # Will be set after signal creation
                 'closerPrice': mtAccount.CloserPrice,
                 'isFirst': False,
                 'isSecond': True,
@@ -126,79 +159,72 @@ class TradingOperations:
             }
             position_params.append(second_params)
 
-        # Save to database with transaction for atomicity
-        import sqlite3
-        signal_id = None
+        # Save the signal and its TP levels before sending, so edits, deletions and the registry find it
+        unit_of_work = Database.UnitOfWork()
+        unit_of_work.add_signal({
+            "telegram_channel_title": message_username,
+            "telegram_message_id": message_id,
+            "telegram_message_chatid": message_chatid,
+            "open_price": openPrice,
+            "second_price": secondPrice,
+            "stop_loss": sl,
+            "tp_list": ','.join(map(str, validated_tp_levels)) if validated_tp_levels else '',
+            "symbol": symbol,
+            "current_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }, validated_tp_levels or [])
         try:
-            # Use transaction for atomic signal + position inserts
-            conn = Migrations.signal_repo._connect()
-            conn.execute("BEGIN TRANSACTION")
-
-            signal_data = {
-                "telegram_channel_title": message_username,
-                "telegram_message_id": message_id,
-                "telegram_message_chatid": message_chatid,
-                "open_price": openPrice,
-                "second_price": secondPrice,
-                "stop_loss": sl,
-                "tp_list": ','.join(map(str, validated_tp_levels)) if validated_tp_levels else '',
-                "symbol": symbol,
-                "current_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            signal_id = Migrations.signal_repo.insert(signal_data)
-
-            # Update signal_id in position params
-            for params in position_params:
-                params['signal_id'] = signal_id
-
-            conn.commit()
-            logger.debug(f"Signal {signal_id} saved to database atomically")
-
+            signal_id, = unit_of_work.commit()
         except Exception as e:
-            if 'conn' in locals():
-                conn.rollback()
-            logger.error(f"Database transaction failed: {e}")
+            logger.error(f"Failed to save signal: {e}")
             raise
-        finally:
-            if 'conn' in locals():
-                conn.close()
-
-        # Execute position openings sequentially
-        if position_params:
-            for params in position_params:
-                mt.OpenPosition(
-                    params['actionType'], params['lot'], params['symbol'], params['sl'], params['tp'], params['price'],
-                    params['expirePendinOrderInMinutes'], params['comment'], params['signal_id'],
-                    params['closerPrice'], params['isFirst'], params['isSecond']
-                )
+
+        # Execute position openings sequentially; sent tickets are managed right away
+        positions = Database.UnitOfWork()
+        signal = positions.add_positions(signal_id)
+        for params in position_params:
+            result = mt.OpenPosition(
+                params['actionType'], params['lot'], params['symbol'], params['sl'], params['tp'], params['price'],
+                params['expirePendinOrderInMinutes'], params['comment'], None,
+                params['closerPrice'], params['isFirst'], params['isSecond']
+            )
+            if result is not None and result.order:
+                signal.add_position(result.order, mtAccount.username, params['isFirst'], params['isSecond'])
+                position_registry.register(result.order, signal_id, params['isFirst'], params['isSecond'], sl)
+
+        TradingOperations._save_positions(positions, signal)
+        logger.debug(f"Signal {signal_id} saved to database with {len(signal.positions)} positions")
+        return signal_id
+
+    @staticmethod
+    def _save_positions(unit_of_work, signal, attempts=3, delay=0.5):
+        """Save the tickets of sent orders, retrying because the orders are already live"""
+        for attempt in range(1, attempts + 1):
+            try:
+                unit_of_work.commit()
+                return
+            except Exception as e:
+                tickets = [position["position_id"] for position in signal.positions]
+                if attempt == attempts:
+                    logger.error(f"Failed to save positions {tickets} of signal {signal.id}: {e}")
+                    raise
+                logger.warning(f"Saving positions {tickets} of signal {signal.id} failed (attempt {attempt}): {e}")
+                time.sleep(delay * attempt)
 
     @staticmethod
-    def risk_free_positions(chat_id, message_id):
+    def risk_free_positions(chat_id, message_id, account=None):
         """Move stop loss to entry price for risk-free positions - Optimized for performance"""
+        if account is None:
+            return TradingOperations.on_all_accounts('risk_free_positions', chat_id, message_id)
+
         import concurrent.futures
         import threading
 
         logger.info(
             f"Applying risk-free strategy for chat {chat_id}, message {message_id}")
 
-        from Configure.settings.Settings import Settings
         from ..MetaTrader import MetaTrader
 
-        mtAccount = AccountConfig({
-            'server': Settings.mt_server(),
-            'username': Settings.mt_username(),
-            'password': Settings.mt_password(),
-            'path': Settings.mt_path(),
-            'lot': Settings.mt_lot(),
-            'HighRisk': Settings.mt_high_risk(),
-            'SaveProfits': Settings.mt_save_profits(),
-            'AccountSize': Settings.mt_account_size(),
-            'CloserPrice': Settings.mt_closer_price(),
-            'expirePendinOrderInMinutes': Settings.mt_expire_pending_orders_minutes(),
-            'ClosePositionsOnTrail': Settings.mt_close_positions_on_trail(),
-            'disableCache': Settings.disable_cache(),
-            'SymbolMappings': Settings.mt_symbol_mappings()
-        })
+        mtAccount = account
         mt = MetaTrader(
             path=mtAccount.path,
             server=mtAccount.server,
@@ -212,7 +238,7 @@ class TradingOperations:
 
         # Get position tickets for this signal
         position_tickets = Migrations.get_last_signal_positions_by_chatid_and_messageid(
-            chat_id, message_id)
+            chat_id, message_id, mtAccount.username)
 
         if not position_tickets:
             logger.warning(f"No positions found for chat {chat_id}, message {message_id}")
@@ -310,29 +336,16 @@ class TradingOperations:
         logger.success(f"Risk-free operation completed: {successful_operations}/{len(relevant_positions)} positions processed successfully")
 
     @staticmethod
-    def update_last_signal(chat_id, stop_loss):
+    def update_last_signal(chat_id, stop_loss, account=None):
         """Update stop loss for last signal"""
+        if account is None:
+            return TradingOperations.on_all_accounts('update_last_signal', chat_id, stop_loss)
+
         logger.info(
             f"Updating stop loss to {stop_loss} for last signal in chat {chat_id}")
 
-        from Configure.settings.Settings import Settings
         from ..MetaTrader import MetaTrader
 
-        account = AccountConfig({
-            'server': Settings.mt_server(),
-            'username': Settings.mt_username(),
-            'password': Settings.mt_password(),
-            'path': Settings.mt_path(),
-            'lot': Settings.mt_lot(),
-            'HighRisk': Settings.mt_high_risk(),
-            'SaveProfits': Settings.mt_save_profits(),
-            'AccountSize': Settings.mt_account_size(),
-            'CloserPrice': Settings.mt_closer_price(),
-            'expirePendinOrderInMinutes': Settings.mt_expire_pending_orders_minutes(),
-            'ClosePositionsOnTrail': Settings.mt_close_positions_on_trail(),
-            'disableCache': Settings.disable_cache(),
-            'SymbolMappings': Settings.mt_symbol_mappings()
-        })
         mt = MetaTrader(
             path=account.path,
             server=account.server,
@@ -343,46 +356,34 @@ class TradingOperations:
 
         stop_loss = float(stop_loss)
         positions = Database.Migrations.get_last_signal_positions_by_chatid(
-            chat_id)
+            chat_id, account.username)
+        if not positions:
+            logger.warning(f"No positions found for last signal in chat {chat_id}")
+            return
 
         signal = Migrations.get_signal_by_positionId(positions[0])
         if signal is None or len(str(signal['stop_loss'])) != len(str(stop_loss)):
             logger.warning("Signal not found or stop loss format mismatch")
             return
 
-        result = False
-        for position in positions:
-            result = mt.update_stop_loss(position, stop_loss)
+        results = mt.modify_stops(positions, sl=stop_loss)
 
-        if result:
+        if any(results.values()):
             Migrations.update_stoploss(signal['id'], stop_loss)
             logger.success(
                 f"Stop loss updated to {stop_loss} for signal {signal['id']}")
 
     @staticmethod
-    def update_signal(signal_id, takeProfits, stopLoss):
+    def update_signal(signal_id, takeProfits, stopLoss, account=None):
         """Update signal take profits and stop loss"""
+        if account is None:
+            return TradingOperations.on_all_accounts('update_signal', signal_id, takeProfits, stopLoss)
+
         logger.info(
             f"Updating signal {signal_id} - SL: {stopLoss}, TP: {takeProfits}")
 
-        from Configure.settings.Settings import Settings
         from ..MetaTrader import MetaTrader
 
-        account = AccountConfig({
-            'server': Settings.mt_server(),
-            'username': Settings.mt_username(),
-            'password': Settings.mt_password(),
-            'path': Settings.mt_path(),
-            'lot': Settings.mt_lot(),
-            'HighRisk': Settings.mt_high_risk(),
-            'SaveProfits': Settings.mt_save_profits(),
-            'AccountSize': Settings.mt_account_size(),
-            'CloserPrice': Settings.mt_closer_price(),
-            'expirePendinOrderInMinutes': Settings.mt_expire_pending_orders_minutes(),
-            'ClosePositionsOnTrail': Settings.mt_close_positions_on_trail(),
-            'disableCache': Settings.disable_cache(),
-            'SymbolMappings': Settings.mt_symbol_mappings()
-        })
         mt = MetaTrader(
             path=account.path,
             server=account.server,
@@ -392,48 +393,36 @@ class TradingOperations:
         )
 
         stopLoss = float(stopLoss)
-        positions = Migrations.get_positions_by_signalid(signal_id)
-
-        signal = Migrations.get_signal_by_id(signal_id)
+        signal = TradingOperations._account_signal(signal_id, account)
         if signal is None or len(str(signal['stop_loss'])) != len(str(stopLoss)):
             logger.warning(
                 f"Signal {signal_id} not found or stop loss format mismatch")
             return
 
-        result = False
-        for position in positions:
-            result = mt.update_stop_loss(position["position_id"], stopLoss)
+        signal_id = signal['id']
+        positions = Migrations.get_positions_by_signalid(signal_id)
+
+        results = mt.modify_stops(
+            [position["position_id"] for position in positions], sl=stopLoss)
 
-        if result:
+        if any(results.values()):
             Migrations.update_stoploss(signal_id, stopLoss)
             logger.success(f"Stop loss updated for signal {signal_id}")
 
         Migrations.update_takeProfits(signal_id, takeProfits)
+        position_registry.update_take_profits(signal_id, takeProfits)
         logger.success(f"Take profits updated for signal {signal_id}")
 
     @staticmethod
-    def delete_signal(signal_id):
+    def delete_signal(signal_id, account=None):
         """Delete signal and close all related positions"""
+        if account is None:
+            return TradingOperations.on_all_accounts('delete_signal', signal_id)
+
         logger.info(f"Deleting signal {signal_id} and closing all positions")
 
-        from Configure.settings.Settings import Settings
         from ..MetaTrader import MetaTrader
 
-        account = AccountConfig({
-            'server': Settings.mt_server(),
-            'username': Settings.mt_username(),
-            'password': Settings.mt_password(),
-            'path': Settings.mt_path(),
-            'lot': Settings.mt_lot(),
-            'HighRisk': Settings.mt_high_risk(),
-            'SaveProfits': Settings.mt_save_profits(),
-            'AccountSize': Settings.mt_account_size(),
-            'CloserPrice': Settings.mt_closer_price(),
-            'expirePendinOrderInMinutes': Settings.mt_expire_pending_orders_minutes(),
-            'ClosePositionsOnTrail': Settings.mt_close_positions_on_trail(),
-            'disableCache': Settings.disable_cache(),
-            'SymbolMappings': Settings.mt_symbol_mappings()
-        })
         mt = MetaTrader(
             path=account.path,
             server=account.server,
@@ -442,7 +431,8 @@ class TradingOperations:
             saveProfits=account.SaveProfits,
         )
 
-        positions = Migrations.get_positions_by_signalid(signal_id)
+        signal = TradingOperations._account_signal(signal_id, account)
+        positions = Migrations.get_positions_by_signalid(signal['id']) if signal else []
         if not positions:
             logger.warning(f"No positions found for signal {signal_id}")
             return
@@ -456,28 +446,15 @@ class TradingOperations:
         logger.success(f"Signal {signal_id} deleted - {successful_closures}/{len(positions)} positions closed successfully")
 
     @staticmethod
-    def close_half_signal(signal_id):
+    def close_half_signal(signal_id, account=None):
         """Close half of positions for a signal"""
+        if account is None:
+            return TradingOperations.on_all_accounts('close_half_signal', signal_id)
+
         logger.info(f"Closing half positions for signal {signal_id}")
 
-        from Configure.settings.Settings import Settings
         from ..MetaTrader import MetaTrader
 
-        account = AccountConfig({
-            'server': Settings.mt_server(),
-            'username': Settings.mt_username(),
-            'password': Settings.mt_password(),
-            'path': Settings.mt_path(),
-            'lot': Settings.mt_lot(),
-            'HighRisk': Settings.mt_high_risk(),
-            'SaveProfits': Settings.mt_save_profits(),
-            'AccountSize': Settings.mt_account_size(),
-            'CloserPrice': Settings.mt_closer_price(),
-            'expirePendinOrderInMinutes': Settings.mt_expire_pending_orders_minutes(),
-            'ClosePositionsOnTrail': Settings.mt_close_positions_on_trail(),
-            'disableCache': Settings.disable_cache(),
-            'SymbolMappings': Settings.mt_symbol_mappings()
-        })
         mt = MetaTrader(
             path=account.path,
             server=account.server,
@@ -486,7 +463,8 @@ class TradingOperations:
             saveProfits=account.SaveProfits,
         )
 
-        positions = Migrations.get_positions_by_signalid(signal_id)
+        signal = TradingOperations._account_signal(signal_id, account)
+        positions = Migrations.get_positions_by_signalid(signal['id']) if signal else []
         if not positions:
             logger.warning(f"No positions found for signal {signal_id}")
             return
@@ -0,0 +1,13 @@
+"""MetaTrader execution workers for multi-account signal fan-out"""
+
+from .account_worker import AccountWorker, TerminalUnavailableError
+from .dispatcher import SignalDispatcher, RESULT_UNKNOWN, get_dispatcher, split_accounts
+
+__all__ = [
+    'AccountWorker',
+    'TerminalUnavailableError',
+    'SignalDispatcher',
+    'RESULT_UNKNOWN',
+    'get_dispatcher',
+    'split_accounts'
+]
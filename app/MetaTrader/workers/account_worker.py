@@ -0,0 +1,355 @@
+"""Execution worker bound to a single MetaTrader 5 terminal
+
+Every terminal session lives in its own long-running process. The main
+process talks to it over a pair of multiprocessing queues: commands go in
+as (request_id, command, args) and results come back as
+(request_id, ok, payload), where payload is the return value or an error
+message. A hung terminal therefore only blocks its own worker, never the
+Telegram event loop.
+
+Signals, edits, closes and risk-free commands run the TradingOperations
+method for the worker's account inside the worker, and the monitor command
+runs trailing, expiry and reconciliation there, so the main process never
+drives the terminal of a worker account.
+"""
+
+import sys
+import time
+import asyncio
+import queue
+import itertools
+import importlib
+import threading
+import multiprocessing
+import concurrent.futures
+from typing import Any, Dict, Optional
+from loguru import logger
+
+# Account served by the current worker process
+_account = None
+
+# MetaTrader facade of the current worker process, created on login
+_mt = None
+
+# Thread monitoring the worker's account, started by the monitor command
+_monitor_thread = None
+
+# Serializes mt5 calls of commands with the monitoring iterations, since both use the process' one terminal connection
+_terminal_lock = threading.RLock()
+
+
+class TerminalUnavailableError(RuntimeError):
+    """Raised for commands that were pending when a worker process died or was restarted"""
+
+
+def _install_mt5(module_name):
+    """Replace the MetaTrader5 module in this process (used to run workers against a stub terminal)"""
+    replacement = importlib.import_module(module_name)
+    original = sys.modules.get('MetaTrader5')
+    sys.modules['MetaTrader5'] = replacement
+    if original is None:
+        return
+    for module in list(sys.modules.values()):
+        if getattr(module, 'mt5', None) is original:
+            module.mt5 = replacement
+
+
+def _initialize_worker(account, mt5_module=None):
+    """Bind the process to one account"""
+    global _account, _mt
+    if mt5_module:
+        _install_mt5(mt5_module)
+    _account = account
+    _mt = None
+    from Configure.metrics.Metrics import ConfigMetrics
+    ConfigMetrics(serve=False)
+
+
+def _get_mt():
+    """Get the MetaTrader facade for the worker's account"""
+    global _mt
+    if _mt is None:
+        from ..MetaTrader import MetaTrader
+        _mt = MetaTrader(
+            path=_account.path,
+            server=_account.server,
+            user=_account.username,
+            password=_account.password,
+            saveProfits=_account.SaveProfits,
+            closePositionsOnTrail=_account.close_positions_on_trail,
+            expirePendinOrderInMinutes=_account.expirePendinOrderInMinutes
+        )
+    return _mt
+
+
+def _login():
+    """Connect the worker process to its terminal"""
+    return _get_mt().Login()
+
+
+def _monitor():
+    """Run trailing, expiry and reconciliation for the worker's account on a background thread"""
+    global _monitor_thread
+    if _monitor_thread is None or not _monitor_thread.is_alive():
+        # The monitoring loop logs in and reconnects by itself
+        _monitor_thread = threading.Thread(
+            target=asyncio.run,
+            args=(_get_mt().monitor_account(_terminal_lock),),
+            name=f"monitor-{_account.username}",
+            daemon=True
+        )
+        _monitor_thread.start()
+    return True
+
+
+def _trade(*signal):
+    """Execute a parsed signal on the worker's account"""
+    from ..trading.trading import TradingOperations
+    return TradingOperations.trade(*signal, account=_account)
+
+
+def _account_operation(name):
+    """Build a command running a TradingOperations method on the worker's account"""
+    def run(*args):
+        from ..trading.trading import TradingOperations
+        return getattr(TradingOperations, name)(*args, account=_account)
+    return run
+
+
+def _modify_stops(tickets, sl=None, tp=None):
+    """Update stop loss and/or take profit for several tickets"""
+    mt = _get_mt()
+    if not mt.Login():
+        return {ticket: False for ticket in tickets}
+    return mt.modify_stops(tickets, sl, tp)
+
+
+def _close(ticket):
+    """Close a position or cancel a pending order"""
+    mt = _get_mt()
+    if not mt.Login():
+        return False
+    return bool(mt.close_position(ticket))
+
+
+def _snapshot():
+    """Get open positions and pending orders as plain dictionaries"""
+    mt = _get_mt()
+    if not mt.Login():
+        return None
+    return {
+        'positions': [position._asdict() for position in mt.get_open_positions()],
+        'orders': [order._asdict() for order in mt.get_pending_orders()],
+        'time': time.time()
+    }
+
+
+# Commands understood by a worker process
+COMMANDS = {
+    'login': _login,
+    'monitor': _monitor,
+    'trade': _trade,
+    'risk_free_positions': _account_operation('risk_free_positions'),
+    'update_last_signal': _account_operation('update_last_signal'),
+    'update_signal': _account_operation('update_signal'),
+    'delete_signal': _account_operation('delete_signal'),
+    'close_half_signal': _account_operation('close_half_signal'),
+    'modify_stops': _modify_stops,
+    'close': _close,
+    'snapshot': _snapshot,
+}
+
+
+def _execute(message):
+    """Run one command message and build its result message"""
+    request_id, command, args = message
+    handler = COMMANDS.get(command)
+    if handler is None:
+        return request_id, False, f"Unknown command: {command}"
+    try:
+        with _terminal_lock:
+            return request_id, True, handler(*args)
+    except Exception as e:
+        logger.error(f"Command {command} failed in worker for account {getattr(_account, 'username', None)}: {e}")
+        return request_id, False, f"{type(e).__name__}: {e}"
+
+
+def _serve(account, commands, results, mt5_module=None):
+    """Worker process entry point: execute commands until a None sentinel arrives"""
+    _initialize_worker(account, mt5_module)
+    while True:
+        message = commands.get()
+        if message is None:
+            break
+        results.put(_execute(message))
+
+
+class AccountWorker:
+    """Runs trading operations for one account in its own long-running process"""
+
+    def __init__(self, account, mt5_module=None, timeout: Optional[float] = None, monitor: bool = False):
+        self.account = account
+        self.name = f"{account.username}@{account.server}"
+        self.mt5_module = mt5_module
+        self.timeout = timeout
+        self.monitor = monitor
+        self._process = None
+        self._commands = None
+        self._pending: Dict[int, concurrent.futures.Future] = {}
+        self._trades = set()  # request ids of trade commands not answered yet
+        self._request_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _spawn(self, commands, results):
+        """Start the worker process serving the given queues"""
+        # Each MT5 terminal connection is global to its process, so every account gets a dedicated one
+        process = multiprocessing.get_context("spawn").Process(
+            target=_serve,
+            args=(self.account, commands, results, self.mt5_module),
+            name=f"mt5-{self.name}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._process is not None:
+                return
+            context = multiprocessing.get_context("spawn")
+            commands, results = context.Queue(), context.Queue()
+            self._process = self._spawn(commands, results)
+            self._commands = commands
+            if self.monitor:
+                # Every process serving the account, including one replacing a hung worker, monitors it
+                commands.put((0, 'monitor', ()))
+            threading.Thread(
+                target=self._read_results,
+                args=(self._process, results),
+                name=f"mt5-results-{self.name}",
+                daemon=True
+            ).start()
+
+    def _read_results(self, process, results):
+        """Resolve pending futures from the result queue of one worker process"""
+        while True:
+            try:
+                request_id, ok, payload = results.get(timeout=0.5)
+            except queue.Empty:
+                if process is not self._process:
+                    return
+                if not process.is_alive():
+                    logger.error(f"Execution worker for account {self.name} exited unexpectedly")
+                    self._reset(process)
+                    return
+                continue
+            except (EOFError, OSError):
+                self._reset(process)
+                return
+
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+                self._trades.discard(request_id)
+            if future is None or future.done():
+                continue
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def _reset(self, process):
+        """Forget a worker process and fail the commands it still owed"""
+        with self._lock:
+            if process is not self._process:
+                return
+            self._process = None
+            self._commands = None
+            pending, self._pending = self._pending, {}
+            self._trades.clear()
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(TerminalUnavailableError(f"Execution worker for account {self.name} is not available"))
+
+    def call(self, command: str, *args) -> concurrent.futures.Future:
+        """Send a command to the worker process, returning a future of its result"""
+        self._ensure_started()
+        future = concurrent.futures.Future()
+        with self._lock:
+            request_id = next(self._request_ids)
+            self._pending[request_id] = future
+            if command == 'trade':
+                self._trades.add(request_id)
+            commands = self._commands
+        commands.put((request_id, command, args))
+        return future
+
+    def request(self, command: str, *args, timeout: Optional[float] = None) -> Any:
+        """Send a command and wait for its result, restarting the worker if it does not answer in time"""
+        timeout = timeout if timeout is not None else self.timeout
+        future = self.call(command, *args)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            if self.is_trading():
+                logger.error(f"Account {self.name} did not answer {command} within {timeout}s while executing a trade")
+            else:
+                logger.error(f"Account {self.name} did not answer {command} within {timeout}s, restarting its worker")
+                self.restart()
+            raise
+
+    def start(self) -> concurrent.futures.Future:
+        """Start the worker process and log in ahead of the first signal"""
+        logger.info(f"Starting execution worker for account {self.name}")
+        return self.call('login')
+
+    def submit_trade(self, *signal) -> concurrent.futures.Future:
+        """Queue a parsed signal for execution on this account"""
+        return self.call('trade', *signal)
+
+    def modify_stops(self, tickets, sl=None, tp=None) -> Dict[int, bool]:
+        """Update stop loss and/or take profit for several tickets on this account"""
+        return self.request('modify_stops', list(tickets), sl, tp)
+
+    def close(self, ticket) -> bool:
+        """Close a position or cancel a pending order on this account"""
+        return self.request('close', ticket)
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Get the open positions and pending orders of this account"""
+        return self.request('snapshot')
+
+    def is_alive(self) -> bool:
+        """Whether the worker process is running"""
+        process = self._process
+        return process is not None and process.is_alive()
+
+    def is_trading(self) -> bool:
+        """
+        Whether a trade sent to the worker has not been answered yet.
+
+        A worker executing a trade may be retrying order_send, so it is not
+        killed: its orders could be live without their database rows.
+        """
+        with self._lock:
+            return bool(self._trades)
+
+    def restart(self) -> None:
+        """Kill a hung worker process; the next command starts a fresh one"""
+        process = self._process
+        if process is None:
+            return
+        self._reset(process)
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=5)
+
+    def shutdown(self) -> None:
+        """Stop the worker process after it finished the queued commands"""
+        process, commands = self._process, self._commands
+        if process is None:
+            return
+        commands.put(None)
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+        self._reset(process)
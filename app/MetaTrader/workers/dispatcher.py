@@ -0,0 +1,126 @@
+"""Fan-out of parsed signals to every configured MetaTrader account"""
+
+import time
+import concurrent.futures
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+from .account_worker import AccountWorker
+
+# Result of a trade still executing on its account when the dispatcher stopped waiting
+RESULT_UNKNOWN = 'unknown'
+
+
+class SignalDispatcher:
+    """Executes each signal on every account in parallel, one worker per terminal"""
+
+    def __init__(self, accounts, worker_factory=AccountWorker, timeout: Optional[float] = None,
+                 trade_timeout: Optional[float] = None):
+        self.workers = [worker_factory(account) for account in accounts]
+        self.timeout = timeout
+        self.trade_timeout = trade_timeout
+
+    def start(self) -> None:
+        """Start all workers"""
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, command: str, *args) -> Dict[concurrent.futures.Future, Any]:
+        """Send a command to every worker without waiting, returning future -> worker"""
+        return {worker.call(command, *args): worker for worker in self.workers}
+
+    def timeout_for(self, command: str) -> Optional[float]:
+        """Seconds to wait for a command; trades retry orders and get their own timeout"""
+        return self.trade_timeout if command == 'trade' else self.timeout
+
+    def collect(self, futures: Dict[concurrent.futures.Future, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait for the futures returned by submit.
+
+        Workers that do not answer within the timeout are restarted, except
+        workers still executing a trade: their result is RESULT_UNKNOWN.
+
+        Returns:
+            dict: worker name -> result (None on failure)
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        results = {}
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                worker = futures[future]
+                try:
+                    results[worker.name] = future.result()
+                except Exception as e:
+                    logger.error(f"Command failed on account {worker.name}: {e}")
+                    results[worker.name] = None
+        except concurrent.futures.TimeoutError:
+            pending = [futures[future] for future in futures if not future.done()]
+            logger.error(f"Command timed out on accounts: {', '.join(worker.name for worker in pending)}")
+            for worker in pending:
+                if worker.is_trading():
+                    logger.warning(f"Account {worker.name} is still executing a trade, its result is unknown")
+                    results[worker.name] = RESULT_UNKNOWN
+                else:
+                    worker.restart()
+        return results
+
+    def trade(self, *signal, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute a parsed signal on all accounts.
+
+        The call returns once the slowest account finished, so total latency
+        is that of the slowest terminal rather than the sum of all of them.
+
+        Returns:
+            dict: worker name -> result of TradingOperations.trade (None on failure, RESULT_UNKNOWN if still running)
+        """
+        started = time.monotonic()
+        results = self.collect(self.submit('trade', *signal), timeout if timeout is not None else self.trade_timeout)
+
+        elapsed = time.monotonic() - started
+        executed = sum(1 for result in results.values() if result not in (None, RESULT_UNKNOWN))
+        logger.info(f"Signal executed on {executed}/{len(self.workers)} accounts in {elapsed:.2f}s")
+        return results
+
+    def shutdown(self) -> None:
+        """Stop all workers"""
+        for worker in self.workers:
+            worker.shutdown()
+
+
+def split_accounts(accounts: List[Any]) -> Tuple[List[Any], List[Any]]:
+    """
+    Split accounts into those served by this process and those served by execution workers.
+
+    The primary account stays in-process, next to the Telegram handlers
+    that look up its signals, unless MetaTrader.Terminal.isolate moves it
+    to a worker as well. Every additional account gets its own worker.
+
+    Returns:
+        (in-process accounts, worker accounts)
+    """
+    from Configure.settings.Settings import Settings
+    if Settings.mt_terminal().get('isolate', False):
+        return [], list(accounts)
+    return list(accounts[:1]), list(accounts[1:])
+
+
+# Dispatcher shared by the process, created on first multi-account signal
+_dispatcher: Optional[SignalDispatcher] = None
+
+
+def get_dispatcher(accounts: List[Any]) -> SignalDispatcher:
+    """Get the process-wide dispatcher, starting one worker per account on first use; each worker monitors its account"""
+    global _dispatcher
+    if _dispatcher is None:
+        from Configure.settings.Settings import Settings
+        terminal = Settings.mt_terminal()
+        timeout = terminal.get('commandTimeout', 30)
+        _dispatcher = SignalDispatcher(
+            accounts,
+            worker_factory=lambda account: AccountWorker(account, timeout=timeout, monitor=True),
+            timeout=timeout,
+            trade_timeout=terminal.get('tradeTimeout', 300)
+        )
+        _dispatcher.start()
+    return _dispatcher
@@ -19,6 +19,7 @@ Dependencies:
 """
 
 import asyncio
+import concurrent.futures
 import sys
 from typing import Optional, Tuple, Any
 from loguru import logger
@@ -51,6 +52,9 @@ class TelegramClientManager:
         self.api_id = api_id
         self.api_hash = api_hash
         self.client: Optional[TelegramClient] = None
+        # Handlers trade and write to the database; one thread keeps them off the event loop and in message order
+        self._handler_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="signal-handler")
         self._initialize_client()
 
     def _initialize_client(self) -> None:
@@ -66,6 +70,23 @@ class TelegramClientManager:
             logger.critical(f"Failed to initialize Telegram client: {e}")
             raise
 
+    async def _run_handler(self, handler, *args) -> Any:
+        """
+        Run a blocking message handler on the signal handler thread.
+
+        Handlers log in to MetaTrader, wait for execution workers and commit
+        to sqlite3, so awaiting them here lets Telethon keep receiving updates.
+
+        Args:
+            handler: Synchronous handler from MessageHandler
+            *args: Handler arguments
+
+        Returns:
+            The handler's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._handler_executor, handler, *args)
+
     async def start_monitoring(self) -> None:
         """
         Start the main message monitoring loop with automatic reconnection.
@@ -155,7 +176,7 @@ class TelegramClientManager:
 
                 logger.debug(
                     f"Processing edited message in chat {chat_id}, message {message_id}")
-                HandleEdite(chat_id, message_id, text)
+                await self._run_handler(HandleEdite, chat_id, message_id, text)
 
             except Exception as e:
                 logger.error(f"Error handling edited message: {e}")
@@ -169,7 +190,7 @@ class TelegramClientManager:
                 for msg_id in event.deleted_ids:
                     logger.debug(
                         f"Processing deleted message {msg_id} in chat {chat_id}")
-                    HandleDelete(chat_id, msg_id)
+                    await self._run_handler(HandleDelete, chat_id, msg_id)
 
             except Exception as e:
                 logger.error(f"Error handling deleted message: {e}")
@@ -189,9 +210,9 @@ class TelegramClientManager:
                 f"Processing reply to message {parent_msg_id} in chat {parent_chat_id}")
 
             # Handle different types of reply commands
-            HandleParentEdit(parent_chat_id, parent_msg_id, message_text)
-            HandleParentDelete(parent_chat_id, parent_msg_id, message_text)
-            HandleParentRiskFree(parent_chat_id, parent_msg_id, message_text)
+            await self._run_handler(HandleParentEdit, parent_chat_id, parent_msg_id, message_text)
+            await self._run_handler(HandleParentDelete, parent_chat_id, parent_msg_id, message_text)
+            await self._run_handler(HandleParentRiskFree, parent_chat_id, parent_msg_id, message_text)
 
         except Exception as e:
             logger.error(f"Error handling reply message: {e}")
@@ -232,8 +253,8 @@ class TelegramClientManager:
 
             # Process the message
             # logger.debug(f"Processing {message_type.name} message from {username or chat_id}")
-            Handle(message_type, text, message_link,
-                   username, message_id, chat_id)
+            await self._run_handler(Handle, message_type, text, message_link,
+                                    username, message_id, chat_id)
 
         except Exception as e:
             logger.error(f"Error processing message event: {e}")
@@ -14,14 +14,15 @@ Features:
 """
 
 import asyncio
+import multiprocessing
 import signal
 import sys
 from typing import NoReturn
 from loguru import logger
 
 from Configure.settings.Settings import Settings
-from Configure import ConfigLogger, ConfigNotification
-from Database import DoMigrations
+from Configure import ConfigLogger, ConfigNotification, ConfigMetrics, metrics
+from Database import DoMigrations, close_all
 from Helper import can_access_telegram
 from Telegram.Telegram import TelegramClientManager
 from MetaTrader import monitor_all_accounts
@@ -141,6 +142,9 @@ class ApplicationRunner:
         # Configure logging
         ConfigLogger()
 
+        # Collect monitoring loop metrics
+        ConfigMetrics()
+
         # Configure notifications
         ConfigNotification(
             self.settings.Notification.token,
@@ -220,6 +224,12 @@ class ApplicationRunner:
                 logger.info("Closing Telegram client...")
                 # Client handles its own disconnection
 
+            metrics.log_summary()
+            metrics.stop()
+
+            # Flush and close the database connections
+            close_all()
+
             logger.success("Application shutdown completed")
 
         except Exception as e:
@@ -237,6 +247,8 @@ async def main() -> NoReturn:
 
 if __name__ == "__main__":
     """Script entry point"""
+    # Required for account worker processes in the frozen executable
+    multiprocessing.freeze_support()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -0,0 +1,82 @@
+"""Unit tests for monitoring loop metrics"""
+
+import json
+import threading
+import types
+import unittest
+import urllib.request
+from tests.fixtures import TestBase
+from app.Configure.metrics.Metrics import MetricsManager
+
+
+class TestMetrics(TestBase):
+    """Test cases for MetricsManager class"""
+
+    def setUp(self):
+        super().setUp()
+        self.metrics = MetricsManager()
+        self.metrics.configure({'enabled': True, 'logInterval': 3600})
+
+    def test_iteration_records_call_and_counter_deltas(self):
+        """Test that an iteration reports the calls and counters made while it ran"""
+        module = types.SimpleNamespace(positions_get=lambda: [], symbol_info_tick=lambda symbol: None, ORDER_TYPE_BUY=0)
+        self.assertEqual(self.metrics.instrument_module(module, 'mt5'), 2)
+        module.positions_get()  # outside of any iteration
+
+        with self.metrics.iteration():
+            module.positions_get()
+            module.symbol_info_tick("EURUSD")
+            module.symbol_info_tick("XAUUSD")
+            self.metrics.count_query("SELECT 1")
+            self.metrics.count_query("COMMIT")
+            self.metrics.increment('positions_evaluated', 4)
+
+        summary = self.metrics.summary()
+        self.assertEqual(summary['iterations'], 1)
+        self.assertEqual(summary['per_iteration']['mt5_calls'], 3)
+        self.assertEqual(summary['per_iteration']['db_queries'], 1)
+        self.assertEqual(summary['per_iteration']['positions_evaluated'], 4)
+        self.assertEqual(summary['calls']['mt5.symbol_info_tick']['count'], 2)
+        self.assertEqual(summary['calls']['mt5.positions_get']['count'], 2)
+
+    def test_iteration_ignores_other_threads(self):
+        """Test that calls made by other threads count in the totals but not in the iteration"""
+        module = types.SimpleNamespace(order_send=lambda request: None)
+        self.metrics.instrument_module(module, 'mt5')
+
+        with self.metrics.iteration():
+            worker = threading.Thread(target=lambda: (module.order_send({}), self.metrics.count_query("SELECT 1")))
+            worker.start()
+            worker.join()
+            module.order_send({})
+
+        summary = self.metrics.summary()
+        self.assertEqual(summary['per_iteration']['mt5_calls'], 1)
+        self.assertNotIn('db_queries', summary['per_iteration'])
+        self.assertEqual(summary['calls']['mt5.order_send']['count'], 2)
+        self.assertEqual(summary['counters']['db_queries'], 1)
+
+    def test_disabled_metrics_record_nothing(self):
+        """Test that disabled metrics skip the bookkeeping"""
+        self.metrics.configure({'enabled': False})
+        with self.metrics.iteration():
+            self.metrics.increment('positions_evaluated')
+
+        self.assertEqual(self.metrics.summary(), {'iterations': 0, 'window': 0, 'calls': {}, 'counters': {}})
+
+    def test_endpoint_serves_summary(self):
+        """Test that the HTTP endpoint returns the summary as JSON"""
+        with self.metrics.iteration():
+            pass
+        server = self.metrics.serve(0)
+        self.addCleanup(self.metrics.stop)
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics", timeout=5) as response:
+            body = json.loads(response.read())
+
+        self.assertEqual(body['iterations'], 1)
+        self.assertIn('wall_ms', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
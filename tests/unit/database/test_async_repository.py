@@ -0,0 +1,61 @@
+"""Unit tests for the async repository views"""
+
+import asyncio
+import os
+import threading
+import unittest
+from tests.fixtures import TestBase
+from app.Database.async_repository import AsyncRepository, DatabaseThread
+from app.Database.repository.signal_repository import SignalRepository
+
+
+class TestAsyncRepository(TestBase):
+    """Test cases for AsyncRepository and DatabaseThread"""
+
+    def setUp(self):
+        super().setUp()
+        self.signals = SignalRepository(os.path.join(self.temp_dir, "test.db"))
+        self.signals.create_table()
+        self.thread = DatabaseThread("test-database")
+        self.addCleanup(self.thread.shutdown)
+        self.repo = AsyncRepository(self.signals, self.thread)
+
+    def test_calls_run_on_database_thread(self):
+        """Test that repository methods are awaited with the same arguments and results"""
+        threads = []
+        original = self.signals.get_signal_by_chat
+
+        def get_signal_by_chat(chat_id, message_id):
+            threads.append(threading.current_thread().name)
+            return original(chat_id, message_id)
+
+        self.signals.get_signal_by_chat = get_signal_by_chat
+        signal_id = self.signals.insert_signal({
+            "telegram_channel_title": "test", "telegram_message_id": 5, "telegram_message_chatid": 9,
+            "open_price": 1.0850, "second_price": None, "stop_loss": 1.0800, "tp_list": "1.09",
+            "symbol": "EURUSD", "current_time": "2024-01-01 00:00:00"})
+
+        async def lookups():
+            return await asyncio.gather(self.repo.get_signal_by_chat(9, 5), self.repo.get_signal_by_chat(9, 6))
+
+        found, missing = asyncio.run(lookups())
+
+        self.assertEqual(found["id"], signal_id)
+        self.assertIsNone(missing)
+        self.assertTrue(all(name.startswith("test-database") for name in threads))
+        self.assertEqual(self.repo.repository, self.signals.repository)
+
+    def test_errors_propagate_and_thread_restarts(self):
+        """Test that exceptions reach the awaiting coroutine and calls work after shutdown"""
+        async def failing():
+            await self.thread.run(int, "not a number")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(failing())
+        self.thread.shutdown()
+
+        self.assertEqual(asyncio.run(self.thread.run(sum, [1, 2])), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""Unit tests for LRUCache"""
+
+import unittest
+from tests.fixtures import TestBase
+from app.Database.repository.cache import LRUCache
+
+
+class TestLRUCache(TestBase):
+    """Test cases for tag invalidation and expiry of LRUCache"""
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        self.cache = LRUCache(max_size=3, default_ttl=10.0, clock=lambda: self.now)
+
+    def test_invalidate_tags_touches_only_tagged_entries(self):
+        """Test that invalidating a tag drops its entries and unindexes them from other tags"""
+        self.cache.put("a", 1, tags=("signals", "positions"))
+        self.cache.put("b", 2, tags=("positions",))
+        self.cache.put("c", 3, tags=("takeprofits",))
+
+        self.assertEqual(self.cache.invalidate_tags(["signals"]), 1)
+        self.assertEqual(self.cache.invalidate_tags(["positions"]), 1)
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), 3)
+        self.assertEqual(self.cache.get_stats()["tags"], 1)
+
+    def test_entries_expire_in_order(self):
+        """Test that expired entries are dropped and replaced entries keep their new TTL"""
+        self.cache.put("short", 1, ttl_seconds=1.0)
+        self.cache.put("long", 2)
+        self.cache.put("replaced", 3, ttl_seconds=1.0)
+        self.cache.put("replaced", 4, ttl_seconds=20.0)
+
+        self.now += 5.0
+
+        self.assertIsNone(self.cache.get("short"))
+        self.assertEqual(self.cache.get("long"), 2)
+        self.assertEqual(self.cache.get("replaced"), 4)
+        self.assertEqual(self.cache.get_stats()["size"], 2)
+
+    def test_evicts_least_recently_used(self):
+        """Test that a full cache evicts the least recently used entry and its tags"""
+        for key in ("a", "b", "c"):
+            self.cache.put(key, key, tags=(key,))
+        self.cache.get("a")
+
+        self.cache.put("d", "d")
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.invalidate_tags(["b"]), 0)
+        self.assertEqual(self.cache.get("a"), "a")
+
+
+if __name__ == '__main__':
+    unittest.main()
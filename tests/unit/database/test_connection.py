@@ -0,0 +1,82 @@
+"""Unit tests for the shared SQLite connections"""
+
+import os
+import sqlite3
+import threading
+import unittest
+from tests.fixtures import TestBase
+from app.Database.connection import ConnectionManager
+
+
+class TestConnectionManager(TestBase):
+    """Test cases for ConnectionManager class"""
+
+    def setUp(self):
+        super().setUp()
+        self.manager = ConnectionManager(os.path.join(self.temp_dir, "test.db"), mmap_size=1048576)
+        self.addCleanup(self.manager.close)
+        with self.manager.writer() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+
+    def test_connections_are_persistent_and_tuned(self):
+        """Test that connections are reused and opened in WAL mode with NORMAL sync"""
+        with self.manager.writer() as first, self.manager.writer() as second:
+            self.assertIs(first, second)
+            self.assertEqual(first.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(first.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+        with self.manager.reader() as first, self.manager.reader() as second:
+            self.assertIs(first, second)
+
+    def test_readers_are_per_thread_and_see_commits(self):
+        """Test that each thread gets its own reader that sees committed writes"""
+        with self.manager.writer() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('a')")
+
+        seen = {}
+
+        def read(name):
+            with self.manager.reader() as conn:
+                seen[name] = (id(conn), conn.execute("SELECT COUNT(*) FROM items").fetchone()[0])
+
+        threads = [threading.Thread(target=read, args=(name,)) for name in ("t1", "t2")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([count for _, count in seen.values()], [1, 1])
+        self.assertNotEqual(seen["t1"][0], seen["t2"][0])
+
+    def test_readers_of_exited_threads_are_closed(self):
+        """Test that a new reader closes the connections of threads that exited"""
+        opened = []
+
+        def read():
+            with self.manager.reader() as conn:
+                opened.append(conn)
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+
+        with self.manager.reader():
+            pass
+
+        self.assertEqual(len(self.manager._readers), 1)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            opened[0].execute("SELECT 1")
+
+    def test_writer_rolls_back_on_error(self):
+        """Test that a failing write block leaves no partial changes"""
+        with self.assertRaises(RuntimeError):
+            with self.manager.writer() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('a')")
+                raise RuntimeError("boom")
+
+        with self.manager.reader() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM items").fetchone()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
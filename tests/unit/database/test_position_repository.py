@@ -0,0 +1,36 @@
+"""Unit tests for PositionRepository"""
+
+import os
+import sqlite3
+import unittest
+from tests.fixtures import TestBase
+from app.Database import schema_migrations
+from app.Database.repository.position_repository import PositionRepository
+from app.Database.repository.signal_repository import SignalRepository
+
+
+class TestPositionRepository(TestBase):
+    """Test cases for PositionRepository"""
+
+    def test_migration_adds_close_columns_to_existing_table(self):
+        """Test that migrating a positions table from an older release adds the close result columns"""
+        db_path = os.path.join(self.temp_dir, "legacy.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""CREATE TABLE Positions (id INTEGER PRIMARY KEY AUTOINCREMENT, signal_id INTEGER NOT NULL,
+                            position_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+                            is_first BOOLEAN NULL, is_second BOOLEAN NULL)""")
+            conn.execute("INSERT INTO Positions (signal_id, position_id, user_id) VALUES (1, 10, 7)")
+
+        SignalRepository(db_path, enable_cache=False).create_table()
+        repo = PositionRepository(db_path, enable_cache=False)
+        repo.create_table()
+        schema_migrations.migrate(repo.repository.connections)
+        repo.record_exits(7, [(10, 12.5, 1.0900, 1700000000)])
+
+        position = repo.get_all_positions()[0]
+        self.assertEqual((position.profit, position.close_price, position.closed_at), (12.5, 1.0900, 1700000000))
+        self.assertIsNone(repo.get_deal_watermark(7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Unit tests for the cache shared by the repositories of a database file"""
+
+import os
+import unittest
+from tests.fixtures import TestBase
+from app.Database import schema_migrations
+from app.Database.repository.Repository import Query, query_stats, referenced_tables
+from app.Database.repository.position_repository import PositionRepository
+from app.Database.repository.signal_repository import SignalRepository
+from app.Database.repository.take_profit_repository import TakeProfitRepository
+
+
+class TestRepositoryCache(TestBase):
+    """Test cases for cross-table cache invalidation"""
+
+    def setUp(self):
+        super().setUp()
+        db_path = os.path.join(self.temp_dir, "test.db")
+        self.signals = SignalRepository(db_path)
+        self.signals.create_table()
+        self.positions = PositionRepository(db_path)
+        self.positions.create_table()
+        self.take_profits = TakeProfitRepository(db_path)
+        schema_migrations.migrate(self.positions.repository.connections)
+        self.signal_id = self.signals.repository.insert({
+            "telegram_channel_title": "test", "telegram_message_id": 1, "telegram_message_chatid": 1,
+            "open_price": 1.0850, "second_price": None, "stop_loss": 1.0800, "tp_list": "1.0900",
+            "symbol": "EURUSD", "current_time": "2024-01-01 00:00:00"})
+
+    def test_referenced_tables(self):
+        """Test that reads and writes are tagged with every table they touch"""
+        self.assertEqual(referenced_tables("SELECT s.* FROM signals s JOIN Positions p ON p.signal_id = s.id"),
+                         {"signals", "positions"})
+        self.assertEqual(referenced_tables("INSERT OR IGNORE INTO TakeProfits (price) VALUES (?)"), {"takeprofits"})
+
+    def test_join_invalidated_by_other_repository(self):
+        """Test that a write through one repository drops the cached joins of another"""
+        self.take_profits.set_levels(self.signal_id, [1.0900])
+        self.positions.insert_position({"signal_id": self.signal_id, "position_id": 10, "user_id": 1})
+        self.assertEqual(self.positions.get_tp_levels(10), [1.0900])
+        self.assertIsNone(self.signals.get_signal_by_position_id(11))
+
+        self.take_profits.set_levels(self.signal_id, [1.0950, 1.1000])
+        self.positions.insert_position({"signal_id": self.signal_id, "position_id": 11, "user_id": 1})
+
+        self.assertEqual(self.positions.get_tp_levels(10), [1.0950, 1.1000])
+        self.assertEqual(self.signals.get_signal_by_position_id(11).id, self.signal_id)
+
+    def test_bulk_write_drops_cached_records(self):
+        """Test that a multi-row write drops cached records of its table but keeps other tables"""
+        position_id = self.positions.insert_position({"signal_id": self.signal_id, "position_id": 10, "user_id": 1})
+        self.positions.repository.get_by_id(position_id)
+        self.signals.repository.get_by_id(self.signal_id)
+
+        self.positions.record_exits(1, [(10, 5.0, 1.0900, 1700000000)])
+
+        self.assertEqual(self.positions.get_position_by_id(position_id).profit, 5.0)
+        self.assertIsNotNone(self.signals.repository.cache.get(("Signals", "get_by_id", self.signal_id)))
+
+    def test_named_query_results_and_stats(self):
+        """Test that named queries return shared immutable rows and count hits per query"""
+        query = Query("tests.signal_symbol", "SELECT symbol FROM Signals WHERE id = ?")
+        before = query.hits
+
+        first = self.signals.repository.execute_query(query, (self.signal_id,))
+        second = self.signals.repository.execute_query(query, [self.signal_id])
+
+        self.assertEqual(first, (("EURUSD",),))
+        self.assertIs(first, second)
+        self.assertEqual(query.hits - before, 1)
+        self.assertIn("tests.signal_symbol", query_stats())
+        with self.assertRaises(ValueError):
+            Query("tests.signal_symbol", "SELECT id FROM Signals")
+
+    def test_unknown_ticket_cached_until_inserted(self):
+        """Test that a ticket without a signal is looked up once and found as soon as it is saved"""
+        repository = self.signals.repository
+        self.assertIsNone(self.signals.get_signal_by_position_id(77))
+        self.assertIsNone(repository.get_by_id(999))
+
+        entry = repository.cache.cache[("signals.by_position_id", (77,))]
+        self.assertEqual(entry.expires_at - entry.created_at, repository.negative_ttl)
+        self.assertIsNone(repository.get_by_id(999))
+
+        self.positions.insert_position({"signal_id": self.signal_id, "position_id": 77, "user_id": 1})
+
+        self.assertEqual(self.signals.get_signal_by_position_id(77).id, self.signal_id)
+        self.assertIn(("Signals", "get_by_id", 999), repository.cache.cache)
+        repository.insert({"telegram_channel_title": "test", "open_price": 1.0, "stop_loss": 0.9, "tp_list": "",
+                           "symbol": "EURUSD", "current_time": "2024-01-01 00:00:00"})
+        self.assertNotIn(("Signals", "get_by_id", 999), repository.cache.cache)
+
+    def test_chat_lookups_scoped_to_account(self):
+        """Test that each account finds its own copy of a signal and its own tickets"""
+        copy_id = self.signals.repository.insert({
+            "telegram_channel_title": "test", "telegram_message_id": 1, "telegram_message_chatid": 1,
+            "open_price": 1.0850, "second_price": None, "stop_loss": 1.0800, "tp_list": "1.0900",
+            "symbol": "EURUSD", "current_time": "2024-01-01 00:00:00"})
+        self.positions.insert_position({"signal_id": self.signal_id, "position_id": 10, "user_id": 1})
+        self.positions.insert_position({"signal_id": copy_id, "position_id": 20, "user_id": 2})
+
+        self.assertEqual(self.signals.get_signal_by_chat(1, 1, user_id=1)["id"], self.signal_id)
+        self.assertEqual(self.signals.get_signal_by_chat(1, 1, user_id=2)["id"], copy_id)
+        self.assertIsNone(self.signals.get_signal_by_chat(1, 1, user_id=3))
+        self.assertEqual(self.positions.get_last_signal_positions_by_chat_and_message(1, 1, user_id=1), [10])
+        self.assertEqual(self.positions.get_last_signal_positions_by_chat_id(1, user_id=2), [20])
+        self.assertEqual(self.positions.get_last_signal_positions_by_chat_id(1), [20, 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Unit tests for versioned schema migrations"""
+
+import os
+import unittest
+from tests.fixtures import TestBase
+from app.Database import schema_migrations
+from app.Database.connection import ConnectionManager
+from app.Database.models import DatabaseSchema
+from app.Database.repository.Repository import SQLiteRepository
+
+
+class TestSchemaMigrations(TestBase):
+    """Test cases for schema_migrations.migrate"""
+
+    def setUp(self):
+        super().setUp()
+        db_path = os.path.join(self.temp_dir, "test.db")
+        SQLiteRepository(db_path, "Signals", enable_cache=False).create_table(DatabaseSchema.SIGNAL_COLUMNS)
+        SQLiteRepository(db_path, "Positions", enable_cache=False).create_table(DatabaseSchema.POSITION_COLUMNS)
+        self.connections = ConnectionManager(db_path)
+        self.addCleanup(self.connections.close)
+
+    def _plan(self, query):
+        with self.connections.writer() as conn:
+            return " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", (1,)))
+
+    def test_lookups_use_indexes(self):
+        """Test that the ticket and signal lookups no longer scan the positions table"""
+        self.assertIn("SCAN", self._plan("SELECT signal_id FROM Positions WHERE position_id = ?"))
+
+        version = schema_migrations.migrate(self.connections)
+
+        self.assertEqual(version, schema_migrations.MIGRATIONS[-1].version)
+        self.assertIn("COVERING INDEX idx_positions_position_id",
+                      self._plan("SELECT signal_id FROM Positions WHERE position_id = ?"))
+        self.assertIn("idx_positions_signal_id",
+                      self._plan("SELECT * FROM Positions WHERE signal_id = ? ORDER BY id DESC LIMIT 2"))
+        with self.connections.reader() as conn:
+            self.assertEqual(conn.execute("SELECT description FROM schema_version WHERE version = 4").fetchone(),
+                             ("deal watermarks",))
+            conn.execute("SELECT deal_time, deal_ticket FROM DealWatermarks")
+
+    def test_steps_run_once(self):
+        """Test that an up-to-date database is left untouched"""
+        schema_migrations.migrate(self.connections)
+        with self.connections.writer() as conn:
+            conn.execute("DROP INDEX idx_signals_chat_message")
+
+        schema_migrations.migrate(self.connections)
+
+        with self.connections.reader() as conn:
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertNotIn("idx_signals_chat_message", indexes)
+
+
+    def test_backfill_runs_in_batches_and_resumes(self):
+        """Test that a backfill commits per batch and continues after an interruption"""
+        with self.connections.writer() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value INTEGER, doubled INTEGER)")
+            conn.executemany("INSERT INTO items (value) VALUES (?)", [(i,) for i in range(10)])
+
+        batches = []
+
+        def backfill(conn, after, batch_size):
+            rows = conn.execute("SELECT id, value FROM items WHERE id > ? ORDER BY id LIMIT ?",
+                                (after or 0, batch_size)).fetchall()
+            if len(batches) == 2 and not hasattr(backfill, 'interrupted'):
+                backfill.interrupted = True
+                raise RuntimeError("interrupted")
+            batches.append([row[0] for row in rows])
+            conn.executemany("UPDATE items SET doubled = ? WHERE id = ?", [(value * 2, id) for id, value in rows])
+            return rows[-1][0] if rows else None
+
+        step = schema_migrations.Migration(10, "double values", backfill=backfill, batch_size=4)
+        with self.assertRaises(RuntimeError):
+            schema_migrations.migrate(self.connections, [step])
+        version = schema_migrations.migrate(self.connections, [step])
+
+        self.assertEqual(version, 10)
+        self.assertEqual(batches, [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10], []])
+        with self.connections.writer() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM items WHERE doubled = value * 2").fetchone()[0], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
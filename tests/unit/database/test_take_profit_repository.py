@@ -0,0 +1,66 @@
+"""Unit tests for TakeProfitRepository"""
+
+import os
+import unittest
+from tests.fixtures import TestBase
+from app.Database import schema_migrations
+from app.Database.repository.position_repository import PositionRepository
+from app.Database.repository.signal_repository import SignalRepository
+from app.Database.repository.take_profit_repository import TakeProfitRepository
+
+
+class TestTakeProfitRepository(TestBase):
+    """Test cases for TakeProfitRepository"""
+
+    def setUp(self):
+        super().setUp()
+        self.db_path = os.path.join(self.temp_dir, "test.db")
+        self.signals = SignalRepository(self.db_path, enable_cache=False)
+        self.signals.create_table()
+        self.positions = PositionRepository(self.db_path, enable_cache=False)
+        self.positions.create_table()
+        self.repo = TakeProfitRepository(self.db_path, enable_cache=False)
+
+    def _insert_signal(self, tp_list):
+        return self.signals.repository.insert({
+            "telegram_channel_title": "test", "telegram_message_id": 1, "telegram_message_chatid": 1,
+            "open_price": 1.0850, "second_price": None, "stop_loss": 1.0800, "tp_list": tp_list,
+            "symbol": "EURUSD", "current_time": "2024-01-01 00:00:00"})
+
+    def test_migration_backfills_tp_list(self):
+        """Test that existing signals get one row per parsable TP in signal order"""
+        first = self._insert_signal("1.0950,1.0900,bad")
+        empty = self._insert_signal("")
+        self.positions.insert_position({"signal_id": first, "position_id": 10, "user_id": 1})
+
+        schema_migrations.migrate(self.repo.repository.connections)
+
+        self.assertEqual(self.repo.get_levels_by_signal([first, empty]), {first: [1.0950, 1.0900]})
+        self.assertEqual(self.positions.get_tp_levels(10), [1.0950, 1.0900])
+        self.assertEqual([row[:2] for row in self.positions.get_managed_positions([10])], [(10, first)])
+
+    def test_set_levels_keeps_hits_of_unchanged_prices(self):
+        """Test that editing the ladder keeps hit history only where the price is unchanged"""
+        schema_migrations.migrate(self.repo.repository.connections)
+        signal_id = self._insert_signal("")
+        self.repo.set_levels(signal_id, [1.0900, 1.0950, 1.1000])
+        self.assertEqual(self.repo.mark_hit([(signal_id, 0, 100), (signal_id, 1, 200)]), 2)
+        self.assertEqual(self.repo.mark_hit([(signal_id, 0, 300)]), 0)
+
+        self.repo.set_levels(signal_id, [1.0900, 1.0960])
+
+        self.assertEqual(self.repo.get_history(signal_id), ((0, 1.0900, 100), (1, 1.0960, None)))
+
+
+    def test_levels_keep_full_precision(self):
+        """Test that levels are read back as stored and hits match by level_index"""
+        schema_migrations.migrate(self.repo.repository.connections)
+        signal_id = self._insert_signal("")
+        self.repo.set_levels(signal_id, [0.1 + 0.2, 1.23456789012345])
+
+        self.assertEqual(self.repo.get_levels_by_signal([signal_id]), {signal_id: [0.1 + 0.2, 1.23456789012345]})
+        self.assertEqual(self.repo.mark_hit([(signal_id, 0, 100)]), 1)
+        self.assertEqual(self.repo.get_history(signal_id)[0][2], 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Unit tests for UnitOfWork and GroupCommitWriter"""
+
+import os
+import sqlite3
+import unittest
+from tests.fixtures import TestBase
+from app.Database import schema_migrations
+from app.Database.unit_of_work import GroupCommitWriter, UnitOfWork
+from app.Database.repository.position_repository import PositionRepository
+from app.Database.repository.signal_repository import SignalRepository
+from app.Database.repository.take_profit_repository import TakeProfitRepository
+
+
+def signal_data(message_id):
+    return {"telegram_channel_title": "test", "telegram_message_id": message_id, "telegram_message_chatid": 1,
+            "open_price": 1.0850, "second_price": 1.0830, "stop_loss": 1.0800, "tp_list": "1.09,1.095",
+            "symbol": "EURUSD", "current_time": "2024-01-01 00:00:00"}
+
+
+class TestUnitOfWork(TestBase):
+    """Test cases for buffered signal and position writes"""
+
+    def setUp(self):
+        super().setUp()
+        self.db_path = os.path.join(self.temp_dir, "test.db")
+        self.signals = SignalRepository(self.db_path)
+        self.signals.create_table()
+        self.positions = PositionRepository(self.db_path)
+        self.positions.create_table()
+        self.take_profits = TakeProfitRepository(self.db_path)
+        schema_migrations.migrate(self.positions.repository.connections)
+
+    def test_commit_writes_signal_with_positions(self):
+        """Test that a signal, its TP levels and positions are saved together and visible to cached lookups"""
+        self.assertIsNone(self.signals.get_signal_by_position_id(10))
+        unit = UnitOfWork(self.db_path)
+        signal = unit.add_signal(signal_data(1), [1.09, 1.095])
+        signal.add_position(10, 7, is_first=True)
+        signal.add_position(11, 7, is_second=True)
+
+        signal_id, = unit.commit()
+
+        self.assertEqual(self.signals.get_signal_by_position_id(10).id, signal_id)
+        self.assertEqual(self.positions.get_position_by_signal_id(signal_id, second=True).position_id, 11)
+        self.assertEqual(self.take_profits.get_levels(signal_id), [1.09, 1.095])
+
+    def test_positions_of_saved_signal(self):
+        """Test that positions can be written later for a signal saved before its orders were sent"""
+        unit = UnitOfWork(self.db_path)
+        unit.add_signal(signal_data(1), [1.09])
+        signal_id, = unit.commit()
+        self.assertEqual(self.signals.get_signal_by_chat(1, 1)["id"], signal_id)
+
+        positions = UnitOfWork(self.db_path)
+        positions.add_positions(signal_id).add_position(10, 7, is_first=True)
+
+        self.assertEqual(positions.commit(), [signal_id])
+        self.assertEqual(self.signals.get_signal_by_chat(1, 1, user_id=7)["id"], signal_id)
+        self.assertEqual(len(self.signals.get_all_signals()), 1)
+        self.assertEqual(self.take_profits.get_levels(signal_id), [1.09])
+
+    def test_group_commit_isolates_failing_unit(self):
+        """Test that queued units are committed and a failing unit does not roll back the others"""
+        writer = GroupCommitWriter(self.db_path)
+        self.addCleanup(writer.stop)
+        units = []
+        for message_id in (1, 2, 3):
+            unit = UnitOfWork(self.db_path)
+            data = signal_data(message_id)
+            if message_id == 2:
+                del data["symbol"]  # NOT NULL
+            unit.add_signal(data, [1.09]).add_position(100 + message_id, 7)
+            units.append(unit)
+
+        futures = [writer.submit(unit) for unit in units]
+
+        futures[0].result(timeout=5)
+        futures[2].result(timeout=5)
+        with self.assertRaises(sqlite3.IntegrityError):
+            futures[1].result(timeout=5)
+        self.assertEqual(sorted(self.positions.get_all_positions(), key=lambda p: p.position_id)[-1].position_id, 103)
+        self.assertEqual(len(self.signals.get_all_signals()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Unit tests for the account worker command channel"""
+
+import time
+import threading
+import unittest
+import concurrent.futures
+from unittest.mock import patch, MagicMock
+from tests.fixtures import TestBase
+from app.MetaTrader.workers import account_worker
+from app.MetaTrader.workers.account_worker import AccountWorker, TerminalUnavailableError
+
+
+class ThreadProcess(threading.Thread):
+    """Serves a worker's queues from a thread instead of a spawned process"""
+
+    def __init__(self, commands, results):
+        super().__init__(target=account_worker._serve, args=(None, commands, results), daemon=True)
+        self.commands = commands
+        self.terminated = False
+
+    def terminate(self):
+        self.terminated = True
+        self.commands.put(None)
+
+
+class ThreadWorker(AccountWorker):
+    """Account worker whose terminal side runs in-process"""
+
+    def _spawn(self, commands, results):
+        process = ThreadProcess(commands, results)
+        process.start()
+        return process
+
+
+def _hang(*args):
+    time.sleep(0.3)
+
+
+class TestAccountWorker(TestBase):
+    """Test cases for AccountWorker class"""
+
+    def setUp(self):
+        super().setUp()
+        self.worker = ThreadWorker(MagicMock(username=1, server="TestServer"), timeout=2)
+
+    def tearDown(self):
+        self.worker.shutdown()
+        super().tearDown()
+
+    def test_commands_resolve_their_own_futures(self):
+        """Test that each result is routed back to the command that requested it"""
+        commands = {'modify_stops': lambda tickets, sl, tp: {ticket: True for ticket in tickets},
+                    'close': lambda ticket: ticket == 7}
+        with patch.dict(account_worker.COMMANDS, commands):
+            futures = [self.worker.call('close', ticket) for ticket in (6, 7)]
+
+            self.assertEqual(self.worker.modify_stops([1, 2], sl=1.1), {1: True, 2: True})
+            self.assertEqual([future.result(timeout=2) for future in futures], [False, True])
+
+    def test_worker_errors_are_raised_to_the_caller(self):
+        """Test that an exception inside the worker fails only that command"""
+        def fail(ticket):
+            raise ValueError("terminal disconnected")
+
+        with patch.dict(account_worker.COMMANDS, {'close': fail}):
+            with self.assertRaises(RuntimeError) as context:
+                self.worker.close(1)
+
+        self.assertIn("terminal disconnected", str(context.exception))
+        self.assertRaises(RuntimeError, self.worker.request, 'unknown')
+
+    def test_hung_terminal_is_restarted(self):
+        """Test that a command timeout kills the worker and fails its pending commands"""
+        with patch.dict(account_worker.COMMANDS, {'snapshot': _hang, 'close': _hang}):
+            queued = self.worker.call('close', 1)
+            process = self.worker._process
+
+            with self.assertRaises(concurrent.futures.TimeoutError):
+                self.worker.request('snapshot', timeout=0.1)
+
+        self.assertTrue(process.terminated)
+        self.assertIsNone(self.worker._process)
+        self.assertRaises(TerminalUnavailableError, queued.result, 0)
+
+    def test_worker_executing_trade_is_not_killed(self):
+        """Test that a timeout while a trade is running leaves the worker and the trade alive"""
+        with patch.dict(account_worker.COMMANDS, {'trade': lambda: _hang() or 5, 'snapshot': lambda: {}}):
+            trade = self.worker.call('trade')
+            process = self.worker._process
+
+            with self.assertRaises(concurrent.futures.TimeoutError):
+                self.worker.request('snapshot', timeout=0.1)
+
+            self.assertFalse(process.terminated)
+            self.assertEqual(trade.result(timeout=2), 5)
+            self.assertFalse(self.worker.is_trading())
+
+    def test_replacement_worker_resumes_monitoring(self):
+        """Test that a monitoring worker restarts monitoring in the process replacing it"""
+        started = []
+        worker = ThreadWorker(MagicMock(username=2, server="TestServer"), timeout=2, monitor=True)
+        self.addCleanup(worker.shutdown)
+
+        with patch.dict(account_worker.COMMANDS, {'monitor': lambda: started.append(True), 'login': lambda: True}):
+            self.assertTrue(worker.request('login'))
+            worker.restart()
+            self.assertTrue(worker.request('login'))
+
+        self.assertEqual(len(started), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
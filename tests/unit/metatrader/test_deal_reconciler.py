@@ -0,0 +1,91 @@
+"""Unit tests for deal-history reconciliation of closed positions"""
+
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+from tests.fixtures import TestBase
+from app.Database import schema_migrations
+from app.Database.repository.position_repository import PositionRepository
+from app.Database.repository.signal_repository import SignalRepository
+from app.MetaTrader.monitoring.expiry import ExpiryWheel
+from app.MetaTrader.monitoring.reconciler import DealReconciler
+from app.MetaTrader.monitoring.registry import PositionRegistry
+from app.MetaTrader.monitoring.snapshot import MarketSnapshot
+
+
+def create_mock_deal(ticket, position_id, entry=1, profit=0.0, price=1.0900, time=1700000000):
+    return MagicMock(ticket=ticket, position_id=position_id, entry=entry, profit=profit, swap=0.0,
+                     commission=0.0, fee=0.0, price=price, time=time, time_msc=time * 1000)
+
+
+class TestDealReconciler(TestBase):
+    """Test cases for DealReconciler class"""
+
+    def setUp(self):
+        super().setUp()
+        db_path = os.path.join(self.temp_dir, "test.db")
+        SignalRepository(db_path, enable_cache=False).create_table()
+        self.repo = PositionRepository(db_path, enable_cache=False)
+        self.repo.create_table()
+        schema_migrations.migrate(self.repo.repository.connections)
+        for position_id in (10, 11):
+            self.repo.insert_position({"signal_id": 1, "position_id": position_id, "user_id": 7,
+                                       "is_first": position_id == 10, "is_second": position_id == 11})
+
+        self.market_data = MagicMock()
+        self.registry = PositionRegistry()
+        self.reconciler = DealReconciler(self.market_data, 7, registry=self.registry, expiry=ExpiryWheel())
+        patcher = patch('app.MetaTrader.monitoring.reconciler.Database.Migrations._position_repo', self.repo)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _position(self, position_id):
+        return [p for p in self.repo.get_all_positions() if p.position_id == position_id][0]
+
+    def test_partial_and_final_exits(self):
+        """Test that partial closes accumulate profit and a full close records the result"""
+        self.market_data.get_deals.return_value = [
+            create_mock_deal(100, 10, entry=0),
+            create_mock_deal(101, 10, profit=5.0, price=1.0900),  # profit taking, still open
+        ]
+        self.assertEqual(self.reconciler.reconcile(MarketSnapshot([MagicMock(ticket=10)], [], {}), [11]), [])
+        self.assertEqual(self._position(10).profit, 5.0)
+        self.assertIsNone(self._position(10).closed_at)
+
+        self.market_data.get_deals.return_value = [
+            create_mock_deal(101, 10, profit=5.0),  # already reconciled
+            create_mock_deal(102, 10, profit=-2.5, price=1.0852, time=1700000100),
+        ]
+        closed = self.reconciler.reconcile(MarketSnapshot([], [], {}), [10])
+
+        self.assertEqual(closed, [10])
+        position = self._position(10)
+        self.assertEqual((position.profit, position.close_price, position.closed_at), (2.5, 1.0852, 1700000100))
+        self.assertEqual(self.repo.get_deal_watermark(7), (1700000100, 102))
+        self.assertEqual(self.market_data.get_deals.call_args[0][0], 1700000000)
+
+    def test_exits_roll_back_without_watermark(self):
+        """Test that profits are not kept when the watermark of their deals could not be stored"""
+        self.market_data.get_deals.return_value = [create_mock_deal(101, 10, profit=5.0)]
+
+        with patch.object(self.repo, 'set_deal_watermark', side_effect=RuntimeError("disk I/O error")):
+            with self.assertRaises(RuntimeError):
+                self.reconciler.reconcile(MarketSnapshot([MagicMock(ticket=10)], [], {}), [11])
+        self.assertIsNone(self._position(10).profit)
+
+        self.reconciler.reconcile(MarketSnapshot([MagicMock(ticket=10)], [], {}), [11])
+
+        self.assertEqual(self._position(10).profit, 5.0)
+        self.assertEqual(self.repo.get_deal_watermark(7), (1700000000, 101))
+
+    def test_runs_only_when_due(self):
+        """Test that the deal history is not read on quiet ticks"""
+        self.market_data.get_deals.return_value = []
+        self.reconciler.reconcile(MarketSnapshot([], [], {}))
+        self.reconciler.reconcile(MarketSnapshot([], [], {}))
+
+        self.market_data.get_deals.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
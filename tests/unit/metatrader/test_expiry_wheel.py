@@ -0,0 +1,88 @@
+"""Unit tests for the local pending order expiry wheel"""
+
+import unittest
+from unittest.mock import MagicMock
+from tests.fixtures import TestBase, create_mock_order
+from app.MetaTrader.monitoring.expiry import ExpiryWheel
+from app.MetaTrader.monitoring.monitoring import MonitoringManager, mt5
+from app.MetaTrader.monitoring.registry import PositionRegistry
+from app.MetaTrader.monitoring.snapshot import MarketSnapshot
+
+
+class TestExpiryWheel(TestBase):
+    """Test cases for ExpiryWheel class"""
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        self.wheel = ExpiryWheel(resolution=1.0, slots=60, clock=lambda: self.now)
+
+    def test_tickets_are_due_at_their_expiry(self):
+        """Test that a ticket is returned once, when its expiry passed"""
+        self.wheel.schedule(1, 1010.5)
+        self.wheel.schedule(2, 1020.0)
+
+        self.assertEqual(self.wheel.due(1010.0), [])
+        self.assertEqual(self.wheel.due(1011.0), [1])
+        self.assertEqual(self.wheel.due(1015.0), [])
+        self.assertEqual(self.wheel.due(1020.0), [2])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_expiry_beyond_one_revolution(self):
+        """Test that an expiry further away than the wheel size waits for its turn"""
+        self.wheel.schedule(1, 1100.0)
+
+        self.assertEqual(self.wheel.due(1050.0), [])
+        self.assertEqual(self.wheel.due(1099.0), [])
+        self.assertEqual(self.wheel.due(1200.0), [1])
+
+    def test_cancel_and_reschedule(self):
+        """Test that cancelled tickets are never returned and rescheduling moves them"""
+        self.wheel.schedule(1, 1005.0)
+        self.wheel.schedule(2, 1005.0)
+        self.wheel.cancel(1)
+        self.wheel.schedule(2, 1008.0)
+
+        self.assertEqual(self.wheel.due(1006.0), [])
+        self.assertEqual(self.wheel.due(1008.0), [2])
+
+    def test_monitoring_cancels_due_orders(self):
+        """Test that the monitoring loop cancels only due orders still pending"""
+        position_manager = MagicMock()
+        monitoring = MonitoringManager(MagicMock(), MagicMock(), position_manager, registry=PositionRegistry(),
+                                       tick_watcher=MagicMock(), expiry=self.wheel)
+        self.wheel.schedule(11, 1001.0)
+        self.wheel.schedule(12, 1001.0)  # already filled or cancelled
+        self.wheel.schedule(13, 1500.0)
+        self.now = 1002.0
+
+        monitoring.expire_orders(MarketSnapshot([], [create_mock_order(ticket=11), create_mock_order(ticket=13)], {}))
+
+        self.assertEqual(position_manager.cancel_orders.call_args[0][0], [11])
+        self.assertIn(13, self.wheel)
+
+    def test_deadlines_rebuilt_from_order_setup_time(self):
+        """Test that managed GTC orders get an expiry from their setup time, converted from server time"""
+        registry = MagicMock()
+        registry.get.side_effect = lambda ticket: MagicMock() if ticket != 12 else None
+        monitoring = MonitoringManager(MagicMock(), MagicMock(), MagicMock(), registry=registry,
+                                       tick_watcher=MagicMock(), expiry=self.wheel, expire_pending_minutes=30)
+        orders = [create_mock_order(ticket=11), create_mock_order(ticket=12), create_mock_order(ticket=13)]
+        for order in orders:
+            order.type_time = mt5.ORDER_TIME_GTC
+            order.time_setup = 5000
+        orders[2].type_time = mt5.ORDER_TIME_SPECIFIED  # expired by the broker
+        # Server clock is 4600s ahead of the local one
+        snapshot = MarketSnapshot([], orders, {"EURUSD": MagicMock(time=5600)}, taken_at=1000.0)
+
+        monitoring.schedule_expiries(snapshot)
+
+        self.assertIn(11, self.wheel)
+        self.assertNotIn(12, self.wheel)
+        self.assertNotIn(13, self.wheel)
+        self.assertEqual(self.wheel.due(2199.0), [])
+        self.assertEqual(self.wheel.due(2200.0), [11])
+
+
+if __name__ == '__main__':
+    unittest.main()
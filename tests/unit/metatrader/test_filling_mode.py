@@ -0,0 +1,68 @@
+"""Unit tests for filling mode resolution in MarketData"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+from tests.fixtures import TestBase
+from app.MetaTrader.trading.market_data import MarketData
+
+
+class TestFillingMode(TestBase):
+    """Test cases for MarketData filling mode resolution"""
+
+    def setUp(self):
+        super().setUp()
+        MarketData._symbol_info_cache.clear()
+        MarketData._symbol_info_cache_time.clear()
+        MarketData._filling_modes_cache.clear()
+        self.market_data = MarketData()
+
+    def _symbol_info(self, filling_mode, trade_exemode=2):
+        return MagicMock(filling_mode=filling_mode, trade_exemode=trade_exemode, digits=5)
+
+    @patch('app.MetaTrader.trading.market_data.mt5')
+    def test_prefers_ioc_when_allowed(self, mock_mt5):
+        """Test that IOC is kept when the broker accepts it"""
+        mock_mt5.SYMBOL_FILLING_FOK, mock_mt5.SYMBOL_FILLING_IOC = 1, 2
+        mock_mt5.ORDER_FILLING_FOK, mock_mt5.ORDER_FILLING_IOC, mock_mt5.ORDER_FILLING_RETURN = 0, 1, 2
+        mock_mt5.SYMBOL_TRADE_EXECUTION_MARKET = 2
+        mock_mt5.symbol_info.return_value = self._symbol_info(filling_mode=3)
+
+        self.assertEqual(self.market_data.get_filling_modes("EURUSD"), [1, 0])
+        self.assertEqual(self.market_data.get_filling_mode("EURUSD"), 1)
+
+    @patch('app.MetaTrader.trading.market_data.mt5')
+    def test_fok_only_broker(self, mock_mt5):
+        """Test that FOK is used when it is the only accepted mode"""
+        mock_mt5.SYMBOL_FILLING_FOK, mock_mt5.SYMBOL_FILLING_IOC = 1, 2
+        mock_mt5.ORDER_FILLING_FOK, mock_mt5.ORDER_FILLING_IOC, mock_mt5.ORDER_FILLING_RETURN = 0, 1, 2
+        mock_mt5.SYMBOL_TRADE_EXECUTION_MARKET = 2
+        mock_mt5.symbol_info.return_value = self._symbol_info(filling_mode=1)
+
+        self.assertEqual(self.market_data.get_filling_mode("XAUUSD"), 0)
+
+    @patch('app.MetaTrader.trading.market_data.mt5')
+    def test_return_for_non_market_execution(self, mock_mt5):
+        """Test that RETURN is offered for instant/request execution symbols"""
+        mock_mt5.SYMBOL_FILLING_FOK, mock_mt5.SYMBOL_FILLING_IOC = 1, 2
+        mock_mt5.ORDER_FILLING_FOK, mock_mt5.ORDER_FILLING_IOC, mock_mt5.ORDER_FILLING_RETURN = 0, 1, 2
+        mock_mt5.SYMBOL_TRADE_EXECUTION_MARKET = 2
+        mock_mt5.symbol_info.return_value = self._symbol_info(filling_mode=0, trade_exemode=1)
+
+        self.assertEqual(self.market_data.get_filling_modes("US30"), [2])
+
+    @patch('app.MetaTrader.trading.market_data.mt5')
+    def test_symbol_info_is_fetched_once(self, mock_mt5):
+        """Test that filling modes are resolved once per symbol"""
+        mock_mt5.SYMBOL_FILLING_FOK, mock_mt5.SYMBOL_FILLING_IOC = 1, 2
+        mock_mt5.SYMBOL_TRADE_EXECUTION_MARKET = 2
+        mock_mt5.symbol_info.return_value = self._symbol_info(filling_mode=2)
+
+        for _ in range(5):
+            self.market_data.get_filling_mode("EURUSD")
+            self.market_data.get_digits("EURUSD")
+
+        mock_mt5.symbol_info.assert_called_once_with("EURUSD")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Unit tests for the threaded monitoring engine"""
+
+import asyncio
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock
+from tests.fixtures import TestBase
+from app.MetaTrader.monitoring.engine import MonitoringEngine
+
+
+class TestMonitoringEngine(TestBase):
+    """Test cases for MonitoringEngine class"""
+
+    def _monitoring(self, tick):
+        monitoring = MagicMock()
+        monitoring.connection.user = 123
+        monitoring.connection.login.return_value = True
+        monitoring.tick.side_effect = tick
+        monitoring.tick_watcher.next_interval.return_value = 0.01
+        return monitoring
+
+    def test_events_reach_the_event_loop(self):
+        """Test that closed tickets and errors are reported through the queue"""
+        results = iter([[10], RuntimeError("terminal gone")])
+
+        def tick():
+            result = next(results, [])
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        async def run():
+            engine = MonitoringEngine(self._monitoring(tick))
+            engine.RETRY_DELAY = 0.01
+            events = engine.start()
+            received = [await asyncio.wait_for(events.get(), 1) for _ in range(2)]
+            engine.stop(timeout=1)
+            return received, engine.is_alive()
+
+        received, alive = asyncio.run(run())
+
+        self.assertEqual(received, [('closed', [10]), ('error', 'terminal gone')])
+        self.assertFalse(alive)
+
+    def test_blocking_tick_does_not_stall_the_event_loop(self):
+        """Test that a slow monitoring iteration leaves the event loop responsive"""
+        def tick():
+            time.sleep(0.3)
+            return []
+
+        async def run():
+            engine = MonitoringEngine(self._monitoring(tick))
+            engine.start()
+            await asyncio.sleep(0.05)  # let the thread enter its first tick
+
+            started = time.monotonic()
+            await asyncio.sleep(0.01)
+            latency = time.monotonic() - started
+            engine.stop(timeout=1)
+            return latency
+
+        self.assertLess(asyncio.run(run()), 0.1)
+
+    def test_iterations_wait_for_shared_lock(self):
+        """Test that login and ticks do not run while another thread holds the terminal lock"""
+        lock = threading.RLock()
+        ticked = threading.Event()
+        monitoring = self._monitoring(lambda: ticked.set() or [])
+
+        async def run():
+            engine = MonitoringEngine(monitoring, lock=lock)
+            with lock:
+                engine.start()
+                await asyncio.sleep(0.1)
+                blocked = not monitoring.connection.login.called and not ticked.is_set()
+            reached = await asyncio.get_running_loop().run_in_executor(None, ticked.wait, 1)
+            engine.stop(timeout=1)
+            return blocked, reached
+
+        self.assertEqual(asyncio.run(run()), (True, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
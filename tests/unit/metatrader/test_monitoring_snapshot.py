@@ -0,0 +1,127 @@
+"""Unit tests for snapshot-based position monitoring"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+from tests.fixtures import TestBase, create_mock_position, create_mock_order
+from app.MetaTrader.monitoring.monitoring import MonitoringManager
+from app.MetaTrader.monitoring.snapshot import MarketSnapshot
+from app.MetaTrader.monitoring.registry import PositionRegistry
+
+
+TP_LEVELS = 'app.MetaTrader.monitoring.registry.Database.Migrations.get_take_profit_levels'
+
+
+class TestMonitoringSnapshot(TestBase):
+    """Test cases for MonitoringManager trailing on a MarketSnapshot"""
+
+    def setUp(self):
+        super().setUp()
+        self.market_data = MagicMock()
+        self.position_manager = MagicMock()
+        self.position_manager.update_stop_loss.return_value = True
+        self.registry = PositionRegistry()
+        self.monitoring = MonitoringManager(MagicMock(), self.market_data, self.position_manager, [25, 25], True, self.registry)
+
+    def _ticks(self, **prices):
+        self.market_data.get_tick.side_effect = lambda symbol: MagicMock(bid=prices[symbol])
+
+    def test_one_tick_per_symbol(self):
+        """Test that the terminal is read once per symbol regardless of the number of positions"""
+        self.market_data.get_open_positions.return_value = [
+            create_mock_position(ticket=ticket, symbol="EURUSD") for ticket in (1, 2, 3)]
+        self.market_data.get_pending_orders.return_value = [create_mock_order(ticket=4, symbol="XAUUSD")]
+        self._ticks(EURUSD=1.0870, XAUUSD=1950.0)
+
+        snapshot = MarketSnapshot.take(self.market_data)
+
+        self.assertEqual(self.market_data.get_tick.call_count, 2)
+        self.assertEqual(snapshot.get_current_price("EURUSD"), 1.0870)
+        self.assertEqual(snapshot.get_position_or_order(4).symbol, "XAUUSD")
+
+    @patch(TP_LEVELS, return_value={1: [1.0900, 1.0950]})
+    @patch('app.MetaTrader.monitoring.monitoring.Database.Migrations.mark_take_profits_hit')
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_managed_positions')
+    def test_trailing_moves_stop_to_entry(self, mock_get_managed_positions, mock_mark_take_profits_hit, mock_get_take_profit_levels):
+        """Test that reaching the first TP moves the stop loss to the entry price"""
+        self.market_data.get_open_positions.return_value = [
+            create_mock_position(ticket=12345, price_open=1.0852, sl=1.0800, volume=0.1, type=0)]
+        self.market_data.get_pending_orders.return_value = []
+        self._ticks(EURUSD=1.0905)
+        self.position_manager.set_stop_losses.side_effect = lambda stops, positions: {ticket: True for ticket in stops}
+        mock_get_managed_positions.return_value = [
+            (12345, 1, True, False, 1.0850, None)]
+
+        self.monitoring.trailing()
+
+        mock_get_managed_positions.assert_called_once_with([12345])
+        self.assertEqual(self.position_manager.set_stop_losses.call_args[0][0], {12345: 1.0852})
+        self.assertEqual(self.position_manager.close_volumes.call_args[0][0], {12345: (0.03, 25.0)})
+        self.market_data.get_position_or_order.assert_not_called()
+
+    @patch(TP_LEVELS, return_value={1: [1.1000, 1.0900, 1.0950]})
+    @patch('app.MetaTrader.monitoring.monitoring.Database.Migrations.mark_take_profits_hit')
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_managed_positions')
+    def test_trailing_follows_ladder_over_two_ticks(self, mock_get_managed_positions, mock_mark_take_profits_hit, mock_get_take_profit_levels):
+        """Test that crossing TP1 then TP2 moves the stop loss to the entry and then to TP1"""
+        self.market_data.get_pending_orders.return_value = []
+        self.position_manager.set_stop_losses.side_effect = lambda stops, positions: {ticket: True for ticket in stops}
+        mock_get_managed_positions.return_value = [
+            (12345, 1, True, False, 1.0850, None)]
+
+        self.market_data.get_open_positions.return_value = [
+            create_mock_position(ticket=12345, price_open=1.0852, sl=1.0800, volume=0.1, type=0)]
+        self._ticks(EURUSD=1.0905)
+        self.monitoring.trailing()
+        self.assertEqual(self.position_manager.set_stop_losses.call_args[0][0], {12345: 1.0852})
+
+        # The terminal now reports the stop loss at the entry
+        self.market_data.get_open_positions.return_value = [
+            create_mock_position(ticket=12345, price_open=1.0852, sl=1.0852, volume=0.07, type=0)]
+        self._ticks(EURUSD=1.0940)
+        self.monitoring.trailing()
+        self.assertEqual(self.position_manager.set_stop_losses.call_count, 1)
+
+        self._ticks(EURUSD=1.0951)
+        self.monitoring.trailing()
+        self.assertEqual(self.position_manager.set_stop_losses.call_args[0][0], {12345: 1.0900})
+        # Hits are keyed by the level_index of the signal, not by the sorted ladder or the price
+        self.assertEqual([{level for _, level, _ in call[0][0]} for call in mock_mark_take_profits_hit.call_args_list],
+                         [{1}, {2}])
+
+    @patch(TP_LEVELS, return_value={1: [1.0900]})
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_managed_positions')
+    def test_pending_second_entry_cancelled(self, mock_get_managed_positions, mock_get_take_profit_levels):
+        """Test that the pending leg is cancelled once price reaches TP1 with the first leg active"""
+        self.market_data.get_open_positions.return_value = [create_mock_position(ticket=10, sl=1.0800, type=0)]
+        self.market_data.get_pending_orders.return_value = [create_mock_order(ticket=11, type=2)]  # BUY_LIMIT
+        self._ticks(EURUSD=1.0901)
+        mock_get_managed_positions.return_value = [
+            (11, 1, False, True, 1.0850, 1.0830),
+            (10, 1, True, False, 1.0850, 1.0830)]
+
+        self.monitoring.manage_positions()
+
+        self.assertEqual(self.position_manager.cancel_orders.call_args[0][0], [11])
+        self.position_manager.close_position.assert_not_called()
+        self.market_data.get_open_positions.assert_called_once_with()
+
+    @patch(TP_LEVELS, return_value={2: [1940.0, 1930.0]})
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_managed_positions')
+    def test_pending_cancellations(self, mock_get_managed_positions, mock_get_take_profit_levels):
+        """Test that a pending leg is kept until TP1 and cancelled without a second entry"""
+        orders = [create_mock_order(ticket=21, symbol="XAUUSD", type=3)]  # SELL_LIMIT
+        mock_get_managed_positions.return_value = [
+            (21, 2, False, True, 1950.0, None),
+            (20, 2, True, False, 1950.0, None)]
+        self.registry.sync(MarketSnapshot([], orders, {}))
+
+        not_reached = MarketSnapshot([], orders, {"XAUUSD": MagicMock(bid=1945.0)})
+        reached = MarketSnapshot([], orders, {"XAUUSD": MagicMock(bid=1939.5)})
+
+        self.assertEqual(self.monitoring.pending_cancellations(not_reached), {})
+        self.assertEqual(self.monitoring.pending_cancellations(reached), {21: "no second entry needed"})
+        mock_get_managed_positions.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Unit tests for the order retry policy"""
+
+import unittest
+from collections import namedtuple
+from unittest.mock import patch, MagicMock
+from tests.fixtures import TestBase
+from app.MetaTrader.trading.retry import RetryPolicy, OrderAttemptLog
+
+OrderSendResult = namedtuple('OrderSendResult', 'retcode order comment')
+
+
+class TestRetryPolicy(TestBase):
+    """Test cases for RetryPolicy class"""
+
+    def setUp(self):
+        super().setUp()
+        self.attempt_log = OrderAttemptLog()
+        self.policy = RetryPolicy(max_backoff=0.0, max_total_latency=1.0, attempt_log=self.attempt_log)
+        self.request = {"symbol": "EURUSD", "type": 0, "price": 1.0850, "action": 1}
+
+    @patch('app.MetaTrader.trading.retry.mt5.order_send')
+    def test_success_is_not_retried(self, mock_order_send):
+        """Test that a filled order is sent only once"""
+        mock_order_send.return_value = MagicMock(retcode=10009)
+
+        result = self.policy.execute(self.request)
+
+        self.assertEqual(result.retcode, 10009)
+        mock_order_send.assert_called_once()
+        self.assertEqual(self.attempt_log.get_stats()['fill_rate'], 1.0)
+
+    @patch('app.MetaTrader.trading.retry.mt5.order_send')
+    def test_requote_is_repriced(self, mock_order_send):
+        """Test that a requote is resent with the re-priced request"""
+        mock_order_send.side_effect = [MagicMock(retcode=10004), MagicMock(retcode=10009)]
+        reprice = MagicMock(side_effect=lambda request, rule: dict(request, price=1.0860))
+
+        result = self.policy.execute(self.request, reprice)
+
+        self.assertEqual(result.retcode, 10009)
+        self.assertEqual(mock_order_send.call_count, 2)
+        self.assertEqual(mock_order_send.call_args[0][0]['price'], 1.0860)
+        self.assertEqual(reprice.call_args[0][1].name, 'requote')
+
+    @patch('app.MetaTrader.trading.retry.mt5.order_send')
+    def test_attempts_are_bounded_per_rule(self, mock_order_send):
+        """Test that a retcode class is retried at most max_attempts times"""
+        mock_order_send.return_value = MagicMock(retcode=10024)  # TOO_MANY_REQUESTS
+
+        result = self.policy.execute(self.request)
+
+        self.assertEqual(result.retcode, 10024)
+        self.assertEqual(mock_order_send.call_count, 4)  # first send + 3 retries
+        self.assertEqual(self.attempt_log.get_stats()['filled'], 0)
+
+    @patch('app.MetaTrader.trading.retry.mt5.order_send')
+    def test_final_retcode_is_not_retried(self, mock_order_send):
+        """Test that unknown retcodes are treated as final"""
+        mock_order_send.return_value = MagicMock(retcode=10019)  # NO_MONEY
+
+        self.policy.execute(self.request)
+
+        mock_order_send.assert_called_once()
+
+    @patch('app.MetaTrader.trading.retry.time.sleep')
+    @patch('app.MetaTrader.trading.retry.mt5.order_send')
+    def test_total_latency_is_capped(self, mock_order_send, mock_sleep):
+        """Test that retries stop when the backoff would exceed the latency budget"""
+        mock_order_send.return_value = MagicMock(retcode=10028)  # LOCKED
+        policy = RetryPolicy(max_backoff=5.0, max_total_latency=0.1, attempt_log=self.attempt_log)
+
+        policy.execute(self.request)
+
+        mock_order_send.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch('app.MetaTrader.trading.retry.mt5.order_send')
+    def test_timeout_is_not_resent_blindly(self, mock_order_send):
+        """Test that a timed out request is resent only when no order was opened for it"""
+        mock_order_send.return_value = OrderSendResult(10012, 0, "Timeout")  # TIMEOUT
+        find_sent = MagicMock(side_effect=[55])
+
+        result = self.policy.execute(self.request, find_sent=find_sent)
+
+        mock_order_send.assert_called_once()
+        self.assertEqual((result.retcode, result.order), (10009, 55))
+        self.assertEqual(self.attempt_log.get_stats()['filled'], 1)
+
+        mock_order_send.reset_mock()
+        mock_order_send.side_effect = [OrderSendResult(10031, 0, "No connection"), OrderSendResult(10009, 56, "")]
+        self.assertEqual(self.policy.execute(self.request, find_sent=MagicMock(return_value=None)).order, 56)
+        self.assertEqual(mock_order_send.call_count, 2)
+
+        mock_order_send.reset_mock(side_effect=True)
+        mock_order_send.return_value = OrderSendResult(10012, 0, "Timeout")
+        self.policy.execute(self.request)
+        mock_order_send.assert_called_once()
+
+    def test_rules_from_config_override_defaults(self):
+        """Test that configured rules are merged with the defaults"""
+        policy = RetryPolicy.from_config({"rules": {"requote": {"max_attempts": 5}}})
+
+        self.assertEqual(policy.classify(10004).max_attempts, 5)
+        self.assertEqual(policy.classify(10004).backoff, 0.05)
+        self.assertIsNone(policy.classify(10019))
+
+
+if __name__ == '__main__':
+    unittest.main()
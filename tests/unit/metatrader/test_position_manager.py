@@ -2,7 +2,7 @@
 
 import unittest
 from unittest.mock import patch, MagicMock
-from tests.fixtures import TestBase, sample_positions
+from tests.fixtures import TestBase, sample_positions, create_mock_position, create_mock_order
 from app.MetaTrader.trading.positions import PositionManager
 
 
@@ -169,5 +169,108 @@ class TestPositionManager(TestBase):
         self.assertFalse(result)
 
 
+class TestModifyStops(TestBase):
+    """Test cases for PositionManager.modify_stops"""
+
+    def setUp(self):
+        super().setUp()
+        self.market_data = self.mock_mt5_connection()
+        self.market_data.get_digits.return_value = 5
+        self.manager = PositionManager(self.market_data, magic_number=2025)
+
+    @patch('app.MetaTrader.trading.positions.order_queue')
+    def test_modify_stops_uses_one_snapshot(self, mock_queue):
+        """Test that all tickets are resolved from one positions/orders snapshot"""
+        self.market_data.get_open_positions.return_value = [
+            create_mock_position(ticket=1, sl=1.0800),
+            create_mock_position(ticket=2, sl=1.0800),
+        ]
+        self.market_data.get_pending_orders.return_value = [create_mock_order(ticket=3, sl=1.0800)]
+        mock_queue.send_all.side_effect = lambda requests: [MagicMock(retcode=10009) for _ in requests]
+
+        results = self.manager.modify_stops([1, 2, 3], sl=1.08204)
+
+        self.assertEqual(results, {1: True, 2: True, 3: True})
+        self.market_data.get_open_positions.assert_called_once_with()
+        self.market_data.get_pending_orders.assert_called_once_with()
+        requests = list(mock_queue.send_all.call_args[0][0])
+        self.assertEqual([r['action'] for r in requests].count(6), 2)  # TRADE_ACTION_SLTP
+        self.assertEqual([r['action'] for r in requests].count(7), 1)  # TRADE_ACTION_MODIFY
+        self.assertTrue(all(r['sl'] == 1.08204 for r in requests))
+
+    @patch('app.MetaTrader.trading.positions.order_queue')
+    def test_modify_stops_skips_unchanged_and_missing(self, mock_queue):
+        """Test that tickets already at target or not found are not sent"""
+        self.market_data.get_open_positions.return_value = [create_mock_position(ticket=1, sl=1.0820)]
+        self.market_data.get_pending_orders.return_value = []
+
+        results = self.manager.modify_stops([1, 99], sl=1.0820)
+
+        self.assertEqual(results, {1: False, 99: False})
+        mock_queue.send_all.assert_not_called()
+
+    @patch('app.MetaTrader.trading.positions.order_queue')
+    def test_modify_stops_reports_failures(self, mock_queue):
+        """Test that rejected modifications are reported per ticket"""
+        self.market_data.get_open_positions.return_value = [create_mock_position(ticket=1, sl=1.0800)]
+        self.market_data.get_pending_orders.return_value = []
+        mock_queue.send_all.return_value = [MagicMock(retcode=10016, comment="Invalid stops")]
+
+        results = self.manager.modify_stops([1], sl=1.0820)
+
+        self.assertEqual(results, {1: False})
+
+
+
+class TestTrailingBatch(TestBase):
+    """Test cases for PositionManager.set_stop_losses and close_volumes"""
+
+    def setUp(self):
+        super().setUp()
+        self.market_data = self.mock_mt5_connection()
+        self.market_data.get_digits.return_value = 5
+        self.market_data.get_tick.return_value = MagicMock(bid=1.0900, ask=1.0902)
+        self.market_data.get_filling_mode.return_value = 1
+        self.manager = PositionManager(self.market_data, magic_number=2025)
+        self.positions = {1: create_mock_position(ticket=1, sl=1.0800, volume=0.1),
+                          2: create_mock_position(ticket=2, sl=1.0850, volume=0.2, type=1)}
+
+    @patch('app.MetaTrader.trading.positions.order_queue')
+    def test_stop_losses_are_sent_in_one_batch(self, mock_queue):
+        """Test that every position gets its own stop loss in one queued batch"""
+        mock_queue.send_all.side_effect = lambda requests: [MagicMock(retcode=10009) for _ in requests]
+
+        results = self.manager.set_stop_losses({1: 1.0850, 2: 1.0850}, self.positions)
+
+        self.assertEqual(results, {1: True, 2: False})  # ticket 2 already at target
+        requests = list(mock_queue.send_all.call_args[0][0])
+        self.assertEqual([(r['position'], r['sl']) for r in requests], [(1, 1.0850)])
+        self.market_data.get_open_positions.assert_not_called()
+
+    @patch('app.MetaTrader.trading.positions.order_queue')
+    def test_close_volumes_use_closing_side(self, mock_queue):
+        """Test that partial closes are sent against the position direction"""
+        mock_queue.send_all.side_effect = lambda requests: [MagicMock(retcode=10009) for _ in requests]
+
+        results = self.manager.close_volumes({1: (0.03, 25.0), 2: (0.1, 50.0)}, self.positions)
+
+        self.assertEqual(results, {1: True, 2: True})
+        requests = {r['position']: r for r in mock_queue.send_all.call_args[0][0]}
+        self.assertEqual((requests[1]['type'], requests[1]['price'], requests[1]['volume']), (1, 1.0900, 0.03))
+        self.assertEqual((requests[2]['type'], requests[2]['price']), (0, 1.0902))
+        self.assertEqual(requests[1]['comment'], "Profit taking 25%")
+
+    @patch('app.MetaTrader.trading.positions.order_queue')
+    def test_cancel_orders_from_snapshot(self, mock_queue):
+        """Test that pending orders are removed in one batch without looking them up again"""
+        mock_queue.send_all.side_effect = lambda requests: [MagicMock(retcode=10009) for _ in requests]
+
+        results = self.manager.cancel_orders([11, 12], {11: create_mock_order(ticket=11)})
+
+        self.assertEqual(results, {11: True, 12: False})
+        self.assertEqual([r['order'] for r in mock_queue.send_all.call_args[0][0]], [11])
+        self.market_data.get_pending_orders.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
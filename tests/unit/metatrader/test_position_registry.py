@@ -0,0 +1,98 @@
+"""Unit tests for the managed-position registry"""
+
+import unittest
+from unittest.mock import patch
+from tests.fixtures import TestBase, create_mock_position, create_mock_order
+from app.MetaTrader.monitoring.registry import PositionRegistry
+from app.MetaTrader.monitoring.snapshot import MarketSnapshot
+
+
+ROWS = [
+    (11, 1, False, True, 1.0850, 1.0830),
+    (10, 1, True, False, 1.0850, 1.0830),
+]
+TP_LEVELS = {1: [1.0950, 1.0900]}
+
+
+class TestPositionRegistry(TestBase):
+    """Test cases for PositionRegistry class"""
+
+    def setUp(self):
+        super().setUp()
+        self.registry = PositionRegistry()
+
+    def _snapshot(self, positions=(), orders=()):
+        return MarketSnapshot(list(positions), list(orders), {})
+
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_take_profit_levels', return_value=TP_LEVELS)
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_managed_positions')
+    def test_sync_loads_unknown_tickets_once(self, mock_get_managed_positions, mock_get_take_profit_levels):
+        """Test that tickets are looked up in the database only the first time they are seen"""
+        mock_get_managed_positions.return_value = ROWS
+        snapshot = self._snapshot([create_mock_position(ticket=10, price_open=1.0852, sl=1.0800)],
+                                  [create_mock_order(ticket=11), create_mock_order(ticket=99)])
+
+        self.registry.sync(snapshot)
+        self.registry.sync(snapshot)
+
+        mock_get_managed_positions.assert_called_once()
+        mock_get_take_profit_levels.assert_called_once_with({1})
+        self.assertEqual(self.registry.get(10).tp_levels, [1.0900, 1.0950])
+        self.assertEqual(self.registry.get(10).signal.tp_indexes, [1, 0])
+        self.assertEqual(self.registry.get(10).entry, 1.0852)
+        self.assertTrue(self.registry.get(11).is_second)
+        self.assertNotIn(99, self.registry)
+
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_take_profit_levels', return_value=TP_LEVELS)
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_managed_positions')
+    def test_ticket_without_signal_is_retried(self, mock_get_managed_positions, mock_get_take_profit_levels):
+        """Test that a live ticket missing from the database is looked up again once its TTL expired"""
+        now = [1000.0]
+        registry = PositionRegistry(clock=lambda: now[0])
+        mock_get_managed_positions.return_value = ()
+        snapshot = self._snapshot([create_mock_position(ticket=10, price_open=1.0852, sl=1.0800)])
+
+        registry.sync(snapshot)
+        registry.sync(snapshot)
+        self.assertEqual(mock_get_managed_positions.call_count, 1)
+
+        # Saved by a worker process after the first lookup
+        mock_get_managed_positions.return_value = ROWS
+        now[0] += registry.unmanaged_ttl
+        registry.sync(snapshot)
+
+        self.assertEqual(mock_get_managed_positions.call_count, 2)
+        self.assertIn(10, registry)
+
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_take_profit_levels', return_value=TP_LEVELS)
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_managed_positions')
+    def test_sync_evicts_closed_tickets(self, mock_get_managed_positions, mock_get_take_profit_levels):
+        """Test that tickets missing from the snapshot are reported as closed"""
+        mock_get_managed_positions.return_value = ROWS
+        self.registry.sync(self._snapshot([create_mock_position(ticket=10)], [create_mock_order(ticket=11)]))
+
+        closed = self.registry.sync(self._snapshot([create_mock_position(ticket=10)]))
+
+        self.assertEqual(closed, [11])
+        self.assertNotIn(11, self.registry)
+        self.assertTrue(self.registry.get(10).signal.get_leg(second=True).closed)
+
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_take_profit_levels')
+    @patch('app.MetaTrader.monitoring.registry.Database.Migrations.get_signal_by_id')
+    def test_registered_position_survives_older_snapshot(self, mock_get_signal_by_id, mock_get_take_profit_levels):
+        """Test that a position opened after a snapshot was read is not evicted by it"""
+        mock_get_signal_by_id.return_value = {"open_price": 1950.0, "second_price": None, "tp_list": "1960,1970"}
+        mock_get_take_profit_levels.return_value = {7: [1960.0, 1970.0]}
+        snapshot = self._snapshot()
+
+        self.registry.register(500, 7, is_first=True, sl=1940.0)
+        self.registry.update_take_profits(7, [1975.0, 1965.0])
+
+        self.assertEqual(self.registry.sync(snapshot), [])
+        self.assertEqual(self.registry.get(500).tp_levels, [1965.0, 1975.0])
+        self.assertEqual(self.registry.get(500).signal.tp_indexes, [1, 0])
+        self.assertEqual(self.registry.get(500).last_sl, 1940.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
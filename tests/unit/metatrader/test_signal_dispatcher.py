@@ -0,0 +1,127 @@
+"""Unit tests for multi-account signal fan-out"""
+
+import time
+import unittest
+import concurrent.futures
+from unittest.mock import MagicMock, patch
+from tests.fixtures import TestBase
+from app.MetaTrader.connection import AccountConfig
+from app.MetaTrader.trading.trading import TradingOperations
+from app.MetaTrader.workers.dispatcher import RESULT_UNKNOWN, SignalDispatcher, split_accounts
+
+
+class FakeWorker:
+    """In-process stand-in for an account worker process"""
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+    def __init__(self, account):
+        self.account = account
+        self.name = f"{account.username}@{account.server}"
+        self.received = []
+        self.restarted = False
+
+    def start(self):
+        pass
+
+    def call(self, command, *args):
+        self.received.append((command, args))
+        return self.executor.submit(getattr(self, f"_{command}"), *args)
+
+    def _trade(self, *signal):
+        time.sleep(self.account.delay)
+        if self.account.fail:
+            raise RuntimeError("terminal not responding")
+        return self.account.lot
+
+    def _delete_signal(self, signal_id):
+        return f"closed {signal_id}"
+
+    def is_trading(self):
+        return any(command == "trade" for command, _ in self.received)
+
+    def restart(self):
+        self.restarted = True
+
+    def shutdown(self):
+        pass
+
+
+class TestSignalDispatcher(TestBase):
+    """Test cases for SignalDispatcher class"""
+
+    def _account(self, username, lot, delay=0.0, fail=False):
+        return MagicMock(username=username, server="TestServer", lot=lot, delay=delay, fail=fail)
+
+    def test_signal_is_sent_to_every_account(self):
+        """Test that each account worker receives the parsed signal"""
+        accounts = [self._account(1, "1%"), self._account(2, 0.05)]
+        dispatcher = SignalDispatcher(accounts, worker_factory=FakeWorker)
+
+        results = dispatcher.trade("channel", 10, 20, "BUY", "XAUUSD", 1950.0, None, [1960.0], 1940.0, "comment")
+
+        self.assertEqual(results, {"1@TestServer": "1%", "2@TestServer": 0.05})
+        for worker in dispatcher.workers:
+            self.assertEqual(worker.received[0], ("trade", ("channel", 10, 20, "BUY", "XAUUSD", 1950.0, None, [1960.0], 1940.0, "comment")))
+
+    def test_latency_is_the_slowest_account(self):
+        """Test that accounts are executed in parallel rather than one after another"""
+        accounts = [self._account(i, "1%", delay=0.2) for i in range(3)]
+        dispatcher = SignalDispatcher(accounts, worker_factory=FakeWorker)
+
+        started = time.monotonic()
+        dispatcher.trade("channel", 10, 20, "BUY", "XAUUSD", 1950.0, None, [1960.0], 1940.0, "comment")
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.5)
+
+    def test_failing_account_does_not_affect_others(self):
+        """Test that an error on one terminal is isolated to that account"""
+        accounts = [self._account(1, "1%", fail=True), self._account(2, "2%")]
+        dispatcher = SignalDispatcher(accounts, worker_factory=FakeWorker)
+
+        results = dispatcher.trade("channel", 10, 20, "BUY", "XAUUSD", 1950.0, None, [1960.0], 1940.0, "comment")
+
+        self.assertIsNone(results["1@TestServer"])
+        self.assertEqual(results["2@TestServer"], "2%")
+
+    def test_slow_trade_is_not_killed(self):
+        """Test that a trade outlasting its timeout is reported as unknown without restarting the worker"""
+        accounts = [self._account(1, "1%", delay=0.5), self._account(2, "2%")]
+        dispatcher = SignalDispatcher(accounts, worker_factory=FakeWorker, timeout=0.01, trade_timeout=0.1)
+
+        results = dispatcher.trade("channel", 10, 20, "BUY", "XAUUSD", 1950.0, None, [1960.0], 1940.0, "comment")
+
+        self.assertEqual(results, {"1@TestServer": RESULT_UNKNOWN, "2@TestServer": "2%"})
+        self.assertFalse(dispatcher.workers[0].restarted)
+        self.assertEqual(dispatcher.timeout_for("delete_signal"), 0.01)
+
+    def test_primary_account_stays_in_process(self):
+        """Test that only additional accounts get workers unless terminals are isolated"""
+        accounts = [self._account(1, "1%"), self._account(2, "2%"), self._account(3, "3%")]
+
+        with patch('Configure.settings.Settings.Settings.mt_terminal', return_value={'isolate': False}):
+            self.assertEqual(split_accounts(accounts), (accounts[:1], accounts[1:]))
+        with patch('Configure.settings.Settings.Settings.mt_terminal', return_value={'isolate': True}):
+            self.assertEqual(split_accounts(accounts), ([], accounts))
+
+    def test_operations_run_where_each_terminal_lives(self):
+        """Test that an edit runs in-process for the primary account and in the workers for the others"""
+        accounts = [self._account(1, "1%"), self._account(2, "2%")]
+        dispatcher = SignalDispatcher(accounts[1:], worker_factory=FakeWorker)
+
+        with patch.object(AccountConfig, 'load_all', return_value=accounts), \
+                patch('Configure.settings.Settings.Settings.mt_terminal', return_value={'isolate': False}), \
+                patch('app.MetaTrader.workers.get_dispatcher', return_value=dispatcher), \
+                patch('Database.Migrations.invalidate_cache') as invalidate_cache, \
+                patch.object(TradingOperations, 'delete_signal', return_value="closed locally") as delete_signal:
+            results = TradingOperations.on_all_accounts('delete_signal', 5)
+
+        self.assertEqual(results, {"1@TestServer": "closed locally", "2@TestServer": "closed 5"})
+        delete_signal.assert_called_once_with(5, account=accounts[0])
+        self.assertEqual(dispatcher.workers[0].received, [("delete_signal", (5,))])
+        invalidate_cache.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Unit tests for tick-change detection in the monitoring loop"""
+
+import unittest
+from unittest.mock import MagicMock
+from tests.fixtures import TestBase, create_mock_position
+from app.MetaTrader.monitoring.snapshot import MarketSnapshot
+from app.MetaTrader.monitoring.tick_watcher import TickWatcher
+
+
+class TestTickWatcher(TestBase):
+    """Test cases for TickWatcher class"""
+
+    def setUp(self):
+        super().setUp()
+        self.watcher = TickWatcher(fast_interval=0.1, interval=1.0, idle_interval=2.0, idle_after=1.0)
+        self.positions = [create_mock_position(ticket=1, symbol="EURUSD"),
+                          create_mock_position(ticket=2, symbol="XAUUSD")]
+
+    def _snapshot(self, **time_msc):
+        ticks = {symbol: MagicMock(time_msc=value, bid=1.0) for symbol, value in time_msc.items()}
+        return MarketSnapshot(self.positions, [], ticks)
+
+    def test_only_ticked_symbols_are_returned(self):
+        """Test that a symbol is re-evaluated only when its tick time changes"""
+        self.assertEqual(self.watcher.update(self._snapshot(EURUSD=100, XAUUSD=100)), {"EURUSD", "XAUUSD"})
+        self.assertEqual(self.watcher.update(self._snapshot(EURUSD=100, XAUUSD=250)), {"XAUUSD"})
+        self.assertEqual(self.watcher.update(self._snapshot(EURUSD=100, XAUUSD=250)), set())
+
+    def test_new_ticket_is_evaluated_without_tick(self):
+        """Test that a freshly opened position is evaluated even if its symbol did not tick"""
+        self.watcher.update(self._snapshot(EURUSD=100, XAUUSD=100))
+        self.positions.append(create_mock_position(ticket=3, symbol="EURUSD"))
+
+        self.assertEqual(self.watcher.update(self._snapshot(EURUSD=100, XAUUSD=100)), {"EURUSD"})
+
+    def test_interval_adapts(self):
+        """Test that polling is fast near a TP and slow when idle"""
+        self.watcher.update(self._snapshot(EURUSD=100, XAUUSD=100))
+        self.watcher.set_near({"EURUSD"}, {"EURUSD"})
+        self.assertEqual(self.watcher.next_interval(), 0.1)
+
+        self.watcher.set_near({"EURUSD"}, set())
+        self.assertEqual(self.watcher.next_interval(), 1.0)
+
+        self.watcher._last_tick_at -= 5  # no tick for longer than idle_after
+        self.assertEqual(self.watcher.next_interval(), 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Unit tests for precomputed TP thresholds and batch crossing checks"""
+
+import unittest
+import numpy as np
+from tests.fixtures import TestBase
+from app.MetaTrader.monitoring.registry import ManagedSignal, ManagedPosition
+from app.MetaTrader.monitoring.trailing import find_crossings, plan_trailing
+
+
+class TestTrailingThresholds(TestBase):
+    """Test cases for ManagedPosition.refresh and find_crossings"""
+
+    def _position(self, is_buy, sl, tp_levels=(1.1000, 1.1100, 1.1200), open_price=1.0900):
+        signal = ManagedSignal(1, open_price, None, tp_levels)
+        position = ManagedPosition(10, signal, is_first=True, last_sl=sl)
+        signal.legs.append(position)
+        position.is_buy = is_buy
+        position.refresh()
+        return position
+
+    def test_buy_threshold_follows_stop_loss(self):
+        """Test that the next TP is the first level above the stop loss"""
+        position = self._position(True, sl=1.0850)
+        self.assertEqual((position.level, position.next_tp, position.next_sl), (0, 1.1000, 1.0900))
+
+        position.last_sl = 1.1000
+        position.refresh()
+        self.assertEqual((position.level, position.next_tp, position.next_sl), (2, 1.1200, 1.1100))
+
+    def test_stop_at_entry_waits_for_second_tp(self):
+        """Test that once TP1 moved the stop loss to the entry, the next threshold is TP2"""
+        position = self._position(True, sl=1.0900)
+        self.assertEqual((position.level, position.next_tp, position.next_sl), (1, 1.1100, 1.1000))
+
+        position = self._position(False, sl=1.1250, open_price=1.1250)
+        self.assertEqual((position.level, position.next_tp, position.next_sl), (1, 1.1100, 1.1200))
+
+    def test_sell_threshold_walks_down(self):
+        """Test that sell positions walk the ladder from the highest TP down"""
+        position = self._position(False, sl=1.1300, open_price=1.1250)
+        self.assertEqual((position.level, position.next_tp, position.next_sl), (0, 1.1200, 1.1250))
+
+    def test_single_tp_is_not_trailed(self):
+        """Test that a position with one TP has no threshold"""
+        position = self._position(True, sl=1.0850, tp_levels=(1.1000,))
+        self.assertIsNone(position.next_tp)
+
+    def test_find_crossings(self):
+        """Test the batch crossing and proximity check"""
+        crossed, near = find_crossings(
+            next_tps=[1.1000, 1.1000, 1.1200, 1.1200],
+            next_sls=[1.0900, 1.0900, 1.1300, 1.1300],
+            is_buy=[True, True, False, False],
+            prices=[1.1001, 1.0990, 1.1250, np.nan],
+            near_ratio=0.2)
+
+        self.assertEqual(crossed.tolist(), [True, False, False, False])
+        self.assertEqual(near.tolist(), [False, True, False, False])
+
+    def test_plan_trailing_volumes(self):
+        """Test that save-profit volumes match PositionManager.save_profit_position"""
+        plan = plan_trailing(
+            tickets=[1, 2, 3, 4, 5],
+            next_tps=[1.1] * 5, next_sls=[1.0] * 5,
+            levels=[0, 1, 2, 0, 3],
+            is_buy=[True] * 5,
+            prices=[1.2, 1.2, 1.2, 1.2, 1.05],
+            volumes=[0.10, 0.10, 0.10, 0.01, 0.10],
+            save_profits=[25, 50, 100, 25], close_positions=True)
+
+        self.assertEqual(plan.modifications(), {1: 1.0, 2: 1.0, 3: 1.0, 4: 1.0})
+        self.assertEqual(plan.closes(), {1: (0.03, 25.0), 2: (0.05, 50.0), 3: (0.1, 100.0)})
+        self.assertEqual(plan.closes({1: True, 2: False}), {1: (0.03, 25.0)})
+
+    def test_plan_trailing_keeps_small_positions_when_closing_disabled(self):
+        """Test that minimum-volume positions are not closed with close_positions off"""
+        plan = plan_trailing([1], [1.1], [1.0], [0], [True], [1.2], [0.01], [50], close_positions=False)
+        self.assertEqual(plan.modifications(), {1: 1.0})
+        self.assertEqual(plan.closes(), {})
+
+        plan = plan_trailing([1], [1.1], [1.0], [0], [True], [1.2], [0.01], [50], close_positions=True)
+        self.assertEqual(plan.closes(), {1: (0.01, 50.0)})
+
+
+if __name__ == '__main__':
+    unittest.main()
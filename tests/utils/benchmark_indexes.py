@@ -0,0 +1,88 @@
+"""
+Benchmark of the hot lookup queries with and without the lookup indexes.
+
+Usage (from the repository root):
+    python tests/utils/benchmark_indexes.py [rows ...]
+
+Each size builds a database with that many positions (two per signal),
+times every lookup before and after schema_migrations.migrate and prints
+the average time per lookup in microseconds.
+"""
+
+import os
+import sys
+import random
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'app'))
+
+from Database.connection import ConnectionManager  # noqa: E402
+from Database.models import DatabaseSchema  # noqa: E402
+from Database.repository.signal_repository import SignalRepository  # noqa: E402
+from Database.repository.position_repository import PositionRepository  # noqa: E402
+from Database import schema_migrations  # noqa: E402
+
+LOOKUPS = 500
+
+
+def build(db_path, rows):
+    signals = SignalRepository(db_path, enable_cache=False)
+    positions = PositionRepository(db_path, enable_cache=False)
+    signals.create_table()
+    positions.create_table()
+
+    signal_count = rows // 2
+    with positions.repository.connections.writer() as conn:
+        conn.executemany(
+            "INSERT INTO Signals (telegram_channel_title, telegram_message_id, telegram_message_chatid, open_price, "
+            "second_price, stop_loss, tp_list, symbol, current_time) VALUES ('bench', ?, ?, 1.0, 0.99, 0.98, "
+            "'1.01,1.02,1.03', 'EURUSD', '2024-01-01 00:00:00')",
+            ((i, i % 50) for i in range(signal_count)))
+        conn.executemany(
+            "INSERT INTO Positions (signal_id, position_id, user_id, is_first, is_second) VALUES (?, ?, 1, ?, ?)",
+            ((i // 2 + 1, 1000000 + i, i % 2 == 0, i % 2 == 1) for i in range(signal_count * 2)))
+        # TP levels live in their own table, which already comes with its (signal_id, level_index) index
+        schema_migrations._create_take_profits(conn)
+        conn.executemany(
+            "INSERT INTO TakeProfits (signal_id, level_index, price) VALUES (?, ?, ?)",
+            ((i // 3 + 1, i % 3, 1.01 + i % 3 / 100) for i in range(signal_count * 3)))
+    return signals, positions, signal_count
+
+
+def measure(signals, positions, signal_count):
+    rng = random.Random(1)
+    tickets = [1000000 + rng.randrange(signal_count * 2) for _ in range(LOOKUPS)]
+    messages = [rng.randrange(signal_count) for _ in range(LOOKUPS)]
+    lookups = {
+        'get_tp_levels': lambda i: positions.get_tp_levels(tickets[i]),
+        'get_signal_by_position_id': lambda i: signals.get_signal_by_position_id(tickets[i]),
+        'get_signal_positions_by_position_id': lambda i: positions.get_signal_positions_by_position_id(tickets[i]),
+        'get_managed_positions': lambda i: positions.get_managed_positions([tickets[i]]),
+        'get_signal_by_chat': lambda i: signals.get_signal_by_chat(messages[i] % 50, messages[i]),
+    }
+    results = {}
+    for name, lookup in lookups.items():
+        started = time.perf_counter()
+        for i in range(LOOKUPS):
+            lookup(i)
+        results[name] = (time.perf_counter() - started) / LOOKUPS * 1e6
+    return results
+
+
+def main(sizes):
+    print(f"{'rows':>9}  {'lookup':<36}{'no index (us)':>14}{'indexed (us)':>14}")
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'bench.db')
+            signals, positions, signal_count = build(db_path, rows)
+            before = measure(signals, positions, signal_count)
+            schema_migrations.migrate(positions.repository.connections)
+            after = measure(signals, positions, signal_count)
+            for name in before:
+                print(f"{rows:>9}  {name:<36}{before[name]:>14.1f}{after[name]:>14.1f}")
+            positions.repository.connections.close()
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])